@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bench_enrollment.py
+Description: End-to-end benchmark of an enrollment run of create_group.py
+    (`create_persons`, `train_group` and `test_persons`) on a synthetic dataset
+    of N persons with M images each, against the mock server running in
+    another process.
+
+Reports the requests per second, the p50/p95/p99 latency of each endpoint,
+the peak RSS and the wall time. Results, including the metrics of
+`instrument.Metrics` (bytes, time to first byte, connections), are written
+as JSON with -o, and compared with the results of a previous run given with
+-b: the exit status is 1 when the throughput, the wall time or the p95
+latency of an endpoint regressed by more than the tolerance.
+
+Usage: python benchmarks/bench_enrollment.py [-n <persons>] [-m <images>]
+    [-w <workers>] [-l <latency>] [-s <pixels>] [-o <results.json>]
+    [-b <baseline.json>] [-T <tolerance>]
+"""
+import contextlib
+import getopt
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import cognitive_face as cf  # noqa: E402
+from cognitive_face.mock_server import MockFaceServer  # noqa: E402
+import create_group  # noqa: E402
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Latency differences below this many seconds, or of endpoints called fewer
+# times, are noise rather than regressions.
+MIN_LATENCY_DELTA = 0.001
+MIN_CALLS = 20
+
+
+class LatencyRecorder(cf.instrument.Hook):
+    """Keep the total time of every call per endpoint, for exact
+    percentiles."""
+
+    def __init__(self):
+        self.latencies = {}
+        self._lock = threading.Lock()
+
+    def after(self, info):
+        endpoint = '{} {}'.format(info.method, info.endpoint)
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(
+                info.timings['total'])
+
+    def summary(self):
+        return dict((endpoint, {
+            'count': len(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }) for endpoint, latencies in self.latencies.items())
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    values = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, None when unknown."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return rss / 2.0**20 if sys.platform == 'darwin' else rss / 2.0**10
+
+
+def make_dataset(directory, persons, images, pixels):
+    """Write `persons` directories of `images` distinct JPEGs each."""
+    for person in range(persons):
+        person_directory = os.path.join(directory, 'person{:05d}'.format(
+            person))
+        os.mkdir(person_directory)
+        for idx in range(images):
+            Image.effect_noise((pixels, pixels), 48).convert('RGB').save(
+                os.path.join(person_directory, '{}.jpg'.format(idx)), 'JPEG',
+                quality=85)
+
+
+def serve(conn, latency):
+    """Run the mock server until told to stop through `conn`."""
+    server = MockFaceServer(latency=latency).start()
+    conn.send(server.base_url)
+    conn.recv()
+    server.stop()
+
+
+def run(source_directory, workers):
+    """Enroll, train and test a group, returns the wall time of each phase."""
+    group_id = 'bench'
+    phases = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.time()
+        create_group.create_group(group_id)
+        create_group.create_persons(group_id, source_directory, workers)
+        phases['enroll'] = time.time() - start
+
+        start = time.time()
+        training = create_group.train_group(group_id)
+        create_group.test_persons(group_id, source_directory,
+                                  max(workers, 4), training)
+        phases['train_and_test'] = time.time() - start
+    return phases
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of `results` against `baseline`."""
+    regressions = []
+    if results['rps'] < baseline['rps'] * (1 - tolerance):
+        regressions.append('throughput {:.1f} req/s, baseline {:.1f}'.format(
+            results['rps'], baseline['rps']))
+    if results['wall_time'] > baseline['wall_time'] * (1 + tolerance):
+        regressions.append('wall time {:.2f}s, baseline {:.2f}s'.format(
+            results['wall_time'], baseline['wall_time']))
+    for endpoint, stats in sorted(results['endpoints'].items()):
+        previous = baseline['endpoints'].get(endpoint)
+        if previous is None or stats['count'] < MIN_CALLS:
+            continue
+        if (stats['p95'] > previous['p95'] * (1 + tolerance) and
+                stats['p95'] - previous['p95'] > MIN_LATENCY_DELTA):
+            regressions.append('{} p95 {:.1f} ms, baseline {:.1f} ms'.format(
+                endpoint, stats['p95'] * 1000, previous['p95'] * 1000))
+    return regressions
+
+
+def main(argv):
+    persons = 50
+    images = 10
+    workers = 8
+    latency = 0.0
+    pixels = 128
+    output = None
+    baseline = None
+    tolerance = 0.2
+    opts, _ = getopt.getopt(argv, 'n:m:w:l:s:o:b:T:')
+    for opt, arg in opts:
+        if opt == '-n':
+            persons = int(arg)
+        elif opt == '-m':
+            images = int(arg)
+        elif opt == '-w':
+            workers = int(arg)
+        elif opt == '-l':
+            latency = float(arg)
+        elif opt == '-s':
+            pixels = int(arg)
+        elif opt == '-o':
+            output = arg
+        elif opt == '-b':
+            baseline = arg
+        elif opt == '-T':
+            tolerance = float(arg)
+
+    directory = tempfile.mkdtemp()
+    conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child_conn, latency))
+    server.start()
+    recorder = LatencyRecorder()
+    metrics = cf.instrument.Metrics()
+    try:
+        make_dataset(directory, persons, images, pixels)
+        cf.util._BASE_URL = conn.recv()
+        cf.Session.configure(pool_maxsize=max(workers, 4))
+        cf.Instrument.add(recorder)
+        cf.Instrument.add(metrics)
+
+        start = time.time()
+        phases = run(directory, workers)
+        wall_time = time.time() - start
+    finally:
+        cf.Instrument.remove(recorder)
+        cf.Instrument.remove(metrics)
+        cf.Session.close()
+        cf.training.default().close()
+        conn.send('stop')
+        server.join()
+        shutil.rmtree(directory)
+
+    endpoints = recorder.summary()
+    requests = sum(stats['count'] for stats in endpoints.values())
+    results = {
+        'config': {
+            'persons': persons,
+            'images': images,
+            'workers': workers,
+            'latency': latency,
+            'pixels': pixels,
+            'python': platform.python_version(),
+        },
+        'wall_time': wall_time,
+        'phases': phases,
+        'requests': requests,
+        'rps': requests / wall_time,
+        'peak_rss_mb': peak_rss_mb(),
+        'endpoints': endpoints,
+        'metrics': metrics.to_json(),
+    }
+
+    print('{} persons x {} images, {} workers, {} requests in {:.2f}s: '
+          '{:.1f} req/s, peak RSS {} MB'.format(
+              persons, images, workers, requests, wall_time, results['rps'],
+              results['peak_rss_mb'] and round(results['peak_rss_mb'], 1)))
+    print('{:<52} {:>7} {:>9} {:>9} {:>9}'.format(
+        'endpoint', 'calls', 'p50 ms', 'p95 ms', 'p99 ms'))
+    for endpoint, stats in sorted(endpoints.items()):
+        print('{:<52} {:>7} {:9.2f} {:9.2f} {:9.2f}'.format(
+            endpoint, stats['count'], stats['p50'] * 1000,
+            stats['p95'] * 1000, stats['p99'] * 1000))
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), tolerance)
+        for regression in regressions:
+            print('REGRESSION: ' + regression)
+        if regressions:
+            sys.exit(1)
+        print('no regression against {} (tolerance {:.0%})'.format(
+            baseline, tolerance))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
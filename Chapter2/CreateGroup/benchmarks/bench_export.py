@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bench_export.py
+Description: Compare loading the JSON export of create_group.py with opening
+    the memory-mapped binary export (binary_export.py): file size, time and
+    memory until the first person id is resolved, and lookups per second.
+
+Usage: python benchmarks/bench_export.py [-n <persons>] [-m <faces>]
+    [-l <lookups>]
+"""
+import getopt
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import binary_export  # noqa: E402
+
+
+def load_json(path):
+    """What the app does at startup: parse it all, then index the names."""
+    with open(path) as f:
+        json_obj = json.load(f)
+    names = dict((person['person_id'], person['name'])
+                 for person in json_obj['persons'])
+    return names.get
+
+
+def load_binary(path):
+    return binary_export.GroupExport(path).name
+
+
+def run(label, load, path, person_ids):
+    tracemalloc.start()
+    start = time.time()
+    name = load(path)
+    name(person_ids[0])
+    load_time = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.time()
+    for person_id in person_ids:
+        name(person_id)
+    lookups = len(person_ids) / (time.time() - start)
+
+    print('{:<7} {:8.1f} MB on disk  first lookup after {:8.2f} ms  '
+          'peak {:8.1f} MB  {:10.0f} lookups/s'.format(
+              label, os.path.getsize(path) / 2.0**20, load_time * 1000,
+              peak / 2.0**20, lookups))
+    return load_time
+
+
+def main(argv):
+    persons = 20000
+    faces = 5
+    lookups = 100000
+    opts, _ = getopt.getopt(argv, 'n:m:l:')
+    for opt, arg in opts:
+        if opt == '-n':
+            persons = int(arg)
+        elif opt == '-m':
+            faces = int(arg)
+        elif opt == '-l':
+            lookups = int(arg)
+
+    group = [{
+        'name': 'person{}'.format(idx),
+        'person_id': str(uuid.uuid4()),
+        'face_ids': [str(uuid.uuid4()) for _ in range(faces)],
+    } for idx in range(persons)]
+    person_ids = [random.choice(group)['person_id'] for _ in range(lookups)]
+
+    directory = tempfile.mkdtemp()
+    try:
+        json_file = os.path.join(directory, 'group.json')
+        binary_file = os.path.join(directory, 'group.bin')
+        with open(json_file, 'w') as f:
+            json.dump({'group_id': 'bench', 'persons': group}, f, indent=4)
+        binary_export.json_to_binary(json_file, binary_file)
+
+        print('{} persons with {} faces each'.format(persons, faces))
+        json_time = run('json', load_json, json_file, person_ids)
+        binary_time = run('binary', load_binary, binary_file, person_ids)
+        print('first lookup {:.0f}x sooner'.format(json_time / binary_time))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bench_preprocess.py
+Description: Compare uploading camera sized images as they are and after
+    client side pre-processing (`preprocess.Preprocessor`), using a local stub
+    server. Reports the bytes sent and the throughput.
+
+Usage: python benchmarks/bench_preprocess.py [-n <images>] [-t <threads>]
+    [-p <processes>] [-m <max_dimension>] [-q <quality>]
+"""
+import getopt
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import cognitive_face as cf  # noqa: E402
+from cognitive_face import preprocess  # noqa: E402
+import stub_server  # noqa: E402
+
+
+def make_images(directory, count):
+    """Write 12 MP photos with enough detail to compress like real ones."""
+    images = []
+    noise = Image.effect_noise((4000, 3000), 64).convert('RGB')
+    gradient = Image.linear_gradient('L').resize((4000, 3000)).convert('RGB')
+    for idx in range(count):
+        image = os.path.join(directory, '{}.jpg'.format(idx))
+        Image.blend(noise, gradient, 0.3 + 0.05 * (idx % 8)).save(
+            image, 'JPEG', quality=95)
+        images.append(image)
+    return images
+
+
+def run(label, server, images, threads):
+    received = server.bytes_received
+    start = time.time()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(cf.face.detect, images))
+    elapsed = time.time() - start
+    sent = server.bytes_received - received
+    print('{:<13} {:>4} images {:8.1f} images/s  {:10.1f} MB sent'.format(
+        label, len(images), len(images) / elapsed, sent / 2.0**20))
+    return sent
+
+
+def main(argv):
+    count = 24
+    threads = 8
+    processes = os.cpu_count() or 1
+    max_dimension = 1600
+    quality = 90
+    opts, _ = getopt.getopt(argv, 'n:t:p:m:q:')
+    for opt, arg in opts:
+        if opt == '-n':
+            count = int(arg)
+        elif opt == '-t':
+            threads = int(arg)
+        elif opt == '-p':
+            processes = int(arg)
+        elif opt == '-m':
+            max_dimension = int(arg)
+        elif opt == '-q':
+            quality = int(arg)
+
+    directory = tempfile.mkdtemp()
+    images = make_images(directory, count)
+
+    server, base_url = stub_server.start()
+    cf.util._BASE_URL = base_url
+    cf.Session.configure(pool_maxsize=threads)
+    preprocessor = preprocess.Preprocessor(max_dimension, quality, processes)
+
+    try:
+        original = run('original', server, images, threads)
+        cf.Preprocess.set(preprocessor)
+        processed = run('preprocessed', server, images, threads)
+        print('bytes saved: {:.1f} MB ({:.0%})'.format(
+            (original - processed) / 2.0**20, 1 - processed / float(original)))
+    finally:
+        cf.Preprocess.set(None)
+        preprocessor.close()
+        cf.Session.close()
+        server.shutdown()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bench_session.py
+Description: Compare a fresh connection per call against the pooled session of
+    `cognitive_face.util.request` using a local stub server.
+
+Usage: python benchmarks/bench_session.py [-n <requests>] [-t <threads>]
+"""
+import getopt
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import cognitive_face as cf  # noqa: E402
+import stub_server  # noqa: E402
+
+
+def unpooled_request(method, url, **kwargs):
+    """The pre-session behaviour: one connection per call."""
+    return requests.request(method, url, **kwargs).json()
+
+
+def run(label, call, url, count, threads):
+    start = time.time()
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(lambda _: call('GET', url), range(count)))
+    else:
+        for _ in range(count):
+            call('GET', url)
+    elapsed = time.time() - start
+    print('{:<10} threads={:<3} {:>6} requests in {:6.2f}s  {:8.1f} req/s'.format(
+        label, threads, count, elapsed, count / elapsed))
+    return count / elapsed
+
+
+def main(argv):
+    count = 2000
+    threads = 1
+    opts, _ = getopt.getopt(argv, 'n:t:')
+    for opt, arg in opts:
+        if opt == '-n':
+            count = int(arg)
+        elif opt == '-t':
+            threads = int(arg)
+
+    server, base_url = stub_server.start()
+    url = base_url + 'persongroups'
+
+    cf.Session.configure(pool_maxsize=max(threads, 10))
+    unpooled = run('unpooled', unpooled_request, url, count, threads)
+    pooled = run('pooled', cf.util.request, url, count, threads)
+    print('speedup: {:.2f}x'.format(pooled / unpooled))
+
+    cf.Session.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
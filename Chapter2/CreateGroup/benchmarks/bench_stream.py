@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bench_stream.py
+Description: Compare detecting the faces of every frame of a camera stream
+    with `stream.FramePipeline`, which skips the frames where the scene did
+    not change, using the local mock server. Reports the calls made, the
+    time per frame spent hashing and the throughput.
+
+Usage: python benchmarks/bench_stream.py [-n <frames>] [-s <scenes>]
+    [-w <max_in_flight>] [-l <latency>]
+"""
+import getopt
+import io
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import cognitive_face as cf  # noqa: E402
+from cognitive_face import stream  # noqa: E402
+from cognitive_face.mock_server import MockFaceServer  # noqa: E402
+
+
+def make_frames(count, scenes):
+    """720p JPEG frames of `scenes` still scenes, with sensor noise."""
+    noise = [Image.effect_noise((1280, 720), 64).convert('RGB')
+             for _ in range(4)]
+    frames = []
+    for idx in range(count):
+        rng = random.Random(idx * scenes // count)
+        image = Image.frombytes('RGB', (32, 18), bytes(
+            rng.randrange(256) for _ in range(32 * 18 * 3))).resize(
+                (1280, 720), Image.BILINEAR)
+        data = io.BytesIO()
+        Image.blend(image, noise[idx % len(noise)], 0.03).save(
+            data, 'JPEG', quality=85)
+        frames.append(data.getvalue())
+    return frames
+
+
+def run(label, detect, frames, server):
+    calls = server.stats.get(('POST', 'detect'), 0)
+    start = time.time()
+    results = detect(frames)
+    elapsed = time.time() - start
+    calls = server.stats.get(('POST', 'detect'), 0) - calls
+    print('{:<9} {:>5} frames {:>5} calls {:8.1f} frames/s'.format(
+        label, len(frames), calls, len(frames) / elapsed))
+    return results
+
+
+def main(argv):
+    count = 300
+    scenes = 6
+    max_in_flight = 4
+    latency = 0.05
+    opts, _ = getopt.getopt(argv, 'n:s:w:l:')
+    for opt, arg in opts:
+        if opt == '-n':
+            count = int(arg)
+        elif opt == '-s':
+            scenes = int(arg)
+        elif opt == '-w':
+            max_in_flight = int(arg)
+        elif opt == '-l':
+            latency = float(arg)
+
+    frames = make_frames(count, scenes)
+    start = time.time()
+    for frame in frames:
+        stream.dhash(frame)
+    print('dhash: {:.2f} ms per 720p frame'.format(
+        (time.time() - start) / count * 1000))
+
+    server = MockFaceServer(latency=latency).start()
+    cf.util._BASE_URL = server.base_url
+    cf.Session.configure(pool_maxsize=max_in_flight)
+    try:
+        with ThreadPoolExecutor(max_in_flight) as executor:
+            run('every', lambda frames: list(executor.map(
+                lambda frame: cf.face.detect(io.BytesIO(frame)), frames)),
+                frames, server)
+        pipeline = stream.FramePipeline(max_in_flight=max_in_flight)
+        run('pipeline', lambda frames: list(pipeline.run(frames)), frames,
+            server)
+        print('skipped {skipped} of {frames} frames'.format(**pipeline.stats))
+    finally:
+        cf.Session.close()
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
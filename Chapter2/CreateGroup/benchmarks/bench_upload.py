@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bench_upload.py
+Description: Compare the memory used to upload large images when they are read
+    in memory (`util.parse_image`) and when they are streamed
+    (`util.open_image`, used by `face.detect`), using a local stub server.
+
+Usage: python benchmarks/bench_upload.py [-n <images>] [-s <size_mb>]
+    [-t <threads>]
+"""
+import getopt
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import cognitive_face as cf  # noqa: E402
+import stub_server  # noqa: E402
+
+
+def in_memory_detect(image):
+    """The pre-streaming behaviour: the whole image is read before sending."""
+    headers, data, json = cf.util.parse_image(image)
+    return cf.util.request('POST', 'detect', headers=headers, json=json,
+                           data=data)
+
+
+def run(label, call, images, threads):
+    tracemalloc.start()
+    start = time.time()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(call, images))
+    elapsed = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = sum(os.path.getsize(image) for image in images)
+    print('{:<10} threads={:<3} {:>4} images {:8.1f} MB/s  peak {:8.1f} MB'.format(
+        label, threads, len(images), size / elapsed / 2**20, peak / 2.0**20))
+    return peak
+
+
+def main(argv):
+    count = 16
+    size_mb = 12
+    threads = 8
+    opts, _ = getopt.getopt(argv, 'n:s:t:')
+    for opt, arg in opts:
+        if opt == '-n':
+            count = int(arg)
+        elif opt == '-s':
+            size_mb = int(arg)
+        elif opt == '-t':
+            threads = int(arg)
+
+    directory = tempfile.mkdtemp()
+    images = []
+    for idx in range(count):
+        image = os.path.join(directory, '{}.jpg'.format(idx))
+        with open(image, 'wb') as f:
+            f.write(os.urandom(size_mb * 2**20))
+        images.append(image)
+
+    server, base_url = stub_server.start()
+    cf.util._BASE_URL = base_url
+    cf.Session.configure(pool_maxsize=threads)
+
+    try:
+        in_memory = run('in-memory', in_memory_detect, images, threads)
+        streamed = run('streamed', cf.face.detect, images, threads)
+        print('peak memory reduced {:.1f}x'.format(in_memory / float(streamed)))
+    finally:
+        cf.Session.close()
+        server.shutdown()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: stub_server.py
+Description: Minimal local HTTP server used by the benchmarks in place of the
+    Cognitive Face API.
+"""
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Drain the request body and answer with an empty JSON object over
+    keep-alive."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        remaining = int(self.headers.get('Content-Length') or 0)
+        self.server.count(remaining)
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+    def log_message(self, *args):
+        # pylint: disable=arguments-differ
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Threaded server counting the requests and request bytes received."""
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        HTTPServer.__init__(self, *args, **kwargs)
+        self._lock = threading.Lock()
+        self.requests_received = 0
+        self.bytes_received = 0
+
+    def count(self, size):
+        with self._lock:
+            self.requests_received += 1
+            self.bytes_received += size
+
+
+def start():
+    """Serve in a background thread and return the server and its base URL."""
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    base_url = 'http://127.0.0.1:{}/face/v1.0/'.format(server.server_address[1])
+    return server, base_url
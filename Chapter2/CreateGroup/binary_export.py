@@ -0,0 +1,227 @@
+"""
+Compact binary format of the group exported by create_group.py.
+
+The JSON export has to be parsed in full before the first lookup. This layout
+is read in place through mmap: opening it costs the same for 10 or 100k
+persons and a person id is resolved to its name with a single hash probe.
+
+All integers are little-endian unsigned, identifiers are stored as their 16
+raw UUID bytes and texts as (offset, length) into a table of UTF-8 strings.
+
+    header      48 bytes, see HEADER
+    persons     person_count records of 32 bytes, in export order:
+                person uuid, name offset, name length, first face, face count
+    slots       slot_count u32 (a power of two), open addressing table of
+                person index + 1 (0 when empty), probed linearly from the
+                first 8 bytes of the person uuid
+    faces       face_count uuids of 16 bytes, the faces of each person are
+                contiguous and in export order
+    strings     UTF-8 group id and person names
+
+Usage: python binary_export.py <group.json> <group.bin>
+       python binary_export.py <group.bin> <group.json>
+"""
+
+import sys, json, mmap, struct, uuid
+
+MAGIC = b'CFGX'
+VERSION = 1
+
+# magic, version, flags, person_count, face_count, slot_count, persons_offset, slots_offset,
+# faces_offset, strings_offset, strings_size, group_id_offset, group_id_length
+HEADER = struct.Struct('<4sHHIIIIIIIIII')
+PERSON = struct.Struct('<16sIIII')
+SLOT = struct.Struct('<I')
+SLOT_KEY = struct.Struct('<Q')
+
+def _align(offset, alignment=16):
+    return (offset + alignment - 1) // alignment * alignment
+
+def _slot_count(person_count):
+    """ a power of two at least twice the number of persons, so probes stay short
+    """
+    slot_count = 1
+
+    while slot_count < 2 * person_count:
+        slot_count *= 2
+
+    return slot_count
+
+def write(path, group_id, persons):
+    """ writes the persons (dicts with name, person_id and face_ids, as exported to json)
+    """
+    strings = bytearray()
+
+    def add_string(text):
+        data = text.encode('utf-8')
+        strings.extend(data)
+        return len(strings) - len(data), len(data)
+
+    group_id_offset, group_id_length = add_string(group_id)
+
+    person_records = []
+    faces = []
+
+    for person in persons:
+        name_offset, name_length = add_string(person['name'])
+        person_records.append(PERSON.pack(uuid.UUID(person['person_id']).bytes, name_offset, name_length, len(faces), len(person['face_ids'])))
+        faces.extend(uuid.UUID(face_id).bytes for face_id in person['face_ids'])
+
+    slot_count = _slot_count(len(persons))
+    slots = [0] * slot_count
+    mask = slot_count - 1
+
+    for idx, person in enumerate(persons):
+        key = uuid.UUID(person['person_id']).bytes
+        slot = SLOT_KEY.unpack_from(key)[0] & mask
+
+        while slots[slot]:
+            if person_records[slots[slot] - 1][:16] == key:
+                raise ValueError('person {} is exported twice'.format(person['person_id']))
+            slot = (slot + 1) & mask
+
+        slots[slot] = idx + 1
+
+    persons_offset = HEADER.size
+    slots_offset = persons_offset + PERSON.size * len(persons)
+    faces_offset = _align(slots_offset + SLOT.size * slot_count)
+    strings_offset = faces_offset + 16 * len(faces)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(persons), len(faces), slot_count, persons_offset, slots_offset,
+                            faces_offset, strings_offset, len(strings), group_id_offset, group_id_length))
+        f.write(b''.join(person_records))
+        f.write(struct.pack('<{}I'.format(slot_count), *slots))
+        f.write(b'\0' * (faces_offset - slots_offset - SLOT.size * slot_count))
+        f.write(b''.join(faces))
+        f.write(strings)
+
+class GroupExport(object):
+    """ read-only view of a binary export, memory-mapped so nothing is parsed up front
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            # mmap can't map an empty file, but an export always has its header
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.person_count, self.face_count, self._slot_count, self._persons_offset,
+         self._slots_offset, self._faces_offset, self._strings_offset, _, group_id_offset,
+         group_id_length) = HEADER.unpack_from(self._map)
+
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('{} is not a version {} group export'.format(path, VERSION))
+
+        self.group_id = self._string(group_id_offset, group_id_length)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.person_count
+
+    def close(self):
+        self._map.close()
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def _record(self, idx):
+        return PERSON.unpack_from(self._map, self._persons_offset + PERSON.size * idx)
+
+    def _find(self, person_id):
+        """ returns the index of the person, None when it is not exported
+        """
+        try:
+            # much cheaper than parsing a uuid.UUID
+            key = bytes.fromhex(person_id.replace('-', ''))
+        except (ValueError, AttributeError):
+            return None
+
+        if len(key) != 16:
+            return None
+
+        mask = self._slot_count - 1
+        slot = SLOT_KEY.unpack_from(key)[0] & mask
+
+        while True:
+            idx = SLOT.unpack_from(self._map, self._slots_offset + SLOT.size * slot)[0]
+
+            if idx == 0:
+                return None
+
+            start = self._persons_offset + PERSON.size * (idx - 1)
+
+            if self._map[start:start + 16] == key:
+                return idx - 1
+
+            slot = (slot + 1) & mask
+
+    def name(self, person_id):
+        """ returns the name of the person, None when it is not exported
+        """
+        idx = self._find(person_id)
+
+        if idx is None:
+            return None
+
+        _, name_offset, name_length, _, _ = self._record(idx)
+
+        return self._string(name_offset, name_length)
+
+    def face_ids(self, person_id):
+        """ returns the persisted face ids of the person, None when it is not exported
+        """
+        idx = self._find(person_id)
+
+        return None if idx is None else self.person(idx)['face_ids']
+
+    def person(self, idx):
+        """ returns the person at idx in export order, as exported to json
+        """
+        key, name_offset, name_length, first_face, face_count = self._record(idx)
+        start = self._faces_offset + 16 * first_face
+
+        return {
+            'name': self._string(name_offset, name_length),
+            'person_id': str(uuid.UUID(bytes=key)),
+            'face_ids': [str(uuid.UUID(bytes=self._map[offset:offset + 16]))
+                         for offset in range(start, start + 16 * face_count, 16)]
+        }
+
+    def persons(self):
+        for idx in range(self.person_count):
+            yield self.person(idx)
+
+    def to_json(self):
+        """ returns the same object as the json export
+        """
+        return {'group_id': self.group_id, 'persons': list(self.persons())}
+
+def json_to_binary(json_file, binary_file):
+    with open(json_file) as f:
+        json_obj = json.load(f)
+
+    write(binary_file, json_obj['group_id'], json_obj['persons'])
+
+def binary_to_json(binary_file, json_file):
+    with GroupExport(binary_file) as group_export:
+        json_obj = group_export.to_json()
+
+    with open(json_file, 'w') as f:
+        json.dump(json_obj, f, indent=4)
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(2)
+
+    if sys.argv[1].endswith('.json'):
+        json_to_binary(sys.argv[1], sys.argv[2])
+    else:
+        binary_to_json(sys.argv[1], sys.argv[2])
@@ -5,10 +5,30 @@ File: __init__.py
 Description: Python SDK of the Cognitive Face API.
 """
 
+from . import bulk
+from . import client
+from . import detect_cache
 from . import face
 from . import face_list
+from . import instrument
+from . import metadata_cache
 from . import person
 from . import person_group
+from . import rate_limit
+from . import region
+from . import retry
+from . import single_flight
+from . import training
 from . import util
+from .client import Client
+from .util import Cache
+from .util import Coalesce
 from .util import CognitiveFaceException
+from .util import Instrument
 from .util import Key
+from .util import Metadata
+from .util import Preprocess
+from .util import RateLimit
+from .util import Retry
+from .util import Route
+from .util import Session
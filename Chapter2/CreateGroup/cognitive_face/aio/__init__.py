@@ -0,0 +1,17 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: __init__.py
+Description: asyncio flavour of the Python SDK of the Cognitive Face API.
+
+Every function of `face`, `face_list`, `person` and `person_group` is offered
+as a coroutine with the same signature. All coroutines share one `aiohttp`
+connection pool, which must be installed separately (`pip install aiohttp`).
+"""
+
+from . import face
+from . import face_list
+from . import person
+from . import person_group
+from . import util
+from .util import Session
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: face.py
+Description: Face section of the Cognitive Face API, as coroutines.
+"""
+import asyncio
+
+from . import util
+from .. import util as sync_util
+from ..face import IDENTIFY_MAX_FACES
+
+
+async def detect(image, face_id=True, landmarks=False, attributes=''):
+    """Coroutine version of `cognitive_face.face.detect`."""
+    url = 'detect'
+    params = {
+        'returnFaceId': face_id and 'true' or 'false',
+        'returnFaceLandmarks': landmarks and 'true' or 'false',
+        'returnFaceAttributes': attributes,
+    }
+    cache = sync_util.Cache.get()
+    target = sync_util.destination(url) if cache is not None else None
+
+    async with util.open_image(image) as (headers, data, json):
+        if target is None or data is None:
+            return await util.request('POST', url, headers=headers,
+                                      params=params, json=json, data=data)
+
+        # Hashing the image and the cache hit the disk, off the loop.
+        key = await util.run_blocking(cache.key, data, params, *target)
+        result = await util.run_blocking(cache.get, key)
+        if result is None:
+            result = await util.request('POST', url, headers=headers,
+                                        params=params, json=json, data=data)
+            await util.run_blocking(cache.put, key, result, face_id)
+
+    return result
+
+
+async def find_similars(face_id, face_list_id=None, face_ids=None,
+                        max_candidates_return=20, mode='matchPerson'):
+    """Coroutine version of `cognitive_face.face.find_similars`."""
+    url = 'findsimilars'
+    json = {
+        'faceId': face_id,
+        'faceListId': face_list_id,
+        'faceIds': face_ids,
+        'maxNumOfCandidatesReturned': max_candidates_return,
+        'mode': mode,
+    }
+
+    return await util.request('POST', url, json=json)
+
+
+async def group(face_ids):
+    """Coroutine version of `cognitive_face.face.group`."""
+    url = 'group'
+    json = {
+        'faceIds': face_ids,
+    }
+
+    return await util.request('POST', url, json=json)
+
+
+async def identify(face_ids, person_group_id, max_candidates_return=1,
+                   threshold=None):
+    """Coroutine version of `cognitive_face.face.identify`."""
+    url = 'identify'
+    json = {
+        'personGroupId': person_group_id,
+        'faceIds': face_ids,
+        'maxNumOfCandidatesReturned': max_candidates_return,
+        'confidenceThreshold': threshold,
+    }
+
+    return await util.request('POST', url, json=json)
+
+
+async def identify_many(face_ids, person_group_id, max_candidates_return=1,
+                        threshold=None, workers=4):
+    """Coroutine version of `cognitive_face.face.identify_many`."""
+    chunks = [face_ids[idx:idx + IDENTIFY_MAX_FACES]
+              for idx in range(0, len(face_ids), IDENTIFY_MAX_FACES)]
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def identify_chunk(chunk):
+        async with semaphore:
+            res = await identify(chunk, person_group_id,
+                                 max_candidates_return, threshold)
+        # Matched by faceId, whatever the order of the response.
+        entries = dict((entry['faceId'], entry) for entry in res)
+        return [entries[face_id] for face_id in chunk]
+
+    results = await asyncio.gather(*[identify_chunk(chunk)
+                                     for chunk in chunks])
+
+    return [entry for result in results for entry in result]
+
+
+async def verify(face_id, another_face_id=None, person_group_id=None,
+                 person_id=None):
+    """Coroutine version of `cognitive_face.face.verify`."""
+    url = 'verify'
+    json = {}
+    if another_face_id:
+        json.update({
+            'faceId1': face_id,
+            'faceId2': another_face_id,
+        })
+    else:
+        json.update({
+            'faceId': face_id,
+            'personGroupId': person_group_id,
+            'personId': person_id,
+        })
+
+    return await util.request('POST', url, json=json)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: face_list.py
+Description: Face List section of the Cognitive Face API, as coroutines.
+"""
+from . import util
+
+
+async def add_face(image, face_list_id, user_data=None, target_face=None):
+    """Coroutine version of `cognitive_face.face_list.add_face`."""
+    url = 'facelists/{}/persistedFaces'.format(face_list_id)
+    params = {
+        'userData': user_data,
+        'targetFace': target_face,
+    }
+
+    async with util.open_image(image) as (headers, data, json):
+        return await util.request('POST', url, headers=headers, params=params,
+                                  json=json, data=data)
+
+
+async def create(face_list_id, name=None, user_data=None):
+    """Coroutine version of `cognitive_face.face_list.create`."""
+    name = face_list_id if name is None else name
+    url = 'facelists/{}'.format(face_list_id)
+    json = {
+        'name': name,
+        'userData': user_data,
+    }
+
+    return await util.request('PUT', url, json=json)
+
+
+async def delete_face(face_list_id, persisted_face_id):
+    """Coroutine version of `cognitive_face.face_list.delete_face`."""
+    url = 'facelists/{}/persistedFaces/{}'.format(
+        face_list_id, persisted_face_id
+    )
+
+    return await util.request('DELETE', url)
+
+
+async def delete(face_list_id):
+    """Coroutine version of `cognitive_face.face_list.delete`."""
+    url = 'facelists/{}'.format(face_list_id)
+
+    return await util.request('DELETE', url)
+
+
+async def get(face_list_id):
+    """Coroutine version of `cognitive_face.face_list.get`."""
+    url = 'facelists/{}'.format(face_list_id)
+
+    return await util.request('GET', url)
+
+
+async def lists():
+    """Coroutine version of `cognitive_face.face_list.lists`."""
+    url = 'facelists'
+
+    return await util.request('GET', url)
+
+
+async def update(face_list_id, name=None, user_data=None):
+    """Coroutine version of `cognitive_face.face_list.update`."""
+    url = 'facelists/{}'.format(face_list_id)
+    json = {
+        'name': name,
+        'userData': user_data,
+    }
+
+    return await util.request('PATCH', url, json=json)
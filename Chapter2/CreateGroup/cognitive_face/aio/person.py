@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: person.py
+Description: Person section of the Cognitive Face API, as coroutines.
+"""
+from . import util
+
+
+async def add_face(image, person_group_id, person_id, user_data=None,
+                   target_face=None):
+    """Coroutine version of `cognitive_face.person.add_face`."""
+    url = 'persongroups/{}/persons/{}/persistedFaces'.format(
+        person_group_id, person_id)
+    params = {
+        'userData': user_data,
+        'targetFace': target_face,
+    }
+
+    async with util.open_image(image) as (headers, data, json):
+        return await util.request('POST', url, headers=headers, params=params,
+                                  json=json, data=data)
+
+
+async def create(person_group_id, name, user_data=None):
+    """Coroutine version of `cognitive_face.person.create`."""
+    url = 'persongroups/{}/persons'.format(person_group_id)
+    json = {
+        'name': name,
+        'userData': user_data,
+    }
+
+    return await util.request('POST', url, json=json)
+
+
+async def delete(person_group_id, person_id):
+    """Coroutine version of `cognitive_face.person.delete`."""
+    url = 'persongroups/{}/persons/{}'.format(person_group_id, person_id)
+
+    return await util.request('DELETE', url)
+
+
+async def delete_face(person_group_id, person_id, persisted_face_id):
+    """Coroutine version of `cognitive_face.person.delete_face`."""
+    url = 'persongroups/{}/persons/{}/persistedFaces/{}'.format(
+        person_group_id, person_id, persisted_face_id
+    )
+
+    return await util.request('DELETE', url)
+
+
+async def get(person_group_id, person_id):
+    """Coroutine version of `cognitive_face.person.get`."""
+    url = 'persongroups/{}/persons/{}'.format(person_group_id, person_id)
+
+    return await util.request('GET', url)
+
+
+async def get_face(person_group_id, person_id, persisted_face_id):
+    """Coroutine version of `cognitive_face.person.get_face`."""
+    url = 'persongroups/{}/persons/{}/persistedFaces/{}'.format(
+        person_group_id, person_id, persisted_face_id
+    )
+
+    return await util.request('GET', url)
+
+
+async def lists(person_group_id, start=None, top=None):
+    """Coroutine version of `cognitive_face.person.lists`."""
+    url = 'persongroups/{}/persons'.format(person_group_id)
+    params = {
+        'start': start,
+        'top': top,
+    }
+
+    return await util.request('GET', url, params=params)
+
+
+def iter_lists(person_group_id, top=1000, prefetch=False):
+    """Asynchronous iterator version of
+    `cognitive_face.person.iter_lists`."""
+    return util.Paginator(
+        lambda start, top: lists(person_group_id, start, top), 'personId',
+        top, prefetch)
+
+
+async def update(person_group_id, person_id, name=None, user_data=None):
+    """Coroutine version of `cognitive_face.person.update`."""
+    url = 'persongroups/{}/persons/{}'.format(person_group_id, person_id)
+    json = {
+        'name': name,
+        'userData': user_data,
+    }
+
+    return await util.request('PATCH', url, json=json)
+
+
+async def update_face(person_group_id, person_id, persisted_face_id,
+                      user_data=None):
+    """Coroutine version of `cognitive_face.person.update_face`."""
+    url = 'persongroups/{}/persons/{}/persistedFaces/{}'.format(
+        person_group_id, person_id, persisted_face_id
+    )
+    json = {
+        'userData': user_data,
+    }
+
+    return await util.request('PATCH', url, json=json)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: person_group.py
+Description: Person Group section of the Cognitive Face API, as coroutines.
+"""
+from . import util
+
+
+async def create(person_group_id, name=None, user_data=None):
+    """Coroutine version of `cognitive_face.person_group.create`."""
+    name = person_group_id if name is None else name
+    url = 'persongroups/{}'.format(person_group_id)
+    json = {
+        'name': name,
+        'userData': user_data,
+    }
+
+    return await util.request('PUT', url, json=json)
+
+
+async def delete(person_group_id):
+    """Coroutine version of `cognitive_face.person_group.delete`."""
+    url = 'persongroups/{}'.format(person_group_id)
+
+    return await util.request('DELETE', url)
+
+
+async def get(person_group_id):
+    """Coroutine version of `cognitive_face.person_group.get`."""
+    url = 'persongroups/{}'.format(person_group_id)
+
+    return await util.request('GET', url)
+
+
+async def get_status(person_group_id):
+    """Coroutine version of `cognitive_face.person_group.get_status`."""
+    url = 'persongroups/{}/training'.format(person_group_id)
+
+    return await util.request('GET', url)
+
+
+async def lists(start=None, top=None):
+    """Coroutine version of `cognitive_face.person_group.lists`."""
+    url = 'persongroups'
+    params = {
+        'start': start,
+        'top': top,
+    }
+
+    return await util.request('GET', url, params=params)
+
+
+def iter_lists(top=1000, prefetch=False):
+    """Asynchronous iterator version of
+    `cognitive_face.person_group.iter_lists`."""
+    return util.Paginator(lists, 'personGroupId', top, prefetch)
+
+
+async def train(person_group_id):
+    """Coroutine version of `cognitive_face.person_group.train`."""
+    url = 'persongroups/{}/train'.format(person_group_id)
+
+    return await util.request('POST', url)
+
+
+async def update(person_group_id, name=None, user_data=None):
+    """Coroutine version of `cognitive_face.person_group.update`."""
+    url = 'persongroups/{}'.format(person_group_id)
+    json = {
+        'name': name,
+        'userData': user_data,
+    }
+
+    return await util.request('PATCH', url, json=json)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: util.py
+Description: Shared utilities for the asyncio flavour of the Python SDK of the
+    Cognitive Face API.
+"""
+import asyncio
+import functools
+import threading
+import time
+
+import aiohttp
+
+from .. import instrument
+from .. import util
+
+
+class Session(object):
+    """Manage the `aiohttp.ClientSession`s shared by every call to `request`.
+
+    A session is bound to its event loop, so each loop gets its own, lazily
+    created when `request` is first awaited from it. Close it with `close`
+    before closing its loop: the sessions of closed loops can no longer be
+    closed and are only dropped, leaving their connections to the garbage
+    collector.
+    """
+    _sessions = {}
+    _lock = threading.Lock()
+
+    limit = 100
+    limit_per_host = 0
+    keepalive_timeout = 15
+
+    @classmethod
+    def configure(cls, limit=None, limit_per_host=None,
+                  keepalive_timeout=None):
+        """Configure the connection pool used by the next created session.
+
+        Args:
+            limit: Maximum number of simultaneous connections, which bounds
+                the number of requests in flight.
+            limit_per_host: Maximum number of simultaneous connections to one
+                endpoint, 0 means no limit besides `limit`.
+            keepalive_timeout: Seconds an idle connection is kept alive.
+        """
+        if limit is not None:
+            cls.limit = limit
+        if limit_per_host is not None:
+            cls.limit_per_host = limit_per_host
+        if keepalive_timeout is not None:
+            cls.keepalive_timeout = keepalive_timeout
+
+    @classmethod
+    def get(cls):
+        """Get the session of the running event loop."""
+        loop = asyncio.get_event_loop()
+        with cls._lock:
+            session = cls._sessions.get(loop)
+            if session is None or session.closed:
+                for other in [other for other in cls._sessions
+                              if other.is_closed()]:
+                    del cls._sessions[other]
+                connector = aiohttp.TCPConnector(
+                    limit=cls.limit,
+                    limit_per_host=cls.limit_per_host,
+                    keepalive_timeout=cls.keepalive_timeout)
+                session = cls._sessions[loop] = aiohttp.ClientSession(
+                    connector=connector, trace_configs=[_trace_config()])
+            return session
+
+    @classmethod
+    async def close(cls):
+        """Close the session of the running event loop and all of its pooled
+        connections."""
+        with cls._lock:
+            session = cls._sessions.pop(asyncio.get_event_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+def run_blocking(func, *args):
+    """Run a blocking callable, e.g. reading a file or a cache, in the default
+    executor of the running loop, with the current context (client and pinned
+    region).
+
+    Returns:
+        An awaitable of the result of `func(*args)`.
+    """
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(
+        None, util.propagate(functools.partial(func, *args)))
+
+
+def open_image(image):
+    """Asynchronous context manager version of
+    `cognitive_face.util.open_image`, to be used with `async with`. The image
+    is opened, and preprocessed, in the default executor not to block the
+    loop.
+    """
+    return _OpenImage(util.open_image(image))
+
+
+class _OpenImage(object):
+
+    def __init__(self, context):
+        self._context = context
+
+    async def __aenter__(self):
+        return await run_blocking(self._context.__enter__)
+
+    async def __aexit__(self, *exc_info):
+        return self._context.__exit__(*exc_info)
+
+
+async def request(method, url, data=None, json=None, headers=None,
+                  params=None):
+    # pylint: disable=too-many-arguments
+    """Universal interface for request, sent to its region, see
+    `cognitive_face.util.request`."""
+    target = util.destination(url)
+    if target is None:
+        return await _fail_over(util.Route.get(), method, url, data, json,
+                                headers, params)
+    url, headers = util.prepare_request(target[0], headers, target[1])
+    return await send(method, url, data, json, headers, params)
+
+
+async def _fail_over(router, method, url, data, json, headers, params):
+    # pylint: disable=too-many-arguments
+    """Send a call to the best region of a router, see
+    `cognitive_face.region.Router.request`."""
+    # The first call probes the regions, off the loop.
+    regions = await run_blocking(router.order)
+    data = util.rewindable(data)
+    position = data.tell() if hasattr(data, 'seek') else None
+    for idx, region in enumerate(regions):
+        if position is not None:
+            data.seek(position)
+        full_url, region_headers = util.prepare_request(
+            region.base_url + url, dict(headers or {}), region.key)
+        try:
+            result = await send(method, full_url, data, json, region_headers,
+                                params)
+        except (aiohttp.ClientConnectionError,
+                util.CognitiveFaceException) as exc:
+            if (not router.fail_over(region, exc) or
+                    idx == len(regions) - 1):
+                raise
+            continue
+        router.record(region, failed=False)
+        return result
+
+
+async def send(method, url, data=None, json=None, headers=None, params=None):
+    # pylint: disable=too-many-arguments
+    """Coroutine version of `cognitive_face.util.send`, sharing its metadata
+    cache."""
+    data = util.rewindable(data)
+    cache = util.Metadata.get()
+    if cache is None:
+        return await _coalesce(method, url, data, json, headers, params)
+    if method == 'GET':
+        return await cache.read_async(url, params, headers, lambda: _coalesce(
+            method, url, data, json, headers, params))
+    try:
+        return await _coalesce(method, url, data, json, headers, params)
+    finally:
+        cache.invalidate(method, url, headers)
+
+
+async def _coalesce(method, url, data, json, headers, params):
+    # pylint: disable=too-many-arguments
+    """Send a request, shared with the identical concurrent calls, see
+    `cognitive_face.util.Coalesce`."""
+    flight = util.Coalesce.get()
+    if flight is None:
+        return util.parse_response(*await _exchange(method, url, data, json,
+                                                    headers, params))
+    key = flight.key(method, url, data, json, headers, params)
+    if key is None:
+        try:
+            return util.parse_response(*await _exchange(
+                method, url, data, json, headers, params))
+        finally:
+            flight.invalidate(method, url)
+    return util.parse_response(*await flight.do_async(key, lambda: _exchange(
+        method, url, data, json, headers, params)))
+
+
+async def _exchange(method, url, data, json, headers, params):
+    # pylint: disable=too-many-arguments
+    """Send a request, returns the status code and the body of the
+    response."""
+    # `requests` silently drops the headers and parameters left to None,
+    # aiohttp does not.
+    headers = {k: v for k, v in headers.items() if v is not None}
+    if params:
+        params = {k: v for k, v in params.items() if v is not None}
+
+    limiter = util.RateLimit.get()
+    policy = util.Retry.get()
+    hooks = util.Instrument.get()
+    info = hooks and _before(hooks, method, url)
+    start = time.time()
+    attempt = 0
+    # Streamed bodies are rewound before being sent again.
+    position = data.tell() if hasattr(data, 'seek') else None
+
+    while True:
+        if limiter is not None:
+            delay = limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        try:
+            async with Session.get().request(
+                    method, url, params=params, data=data, json=json,
+                    headers=headers, trace_request_ctx=info) as response:
+                status_code = response.status
+                text = await response.text()
+        except aiohttp.ClientConnectionError as exc:
+            delay = policy and policy.delay(method, url, attempt,
+                                            time.time() - start)
+            if delay is None:
+                _record(policy, start, attempt, failed=True)
+                if info:
+                    _after(hooks, info, attempt, error=exc)
+                raise
+        else:
+            if status_code in (200, 202) or policy is None:
+                break
+            delay = policy.delay(method, url, attempt, time.time() - start,
+                                 status_code,
+                                 response.headers.get('Retry-After'))
+            if delay is None:
+                break
+        await asyncio.sleep(delay)
+        attempt += 1
+        if position is not None:
+            data.seek(position)
+
+    _record(policy, start, attempt, failed=status_code not in (200, 202))
+    if info:
+        _after(hooks, info, attempt, status_code)
+    return status_code, text
+
+
+def _record(policy, start, attempt, failed):
+    if policy is not None:
+        policy.stats.record(time.time() - start, attempt + 1, failed)
+
+
+class Paginator(object):
+    """Asynchronous iterator over all the entries of a paged listing, see
+    `cognitive_face.util.paginate`, to be used with `async for`.
+
+    With `prefetch`, the next page is requested as soon as the current one is
+    received and fetched while the current one is consumed.
+    """
+
+    def __init__(self, fetch, key, top=1000, prefetch=False):
+        self.fetch = fetch
+        self.key = key
+        self.top = top
+        self.prefetch = prefetch
+        self._page = None
+        self._following = None
+        self._idx = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._page is None or self._idx == len(self._page):
+            if self._page is not None and len(self._page) < self.top:
+                raise StopAsyncIteration
+            if self._following is not None:
+                self._page = await self._following
+            else:
+                start = self._page[-1][self.key] if self._page else None
+                self._page = await self.fetch(start, self.top)
+            self._idx = 0
+            self._following = None
+            if self.prefetch and len(self._page) >= self.top:
+                self._following = asyncio.ensure_future(
+                    self.fetch(self._page[-1][self.key], self.top))
+            if not self._page:
+                raise StopAsyncIteration
+        self._idx += 1
+        return self._page[self._idx - 1]
+
+
+def _before(hooks, method, url):
+    info = instrument.RequestInfo(method, url)
+    info.timings['dns'] = 0.0
+    # Filled in by the trace callbacks, for the last attempt.
+    info.trace = {'sent': 0, 'received': 0, 'ttfb': None}
+    for hook in hooks:
+        hook.before(info)
+    return info
+
+
+def _after(hooks, info, attempt, status_code=None, error=None):
+    trace = info.trace
+    info.finish(attempt, status_code, trace['sent'], trace['received'],
+                trace['ttfb'], error)
+    for hook in hooks:
+        hook.after(info)
+
+
+def _trace_config():
+    """Time the DNS resolutions, the new connections and the first byte of
+    the calls made with a `RequestInfo` as `trace_request_ctx`."""
+    config = aiohttp.TraceConfig()
+
+    def started(name):
+        async def callback(session, context, params):
+            # pylint: disable=unused-argument
+            if context.trace_request_ctx:
+                setattr(context, name, time.time())
+        return callback
+
+    def ended(name, key):
+        async def callback(session, context, params):
+            # pylint: disable=unused-argument
+            info = context.trace_request_ctx
+            if info and hasattr(context, name):
+                info.timings[key] += time.time() - getattr(context, name)
+        return callback
+
+    async def on_request_start(session, context, params):
+        # pylint: disable=unused-argument
+        info = context.trace_request_ctx
+        if info:
+            context.request_start = time.time()
+            info.trace.update(sent=0, received=0, ttfb=None)
+
+    async def on_request_end(session, context, params):
+        # pylint: disable=unused-argument
+        info = context.trace_request_ctx
+        if info:
+            info.trace['ttfb'] = time.time() - context.request_start
+
+    def counted(key):
+        async def callback(session, context, params):
+            # pylint: disable=unused-argument
+            info = context.trace_request_ctx
+            if info:
+                info.trace[key] += len(params.chunk)
+        return callback
+
+    config.on_dns_resolvehost_start.append(started('dns_start'))
+    config.on_dns_resolvehost_end.append(ended('dns_start', 'dns'))
+    config.on_connection_create_start.append(started('connect_start'))
+    config.on_connection_create_end.append(ended('connect_start', 'connect'))
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_end)
+    config.on_request_chunk_sent.append(counted('sent'))
+    config.on_response_chunk_received.append(counted('received'))
+    return config
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: bulk.py
+Description: Bulk deletion of persisted data for the Python SDK of the
+    Cognitive Face API.
+"""
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import face_list
+from . import person
+from . import person_group
+from . import util
+from .util import CognitiveFaceException
+
+
+class Deletion(namedtuple('Deletion', ['kind', 'ids'])):
+    """One entity to delete.
+
+    Attributes:
+        kind: One of `person_group`, `person`, `person_face`, `face_list` and
+            `face_list_face`.
+        ids: The identifiers given to the matching `delete` function, e.g.
+            `(person_group_id, person_id)` for a person.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return '{} {}'.format(self.kind.replace('_', ' '), '/'.join(self.ids))
+
+    def execute(self):
+        """Delete the entity."""
+        return _DELETE[self.kind](*self.ids)
+
+
+_DELETE = {
+    'person_group': person_group.delete,
+    'person': person.delete,
+    'person_face': person.delete_face,
+    'face_list': face_list.delete,
+    'face_list_face': face_list.delete_face,
+}
+
+
+def person_groups(select=None):
+    """Plan the deletion of person groups, and of their persons and faces.
+
+    Args:
+        select: Optional predicate given each person group as returned by
+            `person_group.lists`, only the groups it accepts are deleted.
+
+    Returns:
+        A list of `Deletion`.
+    """
+    return [Deletion('person_group', (group['personGroupId'],))
+            for group in person_group.iter_lists()
+            if select is None or select(group)]
+
+
+def persons(person_group_id, select=None):
+    """Plan the deletion of persons of a person group, and of their faces.
+
+    Args:
+        person_group_id: The person group holding the persons.
+        select: Optional predicate given each person as returned by
+            `person.lists`.
+
+    Returns:
+        A list of `Deletion`.
+    """
+    return [Deletion('person', (person_group_id, entry['personId']))
+            for entry in person.iter_lists(person_group_id)
+            if select is None or select(entry)]
+
+
+def person_faces(person_group_id, select=None):
+    """Plan the deletion of persisted faces of the persons of a person group.
+
+    Args:
+        person_group_id: The person group holding the persons.
+        select: Optional predicate given each person as returned by
+            `person.lists` and the persisted face id, e.g. to keep a face
+            per person.
+
+    Returns:
+        A list of `Deletion`.
+    """
+    return [Deletion('person_face', (person_group_id, entry['personId'],
+                                     persisted_face_id))
+            for entry in person.iter_lists(person_group_id)
+            for persisted_face_id in entry.get('persistedFaceIds', [])
+            if select is None or select(entry, persisted_face_id)]
+
+
+def face_lists(select=None):
+    """Plan the deletion of face lists, and of their faces.
+
+    Args:
+        select: Optional predicate given each face list as returned by
+            `face_list.lists`.
+
+    Returns:
+        A list of `Deletion`.
+    """
+    return [Deletion('face_list', (entry['faceListId'],))
+            for entry in face_list.lists()
+            if select is None or select(entry)]
+
+
+def face_list_faces(face_list_id, select=None):
+    """Plan the deletion of persisted faces of a face list.
+
+    Args:
+        face_list_id: The face list holding the faces.
+        select: Optional predicate given each face as listed in the
+            `persistedFaces` of `face_list.get`.
+
+    Returns:
+        A list of `Deletion`.
+    """
+    return [Deletion('face_list_face', (face_list_id,
+                                        face['persistedFaceId']))
+            for face in face_list.get(face_list_id).get('persistedFaces', [])
+            if select is None or select(face)]
+
+
+def print_progress(done, total, deletion, error):
+    """Default progress callback of `BulkDeleter`, prints every deletion."""
+    if error is None:
+        print('[{}/{}] Deleted {}'.format(done, total, deletion))
+    else:
+        print('[{}/{}] Failed to delete {}: {}'.format(done, total, deletion,
+                                                       error))
+
+
+class BulkDeleter(object):
+    """Run planned deletions concurrently.
+
+    Calls go through `util.request`, so they are paced by the limiter
+    installed with `util.RateLimit.set` and throttled calls are retried by
+    the policy installed with `util.Retry.set`: the deletions complete as
+    fast as the quota allows. Entities which are already gone count as
+    deleted, so an interrupted run can simply be planned and run again.
+
+    Attributes:
+        workers: Maximum number of deletions in flight.
+        progress: Callable given the number of completed deletions, their
+            total, the `Deletion` and the exception when it failed, or None.
+    """
+
+    def __init__(self, workers=8, progress=print_progress):
+        self.workers = workers
+        self.progress = progress
+
+    def run(self, deletions, dry_run=False):
+        """Delete the entities, or only list them.
+
+        Args:
+            deletions: `Deletion`s as planned by e.g. `person_groups`.
+            dry_run: List what would be deleted and delete nothing.
+
+        Returns:
+            A dict with the number of `deleted` entities, the `failed`
+            deletions as `(deletion, exception)` pairs and the `elapsed`
+            seconds.
+        """
+        deletions = list(deletions)
+        report = {'deleted': 0, 'failed': [], 'elapsed': 0.0}
+        if dry_run:
+            for deletion in deletions:
+                print('Would delete {}'.format(deletion))
+            print('{} deletions planned'.format(len(deletions)))
+            return report
+
+        start = time.time()
+        delete_one = util.propagate(_delete)
+        pending = {}
+        remaining = iter(deletions)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                # Keep a bounded window of deletions in flight.
+                for deletion in remaining:
+                    pending[executor.submit(delete_one, deletion)] = deletion
+                    if len(pending) >= 2 * self.workers:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    deletion = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        report['deleted'] += 1
+                    else:
+                        report['failed'].append((deletion, error))
+                    completed = report['deleted'] + len(report['failed'])
+                    if self.progress is not None:
+                        self.progress(completed, len(deletions), deletion,
+                                      error)
+        report['elapsed'] = time.time() - start
+        return report
+
+
+def _delete(deletion):
+    try:
+        deletion.execute()
+    except CognitiveFaceException as exc:
+        # Deleted by an earlier attempt or concurrently, which is the goal.
+        if exc.status_code != 404:
+            raise
+
+
+def delete(deletions, workers=8, dry_run=False, progress=print_progress):
+    """Run planned deletions, see `BulkDeleter.run`."""
+    return BulkDeleter(workers, progress).run(deletions, dry_run)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: client.py
+Description: Client objects of the Python SDK of the Cognitive Face API, each
+    with its own subscription, endpoint and resources.
+"""
+import contextlib
+import inspect
+
+from . import bulk
+from . import face
+from . import face_list
+from . import person
+from . import person_group
+from . import training
+from . import util
+
+_CURRENT = util.context_var('cognitive_face_client')
+
+
+class Client(object):
+    """A subscription to the Cognitive Face API, with its own settings, so
+    that one process can call the API for any number of subscriptions or
+    regions at once.
+
+    The API is called through the same sections as the package, e.g.
+    `client.person_group.create('group')`, or by calling the functions of the
+    package while the client is active, e.g. in `with client.activate():`.
+    The settings left to None fall back to the process-wide ones (`util.Key`,
+    `util._BASE_URL`, `util.Session`, `util.RateLimit`, `util.Retry`,
+    `util.Cache` and `util.Metadata`), which are what the functions of the
+    package use when no client is active.
+
+    Threads started by the SDK (e.g. `face.identify_many`) inherit the active
+    client. Hand the callables given to other threads through
+    `util.propagate`. The coroutines of `cognitive_face.aio` use the client
+    active in their task.
+
+    Attributes:
+        key: The Subscription Key.
+        base_url: The base URL of the API, ending with a slash.
+        pool: A `util.ConnectionPool`. The process-wide pool can be shared
+            by all the clients, the key is sent with every call.
+        limiter: A rate limiter, e.g. a `rate_limit.RateLimiter`.
+        retry: A retry policy, e.g. a `retry.RetryPolicy`.
+        cache: A cache of `face.detect` results, e.g. a
+            `detect_cache.DetectCache`.
+        metadata: A cache of metadata, e.g. a
+            `metadata_cache.MetadataCache`.
+    """
+
+    def __init__(self, key=None, base_url=None, pool=None, limiter=None,
+                 retry=None, cache=None, metadata=None):
+        # pylint: disable=too-many-arguments
+        self.key = key
+        self.base_url = base_url
+        self.pool = pool
+        self.limiter = limiter
+        self.retry = retry
+        self.cache = cache
+        self.metadata = metadata
+        self.bulk = _Section(self, bulk)
+        self.face = _Section(self, face)
+        self.face_list = _Section(self, face_list)
+        self.person = _Section(self, person)
+        self.person_group = _Section(self, person_group)
+        self.training = _Section(self, training)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make the client the current one of the context (thread or task)
+        while the context manager is open."""
+        token = _CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT.reset(token)
+
+    def close(self):
+        """Close the connection pool of the client, if any."""
+        if self.pool is not None:
+            self.pool.close()
+
+
+class _Section(object):
+    """The functions of a module of the package, called with the client
+    active."""
+
+    def __init__(self, client, module):
+        self._client = client
+        self._module = module
+
+    def __getattr__(self, name):
+        func = getattr(self._module, name)
+        if not inspect.isfunction(func):
+            return func
+
+        def call(*args, **kwargs):
+            with self._client.activate():
+                result = func(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return _iterate(self._client, result)
+            return result
+        call.__name__ = func.__name__
+        call.__doc__ = func.__doc__
+        return call
+
+
+def _iterate(client, generator):
+    """Run each step of a generator, e.g. of `person.iter_lists`, with the
+    client active."""
+    while True:
+        with client.activate():
+            try:
+                entry = next(generator)
+            except StopIteration:
+                return
+        yield entry
+
+
+_DEFAULT = Client()
+
+
+def current():
+    """Return the client active in the current context, or the default
+    client, whose settings are all the process-wide ones."""
+    client = _CURRENT.get()
+    return _DEFAULT if client is None else client
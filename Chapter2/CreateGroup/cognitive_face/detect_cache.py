@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: detect_cache.py
+Description: Persistent cache of `face.detect` results for the Python SDK of
+    the Cognitive Face API.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# `face_id`s returned by `face.detect` expire 24 hours after the detection.
+FACE_ID_TTL = 23 * 3600
+
+
+class DetectCache(object):
+    """SQLite backed cache of `face.detect` results keyed by a hash of the
+    image content, of the detection parameters and of where the detection is
+    sent.
+
+    Only images uploaded as content (file paths and file-like objects) are
+    cached, URLs are always sent. `face_id`s only exist in the region and for
+    the Subscription Key which detected them, so each full URL and key has
+    its own results, and the calls whose region is picked by a router (see
+    `util.destination`) are always sent. Install it with
+    `cognitive_face.util.Cache.set`.
+
+    Attributes:
+        path: Path of the SQLite database, created when missing.
+        ttl: Seconds a result holding `face_id`s is served from the cache.
+            Results requested without `face_id`s never expire.
+        max_entries: Maximum number of results kept, the least recently used
+            ones are evicted first.
+    """
+
+    def __init__(self, path, ttl=FACE_ID_TTL, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS detect ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, '
+                'expires REAL, last_used REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS detect_last_used '
+                'ON detect (last_used)')
+
+    @staticmethod
+    def key(data, params, url, subscription_key):
+        """Return the cache key of a detection.
+
+        Args:
+            data: The image content as bytes or as a file-like object which
+                can seek (see `util.rewindable`), read in chunks and rewound.
+            params: The query parameters of the detection.
+            url: The full URL the detection is sent to.
+            subscription_key: The Subscription Key it is sent with.
+        """
+        digest = hashlib.sha256()
+        for part in (url, subscription_key or '',
+                     json.dumps(params, sort_keys=True)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        if hasattr(data, 'read'):
+            position = data.tell()
+            for chunk in iter(lambda: data.read(1 << 16), b''):
+                digest.update(chunk)
+            data.seek(position)
+        else:
+            digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached result of a key, None on a miss."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT result, expires FROM detect WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                self._conn.execute('DELETE FROM detect WHERE key = ?', (key,))
+                return None
+            self._conn.execute(
+                'UPDATE detect SET last_used = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, result, expires=True):
+        """Store a result, evicting the least recently used ones.
+
+        Args:
+            key: The key returned by `key`.
+            result: The result of `face.detect`.
+            expires: Whether the result holds `face_id`s and must expire.
+        """
+        now = time.time()
+        expiry = now + self.ttl if expires and self.ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO detect VALUES (?, ?, ?, ?)',
+                (key, json.dumps(result), expiry, now))
+            self._conn.execute(
+                'DELETE FROM detect WHERE key IN (SELECT key FROM detect '
+                'ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,))
+
+    def purge(self):
+        """Remove the expired results."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM detect WHERE expires <= ?',
+                               (time.time(),))
+
+    def clear(self):
+        """Remove all the results."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM detect')
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -4,8 +4,13 @@
 File: face.py
 Description: Face section of the Cognitive Face API.
 """
+from concurrent.futures import ThreadPoolExecutor
+
 from . import util
 
+# Maximum number of `face_ids` accepted by one call to `identify`.
+IDENTIFY_MAX_FACES = 10
+
 
 def detect(image, face_id=True, landmarks=False, attributes=''):
     """Detect human faces in an image and returns face locations, and
@@ -24,21 +29,37 @@ def detect(image, face_id=True, landmarks=False, attributes=''):
             Note that each face attribute analysis has additional
             computational and time cost.
 
+    When a cache is installed with `util.Cache.set`, the results of images
+    given as content are served from it, unless the region of the call is
+    picked by a router.
+
     Returns:
         An array of face entries ranked by face rectangle size in descending
         order. An empty response indicates no faces detected. A face entry may
         contain the corresponding values depending on input parameters.
     """
     url = 'detect'
-    headers, data, json = util.parse_image(image)
     params = {
         'returnFaceId': face_id and 'true' or 'false',
         'returnFaceLandmarks': landmarks and 'true' or 'false',
         'returnFaceAttributes': attributes,
     }
+    cache = util.Cache.get()
+    target = util.destination(url) if cache is not None else None
 
-    return util.request('POST', url, headers=headers, params=params, json=json,
-                        data=data)
+    with util.open_image(image) as (headers, data, json):
+        if target is None or data is None:
+            return util.request('POST', url, headers=headers, params=params,
+                                json=json, data=data)
+
+        key = cache.key(data, params, *target)
+        result = cache.get(key)
+        if result is None:
+            result = util.request('POST', url, headers=headers, params=params,
+                                  json=json, data=data)
+            cache.put(key, result, expires=face_id)
+
+    return result
 
 
 def find_similars(face_id, face_list_id=None, face_ids=None,
@@ -130,6 +151,49 @@ def identify(face_ids, person_group_id, max_candidates_return=1,
     return util.request('POST', url, json=json)
 
 
+def identify_many(face_ids, person_group_id, max_candidates_return=1,
+                  threshold=None, workers=4):
+    """Identify any number of unknown faces from a person group.
+
+    The `face_ids` are split into chunks of `IDENTIFY_MAX_FACES` which are
+    identified concurrently by calls to `identify`.
+
+    Args:
+        face_ids: An array of query `face_id`s, created by the `face.detect`.
+        person_group_id: `person_group_id` of the target person group, created
+            by `person_group.create`.
+        max_candidates_return: Optional parameter. The range of
+            `max_candidates_return` is between 1 and 5 (default is 1).
+        threshold: Optional parameter. Confidence threshold of identification,
+            used to judge whether one face belongs to one person. The range of
+            confidence threshold is [0, 1] (default specified by algorithm).
+        workers: Optional parameter. Maximum number of chunks identified at
+            the same time (default is 4).
+
+    Returns:
+        The identified candidate person(s) for each query face, in the order
+        of `face_ids`.
+    """
+    chunks = [face_ids[idx:idx + IDENTIFY_MAX_FACES]
+              for idx in range(0, len(face_ids), IDENTIFY_MAX_FACES)]
+
+    def identify_chunk(chunk):
+        res = identify(chunk, person_group_id, max_candidates_return,
+                       threshold)
+        # Matched by faceId, whatever the order of the response.
+        entries = dict((entry['faceId'], entry) for entry in res)
+        return [entries[face_id] for face_id in chunk]
+
+    if len(chunks) > 1 and workers > 1:
+        with ThreadPoolExecutor(min(workers, len(chunks))) as executor:
+            results = list(executor.map(util.propagate(identify_chunk),
+                                        chunks))
+    else:
+        results = [identify_chunk(chunk) for chunk in chunks]
+
+    return [entry for result in results for entry in result]
+
+
 def verify(face_id, another_face_id=None, person_group_id=None,
            person_id=None):
     """Verify whether two faces belong to a same person or whether one face
@@ -32,14 +32,14 @@ def add_face(image, face_list_id, user_data=None, target_face=None):
         A new `persisted_face_id`.
     """
     url = 'facelists/{}/persistedFaces'.format(face_list_id)
-    headers, data, json = util.parse_image(image)
     params = {
         'userData': user_data,
         'targetFace': target_face,
     }
 
-    return util.request('POST', url, headers=headers, params=params, json=json,
-                        data=data)
+    with util.open_image(image) as (headers, data, json):
+        return util.request('POST', url, headers=headers, params=params,
+                            json=json, data=data)
 
 
 def create(face_list_id, name=None, user_data=None):
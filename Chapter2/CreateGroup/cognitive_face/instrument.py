@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: instrument.py
+Description: Request instrumentation for the Python SDK of the Cognitive Face
+    API: hooks called around every request, and built-in aggregators.
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from . import util
+
+# Upper bounds in seconds of the histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+_LOGGER = logging.getLogger('cognitive_face')
+_LOCAL = threading.local()
+
+
+class RequestInfo(object):
+    """Describe one call to `util.request`, given to the hooks.
+
+    Attributes:
+        method: HTTP method.
+        url: Full URL.
+        endpoint: Endpoint template, e.g. `persongroups/{}/persons`.
+        start: Time at which the call started.
+        status_code: HTTP status code of the last attempt, None when no
+            response was received.
+        error: Exception raised by the last attempt, if any.
+        retries: Number of attempts after the first one.
+        bytes_sent: Size of the body of the last attempt.
+        bytes_received: Size of the response body of the last attempt.
+        timings: Seconds spent opening new connections, DNS resolution
+            included (`connect`), until the response headers of the last
+            attempt were received (`ttfb`) and in the whole call including
+            retries and throttling (`total`). The asyncio flavour also
+            reports the DNS resolution alone (`dns`).
+    """
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        self.endpoint = util.endpoint_template(url)
+        self.start = time.time()
+        self.status_code = None
+        self.error = None
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.timings = {'connect': 0.0, 'ttfb': None, 'total': None}
+        self._connect_start = connect_time()
+
+    def finish(self, retries, status_code=None, bytes_sent=0,
+               bytes_received=0, ttfb=None, error=None):
+        # pylint: disable=too-many-arguments
+        """Fill in the outcome of the call once it is over."""
+        self.retries = retries
+        self.status_code = status_code
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.error = error
+        self.timings['ttfb'] = ttfb
+        self.timings['connect'] += connect_time() - self._connect_start
+        self.timings['total'] = time.time() - self.start
+
+
+class Hook(object):
+    """Base class of the hooks installed with `util.Instrument.add`.
+
+    Hooks are called from the threads issuing the requests, so they must be
+    thread safe and fast.
+    """
+
+    def before(self, info):
+        """Called before the first attempt of a call.
+
+        Args:
+            info: The `RequestInfo` of the call, only its method, URL,
+                endpoint and start are set.
+        """
+
+    def after(self, info):
+        """Called once the call succeeded or gave up.
+
+        Args:
+            info: The complete `RequestInfo` of the call.
+        """
+
+
+class LogHook(Hook):
+    """Log every call to the `cognitive_face` logger."""
+
+    def __init__(self, level=logging.DEBUG):
+        self.level = level
+
+    def after(self, info):
+        _LOGGER.log(self.level, '%s %s %s %.1f ms, %d retries, %d/%d bytes',
+                    info.method, info.endpoint,
+                    info.status_code or type(info.error).__name__,
+                    info.timings['total'] * 1000, info.retries,
+                    info.bytes_sent, info.bytes_received)
+
+
+class Histogram(object):
+    """Counts of observed values per bucket, as Prometheus histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Count a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation within its bucket.
+
+        Args:
+            q: The quantile, from 0 to 1.
+
+        Returns:
+            The estimate, None when nothing was observed. Values above the
+            largest bucket are estimated as the largest bucket.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for idx, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if idx == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[idx - 1] if idx else 0.0
+                return lower + (self.buckets[idx] - lower) * (
+                    (rank - cumulative) / float(count))
+            cumulative += count
+        return self.buckets[-1]
+
+
+class Metrics(Hook):
+    """Aggregate counters and latency histograms per endpoint.
+
+    Counters: `requests_total` (per status), `retries_total`,
+    `bytes_sent_total` and `bytes_received_total`. Histograms:
+    `request_duration_seconds`, `time_to_first_byte_seconds` and
+    `connect_duration_seconds` (only for calls which opened connections).
+    Every metric is labelled with the method and the endpoint template.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def after(self, info):
+        labels = (('method', info.method), ('endpoint', info.endpoint))
+        status = str(info.status_code or 'error')
+        timings = info.timings
+        with self._lock:
+            self._incr('requests_total', labels + (('status', status),))
+            self._incr('retries_total', labels, info.retries)
+            self._incr('bytes_sent_total', labels, info.bytes_sent)
+            self._incr('bytes_received_total', labels, info.bytes_received)
+            self._observe('request_duration_seconds', labels,
+                          timings['total'])
+            if timings['ttfb'] is not None:
+                self._observe('time_to_first_byte_seconds', labels,
+                              timings['ttfb'])
+            if timings['connect']:
+                self._observe('connect_duration_seconds', labels,
+                              timings['connect'])
+
+    def reset(self):
+        """Forget everything aggregated so far."""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def to_json(self):
+        """Return the metrics as a JSON serializable dict, histograms are
+        summarized with their estimated p50, p95 and p99."""
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(
+                        self.counters.items())],
+                'histograms': [{
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99),
+                } for (name, labels), histogram in sorted(
+                    self.histograms.items())],
+            }
+
+    def to_prometheus(self, prefix='cognitive_face_'):
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted(set(n for n, _ in self.counters)):
+                lines.append('# TYPE {}{} counter'.format(prefix, name))
+                for (other, labels), value in sorted(self.counters.items()):
+                    if other == name:
+                        lines.append('{}{}{} {}'.format(
+                            prefix, name, _labels(labels), value))
+            for name in sorted(set(n for n, _ in self.histograms)):
+                lines.append('# TYPE {}{} histogram'.format(prefix, name))
+                for (other, labels), histogram in sorted(
+                        self.histograms.items()):
+                    if other != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(
+                            histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append('{}{}_bucket{} {}'.format(
+                            prefix, name,
+                            _labels(labels + (('le', str(bound)),)),
+                            cumulative))
+                    lines.append('{}{}_sum{} {}'.format(
+                        prefix, name, _labels(labels), histogram.sum))
+                    lines.append('{}{}_count{} {}'.format(
+                        prefix, name, _labels(labels), histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Write the metrics to a file, as JSON when its name ends with
+        `.json` and in the Prometheus text format otherwise."""
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_json(), f, indent=4)
+            else:
+                f.write(self.to_prometheus())
+
+    def _incr(self, name, labels, value=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def _observe(self, name, labels, value):
+        key = (name, labels)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(self.buckets)
+        self.histograms[key].observe(value)
+
+
+def _labels(labels):
+    return '{' + ','.join('{}="{}"'.format(
+        name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                          for name, value in labels) + '}'
+
+
+def connect_time():
+    """Seconds the current thread spent opening connections so far."""
+    return getattr(_LOCAL, 'connect', 0.0)
+
+
+def _timed_connect(connect, conn):
+    start = time.time()
+    try:
+        connect(conn)
+    finally:
+        _LOCAL.connect = connect_time() + time.time() - start
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        _timed_connect(HTTPConnection.connect, self)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _timed_connect(HTTPSConnection.connect, self)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter` accounting the time spent opening connections, see
+    `connect_time`."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        # pylint: disable=arguments-differ
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: local_index.py
+Description: Local identification index for the Python SDK of the Cognitive
+    Face API, answering identify queries without a network round-trip.
+    Requires NumPy (`pip install numpy`).
+"""
+import io
+import json
+
+import numpy as np
+
+from . import face
+
+# Number of faces up to which `LocalIndex.build` keeps the exact full scan:
+# below it, partitions lose recall without making queries faster.
+EXACT_MAX_FACES = 20000
+
+
+class ThumbnailEmbedding(object):
+    """Crude embedding provider: the normalized grayscale thumbnail of the
+    face. Requires Pillow.
+
+    It recognizes the very same pictures and little else. It is meant for
+    tests and as an example of the provider interface; plug in a real face
+    embedding model for anything else.
+
+    An embedding provider is any callable given an image (a file path, a
+    file-like object or bytes) and an optional face rectangle, as returned
+    by `face.detect`, which returns a 1-D vector of fixed dimension.
+    """
+
+    def __init__(self, size=16):
+        self.size = size
+
+    def __call__(self, image, face_rectangle=None):
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+        if isinstance(image, bytes):
+            image = io.BytesIO(image)
+        img = Image.open(image)
+        if face_rectangle is not None:
+            img = img.crop((
+                face_rectangle['left'], face_rectangle['top'],
+                face_rectangle['left'] + face_rectangle['width'],
+                face_rectangle['top'] + face_rectangle['height']))
+        img = img.convert('L').resize((self.size, self.size), Image.BILINEAR)
+        vector = np.asarray(img, dtype=np.float32).ravel()
+        return vector - vector.mean()
+
+
+class LocalIndex(object):
+    """Nearest-neighbor index of the faces of a person group.
+
+    Face vectors are L2 normalized, so the confidence of a candidate is the
+    cosine similarity (clipped to [0, 1]) of the query with the closest face
+    of the person. Queries are answered with one matrix product over all the
+    faces, or, once `build` partitioned a large group (IVF), over the faces
+    of the `probes` partitions whose centroids are the closest.
+
+    Attributes:
+        embed: The embedding provider, see `ThumbnailEmbedding`.
+        person_group_id: Optional person group the faces were enrolled in,
+            used by `identify` to fall back to `face.identify`.
+        threshold: Confidence below which `identify` falls back.
+        probes: Number of partitions searched per query when partitioned.
+    """
+
+    def __init__(self, embed=None, person_group_id=None, threshold=0.8,
+                 probes=4):
+        self.embed = embed
+        self.person_group_id = person_group_id
+        self.threshold = threshold
+        self.probes = probes
+        self.person_ids = []
+        self._person_idx = {}
+        self._pending = []
+        self._vectors = None
+        self._owners = np.zeros(0, dtype=np.int32)
+        self._centroids = None
+        self._partitions = None
+        self._grouped = None
+
+    def __len__(self):
+        self._flush()
+        return len(self._owners)
+
+    def add(self, person_id, image=None, vector=None, face_rectangle=None):
+        """Add a face of a person.
+
+        Args:
+            person_id: The `person_id` of the person in the person group.
+            image: The image of the face, embedded with `embed`.
+            vector: The embedding of the face, instead of `image`.
+            face_rectangle: Optional rectangle of the face in `image`.
+        """
+        if vector is None:
+            vector = self.embed(image, face_rectangle)
+        if person_id not in self._person_idx:
+            self._person_idx[person_id] = len(self.person_ids)
+            self.person_ids.append(person_id)
+        self._pending.append((self._person_idx[person_id],
+                              np.asarray(vector, dtype=np.float32)))
+        # The partitions are stale once faces are added.
+        self._centroids = self._partitions = None
+
+    def build(self, partitions=None, iterations=10, seed=0):
+        """Partition the faces with spherical k-means for faster queries.
+
+        Args:
+            partitions: Number of partitions. By default, none up to
+                `EXACT_MAX_FACES` faces and about the square root of the
+                number of faces above. Below 2, queries scan all the faces,
+                which is exact and the fastest up to tens of thousands of
+                faces.
+            iterations: Number of k-means iterations.
+            seed: Seed of the initial centroids, for reproducible builds.
+        """
+        self._flush()
+        if partitions is None:
+            partitions = (int(np.sqrt(len(self._owners)))
+                          if len(self._owners) > EXACT_MAX_FACES else 1)
+        partitions = min(partitions, len(self._owners))
+        if partitions < 2:
+            self._centroids = self._partitions = None
+            return
+        rng = np.random.RandomState(seed)
+        centroids = self._vectors[rng.choice(len(self._owners), partitions,
+                                             replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(self._vectors.dot(centroids.T), axis=1)
+            for idx in range(partitions):
+                members = self._vectors[assignment == idx]
+                if len(members):
+                    centroids[idx] = _normalize(members.sum(axis=0))
+        assignment = np.argmax(self._vectors.dot(centroids.T), axis=1)
+        self._centroids = centroids
+        self._partitions = [np.flatnonzero(assignment == idx)
+                            for idx in range(partitions)]
+
+    def search(self, vectors, k=1):
+        """Return the top `k` persons of each query vector.
+
+        Args:
+            vectors: A 2-D array of query embeddings, one per row.
+            k: Maximum number of candidates per query.
+
+        Returns:
+            A list with, per query, a list of candidates
+            (`{'personId': ..., 'confidence': ...}`) by decreasing
+            confidence, as the `candidates` of `face.identify`.
+        """
+        self._flush()
+        queries = _normalize(np.atleast_2d(np.asarray(vectors,
+                                                      dtype=np.float32)))
+        if not len(self._owners):
+            return [[] for _ in queries]
+        if self._centroids is None:
+            # Best score of each person for all the queries at once.
+            starts, persons = self._grouped
+            scores = np.maximum.reduceat(queries.dot(self._vectors.T), starts,
+                                         axis=1)
+            k = min(k, len(persons))
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            return [[{
+                'personId': self.person_ids[persons[idx]],
+                'confidence': float(min(1.0, max(0.0, row[idx]))),
+            } for idx in sorted(top_row, key=lambda idx, row=row: -row[idx])]
+                    for row, top_row in zip(scores, top)]
+
+        results = []
+        probes = min(self.probes, len(self._partitions))
+        nearest = np.argsort(-queries.dot(self._centroids.T), axis=1)
+        for query, order in zip(queries, nearest[:, :probes]):
+            faces = np.concatenate([self._partitions[idx] for idx in order])
+            results.append(self._candidates(
+                faces, self._vectors[faces].dot(query), k))
+        return results
+
+    def identify(self, images, max_candidates_return=1, fallback=True):
+        """Identify the main face of each image, locally when confident.
+
+        Args:
+            images: A list of file paths, file-like objects or bytes.
+            max_candidates_return: Maximum number of candidates per image.
+            fallback: Detect and identify the face remotely, with
+                `face.detect` and `face.identify`, when the local confidence
+                is below `threshold` and `person_group_id` is set.
+
+        Returns:
+            A list with, per image, its list of candidates.
+        """
+        results = self.search([self.embed(image) for image in images],
+                              max_candidates_return)
+        if not fallback or self.person_group_id is None:
+            return results
+        for idx, candidates in enumerate(results):
+            if candidates and candidates[0]['confidence'] >= self.threshold:
+                continue
+            image = images[idx]
+            if isinstance(image, bytes):
+                image = io.BytesIO(image)
+            elif hasattr(image, 'seek'):
+                image.seek(0)
+            faces = face.detect(image)
+            if faces:
+                results[idx] = face.identify(
+                    [faces[0]['faceId']], self.person_group_id,
+                    max_candidates_return)[0]['candidates']
+        return results
+
+    def save(self, path):
+        """Save the faces and the partitions in a NumPy `.npz` file."""
+        self._flush()
+        arrays = {
+            'vectors': self._vectors,
+            'owners': self._owners,
+            'meta': np.frombuffer(json.dumps({
+                'person_ids': self.person_ids,
+                'person_group_id': self.person_group_id,
+                'threshold': self.threshold,
+                'probes': self.probes,
+            }).encode('utf-8'), dtype=np.uint8),
+        }
+        if self._centroids is not None:
+            arrays['centroids'] = self._centroids
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path, embed=None):
+        """Load an index saved with `save`."""
+        with np.load(path) as arrays:
+            meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+            index = cls(embed, meta['person_group_id'], meta['threshold'],
+                        meta['probes'])
+            index.person_ids = meta['person_ids']
+            index._person_idx = dict(
+                (person_id, idx)
+                for idx, person_id in enumerate(index.person_ids))
+            index._vectors = arrays['vectors']
+            index._owners = arrays['owners']
+            index._group()
+            if 'centroids' in arrays:
+                index._centroids = arrays['centroids']
+                assignment = np.argmax(
+                    index._vectors.dot(index._centroids.T), axis=1)
+                index._partitions = [
+                    np.flatnonzero(assignment == idx)
+                    for idx in range(len(index._centroids))]
+        return index
+
+    def _flush(self):
+        if not self._pending:
+            return
+        owners, vectors = zip(*self._pending)
+        self._pending = []
+        vectors = _normalize(np.vstack(vectors))
+        if self._vectors is not None:
+            vectors = np.vstack((self._vectors, vectors))
+        self._vectors = vectors
+        self._owners = np.concatenate(
+            (self._owners, np.asarray(owners, dtype=np.int32)))
+        self._group()
+
+    def _group(self):
+        """Sort the faces by person for `np.maximum.reduceat`."""
+        order = np.argsort(self._owners, kind='mergesort')
+        self._vectors = self._vectors[order]
+        self._owners = owners = self._owners[order]
+        starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+        self._grouped = (starts, owners[starts])
+
+    def _candidates(self, faces, scores, k):
+        """Best score per person among `faces`, top `k` persons."""
+        owners = self._owners[faces]
+        # Sort by person then by decreasing score, keep each person's first.
+        order = np.lexsort((-scores, owners))
+        _, first = np.unique(owners[order], return_index=True)
+        best = order[first]
+        top = best[np.argsort(-scores[best], kind='mergesort')[:k]]
+        return [{
+            'personId': self.person_ids[owners[idx]],
+            'confidence': float(min(1.0, max(0.0, scores[idx]))),
+        } for idx in top]
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
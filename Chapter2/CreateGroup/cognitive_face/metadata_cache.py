@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: metadata_cache.py
+Description: In-memory cache of the metadata of persons, person groups and
+    face lists for the Python SDK of the Cognitive Face API.
+"""
+import copy
+import hashlib
+import threading
+
+from . import util
+from .single_flight import READ_ONLY_POSTS
+
+# Seconds the responses of each endpoint are kept by default.
+TTLS = {
+    'persongroups/{}': 300,
+    'persongroups/{}/persons': 60,
+    'persongroups/{}/persons/{}': 300,
+    'facelists/{}': 60,
+}
+
+
+class MetadataCache(object):
+    """Read-through cache of the GETs of metadata, e.g. to map the
+    `personId`s returned by `face.identify` to names with `person.get`.
+
+    Calls which modify something (e.g. `person.update`, `person.add_face`,
+    `face_list.update`) drop the kept responses of the resources on their
+    path and of the listings of their collections, e.g. `person.add_face`
+    drops the person, its person group and the listings of its persons.
+    Changes made by other processes are seen once the responses expire.
+    The responses are kept per base URL and Subscription Key, so one cache
+    can be shared by clients and regions. Install it with
+    `util.Metadata.set`.
+
+    Attributes:
+        ttls: Seconds the responses are kept per endpoint, as returned by
+            `util.endpoint_template`. The GETs of other endpoints are sent.
+        max_entries: Maximum number of responses kept, the least recently
+            used ones are evicted first.
+        stats: Number of GETs served from the cache (`hits`) and sent
+            (`misses`).
+    """
+
+    def __init__(self, ttls=None, max_entries=10000):
+        self.ttls = dict(TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        self._entries = util.TTLCache(0, max_entries)
+        self._generation = 0
+
+    @staticmethod
+    def key(url, params=None, headers=None):
+        """Return the cache key of a GET: a hash of its base URL and
+        Subscription Key, then its path and sorted parameters.
+
+        Args:
+            url: The full URL of the GET.
+            params: Its query parameters.
+            headers: Its HTTP headers, holding the Subscription Key.
+        """
+        parts = url.split('?', 1)[0].split('/face/v1.0/', 1)
+        base, path = parts if len(parts) == 2 else ('', parts[0])
+        digest = hashlib.sha256()
+        for part in (base, (headers or {}).get('Ocp-Apim-Subscription-Key')
+                     or ''):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        query = '&'.join('{}={}'.format(name, value)
+                         for name, value in sorted((params or {}).items())
+                         if value is not None)
+        return '{}\0{}?{}'.format(digest.hexdigest()[:32], path.strip('/'),
+                                  query)
+
+    def read(self, url, params, headers, load):
+        """Return the response of a GET, loaded with `load` on a miss.
+
+        Args:
+            url: The full URL of the GET, see `util.prepare_request`.
+            params: Its query parameters.
+            headers: Its HTTP headers.
+            load: Callable sending the GET.
+        """
+        entry = self._lookup(url, params, headers)
+        if entry is None:
+            return load()
+        if entry[3] is not None:
+            return entry[3]
+        result = load()
+        self._keep(entry, result)
+        return result
+
+    async def read_async(self, url, params, headers, load):
+        """Coroutine version of `read`, `load` returns an awaitable."""
+        entry = self._lookup(url, params, headers)
+        if entry is None:
+            return await load()
+        if entry[3] is not None:
+            return entry[3]
+        result = await load()
+        self._keep(entry, result)
+        return result
+
+    def _lookup(self, url, params, headers):
+        """Return the key, TTL and generation of a GET with a copy of its
+        kept response (None on a miss), or None when it is not cached."""
+        ttl = self.ttls.get(util.endpoint_template(url))
+        if not ttl:
+            return None
+        key = self.key(url, params, headers)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self.stats['hits'] += 1
+                result = copy.deepcopy(result)
+            else:
+                self.stats['misses'] += 1
+            return key, ttl, self._generation, result
+
+    def _keep(self, entry, result):
+        key, ttl, generation, _ = entry
+        with self._lock:
+            # Not kept when a modification was made during the call.
+            if generation == self._generation:
+                self._entries.put(key, copy.deepcopy(result), ttl)
+
+    def invalidate(self, method, url, headers):
+        """Drop the responses a call to `url` with `headers` may have made
+        stale."""
+        if (method == 'POST' and
+                util.endpoint_template(url) in READ_ONLY_POSTS):
+            return
+        prefix, path = self.key(url, headers=headers).rstrip('?').split(
+            '\0', 1)
+        segments = path.split('/')
+        with self._lock:
+            self._generation += 1
+            for idx in range(1, len(segments) + 1):
+                self._entries.invalidate(
+                    '{}\0{}?'.format(prefix, '/'.join(segments[:idx])))
+            if method == 'DELETE':
+                self._entries.invalidate('{}\0{}/'.format(prefix, path))
+
+    def clear(self):
+        """Drop all the responses."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
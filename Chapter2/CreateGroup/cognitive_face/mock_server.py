@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: mock_server.py
+Description: Local stand-in for the Cognitive Face API, keeping its state in
+    memory, for load tests, benchmarks and offline regression tests.
+
+Usage: python -m cognitive_face.mock_server [-p <port>] [-l <latency>]
+    [-e <error_rate>] [-t <calls_per_second>] [-d <train_duration>]
+
+Faces are matched by the content of the images: an image detected or
+identified matches the persisted faces added from the very same bytes (or
+URL). Every image contains exactly one face.
+"""
+import getopt
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+from . import util
+
+
+class MockError(Exception):
+    """Error answered by the mock server in the format of the API."""
+
+    def __init__(self, status_code, code, message):
+        super(MockError, self).__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+class MockFaceServer(object):
+    """In-memory implementation of the endpoints used by the SDK.
+
+    Attributes:
+        latency: Seconds added to every response.
+        latency_jitter: Random seconds (uniform) added on top of `latency`.
+        error_rate: Probability of answering a call with a `500`.
+        rate: Optional calls per second above which calls are answered with a
+            `429` and a `Retry-After` header.
+        train_duration: Seconds a training stays `running`.
+        key: Optional Subscription Key required by every call.
+        stats: Number of calls per `(method, endpoint template)` and per
+            status code.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0,
+                 latency_jitter=0.0, error_rate=0.0, rate=None,
+                 train_duration=0.0, key=None):
+        # pylint: disable=too-many-arguments
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate = rate
+        self.train_duration = train_duration
+        self.key = key
+        self.stats = {}
+        self._lock = threading.RLock()
+        self._server = None
+        self._tokens = max(1.0, rate) if rate else 0
+        self._stamp = time.time()
+        self.reset()
+
+    @property
+    def base_url(self):
+        """Base URL to give to `cognitive_face.util._BASE_URL`."""
+        return 'http://{}:{}/face/v1.0/'.format(self.host, self.port)
+
+    def start(self):
+        """Serve in a background thread."""
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        thread = threading.Thread(target=self._server.serve_forever,
+                                  name='MockFaceServer')
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        """Forget all the persisted data and the statistics."""
+        with self._lock:
+            self.person_groups = {}
+            self.face_lists = {}
+            self.faces = {}
+            self.stats = {}
+
+    def handle(self, method, path, query, headers, body):
+        # pylint: disable=too-many-arguments
+        """Answer one call, returns the status code, headers and payload."""
+        endpoint = util.endpoint_template(path.split('/face/v1.0/', 1)[-1])
+        delay = self.latency + random.uniform(0, self.latency_jitter)
+        if delay:
+            time.sleep(delay)
+        try:
+            if self.key is not None and (
+                    headers.get('Ocp-Apim-Subscription-Key') != self.key):
+                raise MockError(401, 'Unspecified', 'Access denied due to '
+                                'invalid subscription key.')
+            retry_after = self._throttle()
+            if retry_after is not None:
+                return self._count(method, endpoint, 429, {
+                    'Retry-After': str(retry_after)}, {'error': {
+                        'code': 'RateLimitExceeded',
+                        'message': 'Rate limit is exceeded. Try again in '
+                                   '{} seconds.'.format(retry_after)}})
+            if self.error_rate and random.random() < self.error_rate:
+                raise MockError(500, 'InternalServerError',
+                                'Injected failure.')
+            handler = _ROUTES.get((method, endpoint))
+            if handler is None:
+                raise MockError(404, 'ResourceNotFound',
+                                'Unknown endpoint {} {}.'.format(method,
+                                                                 endpoint))
+            ids = [segment for segment, template in zip(
+                path.split('/face/v1.0/', 1)[-1].strip('/').split('/'),
+                endpoint.split('/')) if template == '{}']
+            params = dict((k, v[-1]) for k, v in query.items())
+            with self._lock:
+                status_code, payload = handler(self, ids, params, headers,
+                                               body)
+        except MockError as exc:
+            status_code, payload = exc.status_code, {
+                'error': {'code': exc.code, 'message': exc.message}}
+        return self._count(method, endpoint, status_code, {}, payload)
+
+    def _count(self, method, endpoint, status_code, headers, payload):
+        with self._lock:
+            for key in ((method, endpoint), status_code):
+                self.stats[key] = self.stats.get(key, 0) + 1
+        return status_code, headers, payload
+
+    def _throttle(self):
+        """Token bucket of one second of calls (at least one call), returns
+        the seconds to wait when it is empty."""
+        if not self.rate:
+            return None
+        with self._lock:
+            now = time.time()
+            self._tokens = min(max(1.0, self.rate), self._tokens +
+                               (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return max(1, int((1 - self._tokens) / self.rate + 0.999))
+
+    # Faces.
+
+    def _image_hash(self, headers, body):
+        if headers.get('Content-Type', '').startswith('application/json'):
+            url = _json_body(body).get('url')
+            if not url:
+                raise MockError(400, 'InvalidURL', 'Invalid image URL.')
+            return hashlib.sha1(url.encode('utf-8')).hexdigest()
+        if not body:
+            raise MockError(400, 'InvalidImageSize', 'Image size is too '
+                            'small.')
+        return hashlib.sha1(body).hexdigest()
+
+    def _face_hash(self, face_id):
+        if face_id not in self.faces:
+            raise MockError(404, 'FaceNotFound', 'Face {} is not found or '
+                            'expired.'.format(face_id))
+        return self.faces[face_id]
+
+    def detect(self, ids, params, headers, body):
+        image_hash = self._image_hash(headers, body)
+        face = {'faceRectangle': {'top': 10, 'left': 10, 'width': 100,
+                                  'height': 100}}
+        if params.get('returnFaceId', 'true') == 'true':
+            face_id = str(uuid.uuid4())
+            self.faces[face_id] = image_hash
+            face['faceId'] = face_id
+        if params.get('returnFaceLandmarks') == 'true':
+            face['faceLandmarks'] = {}
+        if params.get('returnFaceAttributes'):
+            face['faceAttributes'] = dict(
+                (name, None) for name in
+                params['returnFaceAttributes'].split(','))
+        return 200, [face]
+
+    def find_similars(self, ids, params, headers, body):
+        request = _json_body(body)
+        image_hash = self._face_hash(request.get('faceId'))
+        if request.get('faceListId'):
+            face_list = self._face_list(request['faceListId'])
+            return 200, [
+                {'persistedFaceId': persisted_face_id, 'confidence': 1.0}
+                for persisted_face_id, face in face_list['faces'].items()
+                if face['hash'] == image_hash][
+                    :request.get('maxNumOfCandidatesReturned') or 20]
+        return 200, [
+            {'faceId': face_id, 'confidence': 1.0}
+            for face_id in request.get('faceIds') or []
+            if self.faces.get(face_id) == image_hash][
+                :request.get('maxNumOfCandidatesReturned') or 20]
+
+    def group(self, ids, params, headers, body):
+        groups = {}
+        for face_id in _json_body(body).get('faceIds') or []:
+            groups.setdefault(self._face_hash(face_id), []).append(face_id)
+        return 200, {
+            'groups': [group for group in groups.values() if len(group) > 1],
+            'messyGroup': [group[0] for group in groups.values()
+                           if len(group) == 1],
+        }
+
+    def identify(self, ids, params, headers, body):
+        request = _json_body(body)
+        face_ids = request.get('faceIds') or []
+        if not 1 <= len(face_ids) <= 10:
+            raise MockError(400, 'BadArgument', 'The faceIds length should be '
+                            'between [1, 10].')
+        person_group = self._person_group(request.get('personGroupId'))
+        if self._training_status(person_group) != 'succeeded':
+            raise MockError(400, 'PersonGroupNotTrained', 'Person group not '
+                            'trained.')
+        threshold = request.get('confidenceThreshold') or 0.5
+        results = []
+        for face_id in face_ids:
+            image_hash = self._face_hash(face_id)
+            candidates = [
+                {'personId': person_id, 'confidence': 1.0}
+                for person_id, person in sorted(
+                    person_group['trained'].items())
+                if image_hash in person and threshold <= 1.0]
+            results.append({
+                'faceId': face_id,
+                'candidates': candidates[
+                    :request.get('maxNumOfCandidatesReturned') or 1],
+            })
+        return 200, results
+
+    def verify(self, ids, params, headers, body):
+        request = _json_body(body)
+        image_hash = self._face_hash(request.get('faceId') or
+                                     request.get('faceId1'))
+        if request.get('faceId2'):
+            identical = image_hash == self._face_hash(request['faceId2'])
+        else:
+            person = self._person(request.get('personGroupId'),
+                                  request.get('personId'))
+            identical = any(face['hash'] == image_hash
+                            for face in person['faces'].values())
+        return 200, {'isIdentical': identical,
+                     'confidence': identical and 1.0 or 0.0}
+
+    # Person groups.
+
+    def _person_group(self, person_group_id):
+        if person_group_id not in self.person_groups:
+            raise MockError(404, 'PersonGroupNotFound', 'Person group is not '
+                            'found.')
+        return self.person_groups[person_group_id]
+
+    def _training_status(self, person_group):
+        training = person_group['training']
+        if training is None:
+            return None
+        if training['status'] == 'running' and (
+                time.time() >= training['started'] + self.train_duration):
+            training['status'] = 'succeeded'
+            training['lastActionDateTime'] = _now()
+        return training['status']
+
+    def create_person_group(self, ids, params, headers, body):
+        if ids[0] in self.person_groups:
+            raise MockError(409, 'PersonGroupExists', 'Person group already '
+                            'exists.')
+        request = _json_body(body)
+        self.person_groups[ids[0]] = {
+            'personGroupId': ids[0],
+            'name': request.get('name'),
+            'userData': request.get('userData'),
+            'persons': {},
+            'training': None,
+            'trained': {},
+        }
+        return 200, None
+
+    def delete_person_group(self, ids, params, headers, body):
+        self._person_group(ids[0])
+        del self.person_groups[ids[0]]
+        return 200, None
+
+    def get_person_group(self, ids, params, headers, body):
+        return 200, _public(self._person_group(ids[0]),
+                            ('personGroupId', 'name', 'userData'))
+
+    def update_person_group(self, ids, params, headers, body):
+        _update(self._person_group(ids[0]), _json_body(body))
+        return 200, None
+
+    def list_person_groups(self, ids, params, headers, body):
+        return 200, [
+            _public(self.person_groups[person_group_id],
+                    ('personGroupId', 'name', 'userData'))
+            for person_group_id in _page(self.person_groups, params)]
+
+    def train(self, ids, params, headers, body):
+        person_group = self._person_group(ids[0])
+        person_group['training'] = {
+            'status': 'running',
+            'started': time.time(),
+            'createdDateTime': _now(),
+            'lastActionDateTime': _now(),
+            'message': None,
+        }
+        person_group['trained'] = dict(
+            (person_id, set(face['hash']
+                            for face in person['faces'].values()))
+            for person_id, person in person_group['persons'].items())
+        return 202, None
+
+    def get_training_status(self, ids, params, headers, body):
+        person_group = self._person_group(ids[0])
+        if self._training_status(person_group) is None:
+            raise MockError(404, 'PersonGroupNotTrained', 'Person group not '
+                            'trained.')
+        return 200, _public(person_group['training'], (
+            'status', 'createdDateTime', 'lastActionDateTime', 'message'))
+
+    # Persons.
+
+    def _person(self, person_group_id, person_id):
+        persons = self._person_group(person_group_id)['persons']
+        if person_id not in persons:
+            raise MockError(404, 'PersonNotFound', 'Person is not found.')
+        return persons[person_id]
+
+    def create_person(self, ids, params, headers, body):
+        request = _json_body(body)
+        person_id = str(uuid.uuid4())
+        self._person_group(ids[0])['persons'][person_id] = {
+            'personId': person_id,
+            'name': request.get('name'),
+            'userData': request.get('userData'),
+            'faces': {},
+        }
+        return 200, {'personId': person_id}
+
+    def delete_person(self, ids, params, headers, body):
+        self._person(ids[0], ids[1])
+        del self.person_groups[ids[0]]['persons'][ids[1]]
+        return 200, None
+
+    def get_person(self, ids, params, headers, body):
+        return 200, _person_info(self._person(ids[0], ids[1]))
+
+    def update_person(self, ids, params, headers, body):
+        _update(self._person(ids[0], ids[1]), _json_body(body))
+        return 200, None
+
+    def list_persons(self, ids, params, headers, body):
+        persons = self._person_group(ids[0])['persons']
+        return 200, [_person_info(persons[person_id])
+                     for person_id in _page(persons, params)]
+
+    def add_person_face(self, ids, params, headers, body):
+        person = self._person(ids[0], ids[1])
+        return 200, _add_face(person['faces'],
+                              self._image_hash(headers, body), params)
+
+    def delete_person_face(self, ids, params, headers, body):
+        _face(self._person(ids[0], ids[1])['faces'], ids[2])
+        del self._person(ids[0], ids[1])['faces'][ids[2]]
+        return 200, None
+
+    def get_person_face(self, ids, params, headers, body):
+        face = _face(self._person(ids[0], ids[1])['faces'], ids[2])
+        return 200, {'persistedFaceId': ids[2], 'userData': face['userData']}
+
+    def update_person_face(self, ids, params, headers, body):
+        face = _face(self._person(ids[0], ids[1])['faces'], ids[2])
+        _update(face, _json_body(body))
+        return 200, None
+
+    # Face lists.
+
+    def _face_list(self, face_list_id):
+        if face_list_id not in self.face_lists:
+            raise MockError(404, 'FaceListNotFound', 'Face list is not '
+                            'found.')
+        return self.face_lists[face_list_id]
+
+    def create_face_list(self, ids, params, headers, body):
+        if ids[0] in self.face_lists:
+            raise MockError(409, 'FaceListExists', 'Face list already '
+                            'exists.')
+        request = _json_body(body)
+        self.face_lists[ids[0]] = {
+            'faceListId': ids[0],
+            'name': request.get('name'),
+            'userData': request.get('userData'),
+            'faces': {},
+        }
+        return 200, None
+
+    def delete_face_list(self, ids, params, headers, body):
+        self._face_list(ids[0])
+        del self.face_lists[ids[0]]
+        return 200, None
+
+    def get_face_list(self, ids, params, headers, body):
+        face_list = self._face_list(ids[0])
+        info = _public(face_list, ('faceListId', 'name', 'userData'))
+        info['persistedFaces'] = [
+            {'persistedFaceId': persisted_face_id,
+             'userData': face['userData']}
+            for persisted_face_id, face in sorted(face_list['faces'].items())]
+        return 200, info
+
+    def update_face_list(self, ids, params, headers, body):
+        _update(self._face_list(ids[0]), _json_body(body))
+        return 200, None
+
+    def list_face_lists(self, ids, params, headers, body):
+        return 200, [
+            _public(self.face_lists[face_list_id],
+                    ('faceListId', 'name', 'userData'))
+            for face_list_id in sorted(self.face_lists)]
+
+    def add_face_list_face(self, ids, params, headers, body):
+        face_list = self._face_list(ids[0])
+        return 200, _add_face(face_list['faces'],
+                              self._image_hash(headers, body), params)
+
+    def delete_face_list_face(self, ids, params, headers, body):
+        _face(self._face_list(ids[0])['faces'], ids[1])
+        del self._face_list(ids[0])['faces'][ids[1]]
+        return 200, None
+
+
+_ROUTES = {
+    ('POST', 'detect'): MockFaceServer.detect,
+    ('POST', 'findsimilars'): MockFaceServer.find_similars,
+    ('POST', 'group'): MockFaceServer.group,
+    ('POST', 'identify'): MockFaceServer.identify,
+    ('POST', 'verify'): MockFaceServer.verify,
+    ('GET', 'persongroups'): MockFaceServer.list_person_groups,
+    ('PUT', 'persongroups/{}'): MockFaceServer.create_person_group,
+    ('DELETE', 'persongroups/{}'): MockFaceServer.delete_person_group,
+    ('GET', 'persongroups/{}'): MockFaceServer.get_person_group,
+    ('PATCH', 'persongroups/{}'): MockFaceServer.update_person_group,
+    ('POST', 'persongroups/{}/train'): MockFaceServer.train,
+    ('GET', 'persongroups/{}/training'): MockFaceServer.get_training_status,
+    ('POST', 'persongroups/{}/persons'): MockFaceServer.create_person,
+    ('GET', 'persongroups/{}/persons'): MockFaceServer.list_persons,
+    ('DELETE', 'persongroups/{}/persons/{}'): MockFaceServer.delete_person,
+    ('GET', 'persongroups/{}/persons/{}'): MockFaceServer.get_person,
+    ('PATCH', 'persongroups/{}/persons/{}'): MockFaceServer.update_person,
+    ('POST', 'persongroups/{}/persons/{}/persistedFaces'):
+        MockFaceServer.add_person_face,
+    ('DELETE', 'persongroups/{}/persons/{}/persistedFaces/{}'):
+        MockFaceServer.delete_person_face,
+    ('GET', 'persongroups/{}/persons/{}/persistedFaces/{}'):
+        MockFaceServer.get_person_face,
+    ('PATCH', 'persongroups/{}/persons/{}/persistedFaces/{}'):
+        MockFaceServer.update_person_face,
+    ('GET', 'facelists'): MockFaceServer.list_face_lists,
+    ('PUT', 'facelists/{}'): MockFaceServer.create_face_list,
+    ('DELETE', 'facelists/{}'): MockFaceServer.delete_face_list,
+    ('GET', 'facelists/{}'): MockFaceServer.get_face_list,
+    ('PATCH', 'facelists/{}'): MockFaceServer.update_face_list,
+    ('POST', 'facelists/{}/persistedFaces'):
+        MockFaceServer.add_face_list_face,
+    ('DELETE', 'facelists/{}/persistedFaces/{}'):
+        MockFaceServer.delete_face_list_face,
+}
+
+
+def _json_body(body):
+    if not body:
+        return {}
+    try:
+        return json.loads(body.decode('utf-8'))
+    except ValueError:
+        raise MockError(400, 'BadArgument', 'Request body is invalid.')
+
+
+def _public(entity, keys):
+    return dict((key, entity.get(key)) for key in keys)
+
+
+def _update(entity, request):
+    for key in ('name', 'userData'):
+        if request.get(key) is not None:
+            entity[key] = request[key]
+
+
+def _page(entities, params):
+    start = params.get('start') or ''
+    top = int(params.get('top') or 1000)
+    return [key for key in sorted(entities) if key > start][:top]
+
+
+def _person_info(person):
+    info = _public(person, ('personId', 'name', 'userData'))
+    info['persistedFaceIds'] = sorted(person['faces'])
+    return info
+
+
+def _face(faces, persisted_face_id):
+    if persisted_face_id not in faces:
+        raise MockError(404, 'PersistedFaceNotFound', 'Persisted face is not '
+                        'found.')
+    return faces[persisted_face_id]
+
+
+def _add_face(faces, image_hash, params):
+    persisted_face_id = str(uuid.uuid4())
+    faces[persisted_face_id] = {
+        'hash': image_hash,
+        'userData': params.get('userData'),
+    }
+    return {'persistedFaceId': persisted_face_id}
+
+
+def _now():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        url = urlparse(self.path)
+        status_code, headers, payload = self.server.mock.handle(
+            self.command, url.path, parse_qs(url.query), self.headers, body)
+        content = b'' if payload is None else json.dumps(payload).encode(
+            'utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, *args):
+        # pylint: disable=arguments-differ
+        pass
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    mock = None
+
+
+def main(argv):
+    """Run the mock server in the foreground."""
+    port = 8000
+    options = {}
+    opts, _ = getopt.getopt(argv, 'hp:l:e:t:d:k:')
+    for opt, arg in opts:
+        if opt == '-h':
+            print(__doc__)
+            sys.exit()
+        elif opt == '-p':
+            port = int(arg)
+        elif opt == '-l':
+            options['latency'] = float(arg)
+        elif opt == '-e':
+            options['error_rate'] = float(arg)
+        elif opt == '-t':
+            options['rate'] = float(arg)
+        elif opt == '-d':
+            options['train_duration'] = float(arg)
+        elif opt == '-k':
+            options['key'] = arg
+
+    server = MockFaceServer(port=port, **options).start()
+    print('Serving the mock Cognitive Face API at {}'.format(server.base_url))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
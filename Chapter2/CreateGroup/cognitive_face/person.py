@@ -34,14 +34,14 @@ def add_face(image, person_group_id, person_id, user_data=None,
     """
     url = 'persongroups/{}/persons/{}/persistedFaces'.format(
         person_group_id, person_id)
-    headers, data, json = util.parse_image(image)
     params = {
         'userData': user_data,
         'targetFace': target_face,
     }
 
-    return util.request('POST', url, headers=headers, params=params, json=json,
-                        data=data)
+    with util.open_image(image) as (headers, data, json):
+        return util.request('POST', url, headers=headers, params=params,
+                            json=json, data=data)
 
 
 def create(person_group_id, name, user_data=None):
@@ -168,6 +168,24 @@ def lists(person_group_id, start=None, top=None):
     return util.request('GET', url, params=params)
 
 
+def iter_lists(person_group_id, top=1000, prefetch=False):
+    """Iterate over all the persons in a person group, fetching them page by
+    page with `lists`.
+
+    Args:
+        person_group_id: `person_group_id` of the target person group.
+        top: The number of persons fetched per page, ranging in [1, 1000].
+        prefetch: Fetch the next page in the background while the current one
+            is consumed.
+
+    Returns:
+        A generator of person information, see `lists`.
+    """
+    return util.paginate(
+        lambda start, top: lists(person_group_id, start, top), 'personId',
+        top, prefetch)
+
+
 def update(person_group_id, person_id, name=None, user_data=None):
     """Update `name` or `user_data` of a person.
 
@@ -104,6 +104,22 @@ def lists(start=None, top=None):
     return util.request('GET', url, params=params)
 
 
+def iter_lists(top=1000, prefetch=False):
+    """Iterate over all the person groups, fetching them page by page with
+    `lists`.
+
+    Args:
+        top: The number of person groups fetched per page, ranging in
+            [1, 1000].
+        prefetch: Fetch the next page in the background while the current one
+            is consumed.
+
+    Returns:
+        A generator of person groups and their information, see `lists`.
+    """
+    return util.paginate(lists, 'personGroupId', top, prefetch)
+
+
 def train(person_group_id):
     """Queue a person group training task, the training task may not be started
     immediately.
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: rate_limit.py
+Description: Client side rate limiting for the Python SDK of the Cognitive Face
+    API.
+"""
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows.
+    fcntl = None
+    import msvcrt
+
+from .util import CognitiveFaceException
+
+
+class RateLimiter(object):
+    """Token bucket limiting the rate of calls to the Cognitive Face API.
+
+    Calls reserve a token before they are sent. When the bucket is empty the
+    caller is given a slot in the future instead of being rejected, so bursts
+    are smoothed to the configured rate and concurrent callers are served in
+    arrival order. Install it with `cognitive_face.util.RateLimit.set`.
+
+    Attributes:
+        per_second: Sustained number of calls per second. Use fractions for
+            per-minute tiers, e.g. `20 / 60.0` for the free tier.
+        burst: Number of calls that may be sent back to back after an idle
+            period. Defaults to one second worth of calls (at least 1).
+        per_month: Optional number of calls allowed per calendar month (UTC).
+            Calls beyond it raise `CognitiveFaceException` with the code
+            `QuotaExceeded` instead of being sent.
+        lock_file: Optional path of a file holding the bucket state. Processes
+            using the same file share the bucket and the monthly count, which
+            also survives restarts. Without it the state is per process.
+    """
+
+    def __init__(self, per_second, burst=None, per_month=None, lock_file=None):
+        self.per_second = float(per_second)
+        self.burst = float(burst or max(1.0, self.per_second))
+        self.per_month = per_month
+        self.lock_file = lock_file
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+
+    def acquire(self):
+        """Block until a call may be sent."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self):
+        """Reserve a call and return the seconds to wait before sending it.
+
+        Unlike `acquire` this does not block, which lets coroutines wait with
+        `asyncio.sleep` instead.
+        """
+        with self._lock:
+            if self.lock_file is None:
+                return self._reserve(self._state)
+            with _FileLock(self.lock_file) as handle:
+                state = _read_state(handle) or self._initial_state()
+                delay = self._reserve(state)
+                _write_state(handle, state)
+                return delay
+
+    def used_this_month(self):
+        """Return the number of calls reserved in the current month."""
+        with self._lock:
+            state = self._state
+            if self.lock_file is not None:
+                with _FileLock(self.lock_file) as handle:
+                    state = _read_state(handle) or self._initial_state()
+            if state['month'] != _current_month():
+                return 0
+            return state['used']
+
+    def _initial_state(self):
+        return {
+            'tokens': self.burst,
+            'stamp': time.time(),
+            'month': _current_month(),
+            'used': 0,
+        }
+
+    def _reserve(self, state):
+        month = _current_month()
+        if state['month'] != month:
+            state['month'] = month
+            state['used'] = 0
+        if self.per_month is not None and state['used'] >= self.per_month:
+            raise CognitiveFaceException(
+                429, 'QuotaExceeded',
+                'Monthly quota of {} calls exhausted.'.format(self.per_month))
+        state['used'] += 1
+
+        # Refill, then take a token. A negative balance is the queue of calls
+        # already promised a slot in the future.
+        now = time.time()
+        elapsed = max(0.0, now - state['stamp'])
+        state['tokens'] = min(self.burst,
+                              state['tokens'] + elapsed * self.per_second)
+        state['stamp'] = now
+        state['tokens'] -= 1
+        if state['tokens'] >= 0:
+            return 0.0
+        return -state['tokens'] / self.per_second
+
+
+class _FileLock(object):
+    """Exclusive lock on a state file shared between processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def __enter__(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.handle = os.fdopen(fd, 'r+')
+        if fcntl is not None:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+        else:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+        return self.handle
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        else:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        self.handle.close()
+
+
+def _read_state(handle):
+    handle.seek(0)
+    content = handle.read()
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def _write_state(handle, state):
+    handle.seek(0)
+    handle.truncate()
+    handle.write(json.dumps(state))
+    handle.flush()
+
+
+def _current_month():
+    return time.strftime('%Y-%m', time.gmtime())
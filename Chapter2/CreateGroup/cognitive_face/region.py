@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: region.py
+Description: Regional endpoints for the Python SDK of the Cognitive Face API,
+    routing calls to the fastest healthy region and pinning calls to one.
+"""
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import util
+from .util import CognitiveFaceException
+
+AZURE_URL = 'https://{}.api.cognitive.microsoft.com/face/v1.0/'
+
+_PINNED = util.context_var('cognitive_face_region')
+
+
+class Region(object):
+    """An endpoint of the API and the subscription key valid there.
+
+    Attributes:
+        name: Name shown in logs, e.g. `westeurope`.
+        base_url: Base URL of the API, ending with a slash.
+        key: Subscription key of the region, None to use `util.Key.get()`.
+        latency: Smoothed round-trip seconds measured by `Router.probe`, None
+            until the region answered a probe.
+        failures: Number of consecutive failed calls.
+        down_until: Time until which the region is only used as a last
+            resort.
+    """
+
+    def __init__(self, name, base_url, key=None):
+        self.name = name
+        self.base_url = base_url
+        self.key = key
+        self.latency = None
+        self.failures = 0
+        self.down_until = 0.0
+
+    def __repr__(self):
+        return 'Region({!r}, {!r})'.format(self.name, self.base_url)
+
+    @property
+    def healthy(self):
+        """Whether the region is not marked down."""
+        return time.time() >= self.down_until
+
+
+def azure(name, key=None):
+    """Return the `Region` of an Azure region, e.g. `azure('westus')`."""
+    return Region(name, AZURE_URL.format(name), key)
+
+
+@contextlib.contextmanager
+def pin(region):
+    """Send the calls made in the current context (thread or task) to a
+    region, whatever the router installed with `util.Route.set`.
+
+    Person groups and face lists only exist in the region they were created
+    in, so pin the calls which create or modify them, e.g. to replicate a
+    group to every region of a router. Wrap callables handed to other threads
+    with `util.propagate` so their calls are pinned too.
+
+    Args:
+        region: The `Region`, None to unpin.
+    """
+    token = _PINNED.set(region)
+    try:
+        yield region
+    finally:
+        _PINNED.reset(token)
+
+
+def pinned():
+    """Return the region pinned in the current context, or None."""
+    return _PINNED.get()
+
+
+class Router(object):
+    """Send each call to the fastest healthy region, failing over to the
+    next one when it does not answer.
+
+    The latency of the regions is measured by `probe`, which lists a single
+    person group in every region (a billed transaction per region). The
+    regions are probed before the first call and again in the background
+    every `probe_interval` seconds. A region is marked down after
+    `failure_threshold` consecutive connection errors or server errors (or a
+    failed probe) and only tried again once `cooldown` has elapsed.
+
+    A call is failed over on a connection error, a server error or when the
+    quota of the region is exceeded (`429` once retries, if any, are
+    exhausted). Since person groups are bound to their region, the groups a
+    call refers to must exist in every region, see `pin`; so are the faceIds
+    returned by `face.detect`, so pin the calls detecting faces and the ones
+    identifying, verifying or grouping them to a single region; a call which is
+    not idempotent, like `person.create`, may be applied twice when it is
+    failed over after a server error, so pin the calls modifying groups.
+    Install the router with `util.Route.set`, it also routes the coroutines
+    of `cognitive_face.aio`.
+
+    Attributes:
+        regions: The `Region`s, in order of preference until probed.
+        failure_threshold: Consecutive failures marking a region down.
+        cooldown: Seconds a region stays down.
+        probe_interval: Seconds between two probes, None to only probe
+            before the first call.
+        probe_timeout: Seconds after which a probe fails.
+        probe_samples: Round-trips per probe, the fastest is kept so the
+            connection setup is not counted.
+        smoothing: Weight of a new probe in the smoothed latency.
+    """
+
+    def __init__(self, regions, failure_threshold=3, cooldown=30.0,
+                 probe_interval=300.0, probe_timeout=5.0, probe_samples=2,
+                 smoothing=0.5):
+        # pylint: disable=too-many-arguments
+        self.regions = list(regions)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.probe_samples = probe_samples
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._probed = None
+        self._probing = False
+
+    def order(self):
+        """Return the regions in the order calls try them: the healthy ones
+        by latency, then the ones marked down by the end of their cooldown.
+        """
+        self._refresh()
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                enumerate(self.regions),
+                key=lambda item: (
+                    item[1].down_until > now,
+                    item[1].down_until if item[1].down_until > now else 0,
+                    item[1].latency is None, item[1].latency or 0, item[0]))
+        return [region for _, region in ranked]
+
+    def record(self, region, failed):
+        """Record the outcome of a call to a region."""
+        with self._lock:
+            if not failed:
+                region.failures = 0
+                region.down_until = 0.0
+                return
+            region.failures += 1
+            if region.failures >= self.failure_threshold:
+                region.down_until = time.time() + self.cooldown
+
+    def probe(self):
+        """Measure the latency of every region, concurrently.
+
+        Returns:
+            A dict of the latency in seconds of each region by name, None for
+            the regions which did not answer, which are marked down.
+        """
+        with self._lock:
+            self._probing = True
+        try:
+            with ThreadPoolExecutor(len(self.regions)) as executor:
+                latencies = list(executor.map(self._probe, self.regions))
+        finally:
+            with self._lock:
+                self._probing = False
+                self._probed = time.time()
+        with self._lock:
+            for region, latency in zip(self.regions, latencies):
+                if latency is None:
+                    region.failures = max(region.failures,
+                                          self.failure_threshold)
+                    region.down_until = time.time() + self.cooldown
+                    continue
+                if region.latency is None:
+                    region.latency = latency
+                else:
+                    region.latency += self.smoothing * (latency -
+                                                        region.latency)
+                region.failures = 0
+                region.down_until = 0.0
+        return dict((region.name, latency)
+                    for region, latency in zip(self.regions, latencies))
+
+    def request(self, method, url, data=None, json=None, headers=None,
+                params=None):
+        # pylint: disable=too-many-arguments
+        """Send a call to the best region, see `util.request`.
+
+        Args:
+            url: The short name of the endpoint, relative to the base URL of
+                the regions.
+        """
+        regions = self.order()
+        data = util.rewindable(data)
+        position = data.tell() if hasattr(data, 'seek') else None
+        for idx, region in enumerate(regions):
+            if position is not None:
+                data.seek(position)
+            full_url, region_headers = util.prepare_request(
+                region.base_url + url, dict(headers or {}), region.key)
+            try:
+                result = util.send(method, full_url, data, json,
+                                   region_headers, params)
+            except (requests.ConnectionError, CognitiveFaceException) as exc:
+                if (not self.fail_over(region, exc) or
+                        idx == len(regions) - 1):
+                    raise
+                continue
+            self.record(region, failed=False)
+            return result
+
+    def fail_over(self, region, exc):
+        """Record a call to a region which raised, return whether it is
+        tried in the next region.
+
+        Args:
+            region: The `Region` called.
+            exc: The `CognitiveFaceException` raised, any other exception
+                is a connection error.
+        """
+        if isinstance(exc, CognitiveFaceException):
+            self.record(region, failed=exc.status_code >= 500)
+            return exc.status_code >= 500 or exc.status_code == 429
+        self.record(region, failed=True)
+        return True
+
+    def _refresh(self):
+        """Probe before the first call and when the last probe is stale."""
+        with self._lock:
+            if self._probing or (self._probed is not None and (
+                    self.probe_interval is None or
+                    time.time() - self._probed < self.probe_interval)):
+                return
+            first = self._probed is None
+            self._probing = True
+        if first:
+            self.probe()
+        else:
+            thread = threading.Thread(target=self.probe, name='RegionProbe')
+            thread.daemon = True
+            thread.start()
+
+    def _probe(self, region):
+        url, headers = util.prepare_request(region.base_url + 'persongroups',
+                                            key=region.key)
+        best = None
+        for _ in range(self.probe_samples):
+            start = time.time()
+            try:
+                response = util.Session.get().get(
+                    url, params={'top': 1}, headers=headers,
+                    timeout=self.probe_timeout)
+            except requests.RequestException:
+                return None
+            if response.status_code != 200:
+                return None
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
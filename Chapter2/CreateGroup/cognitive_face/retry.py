@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: retry.py
+Description: Retry policy for the Python SDK of the Cognitive Face API.
+"""
+import email.utils
+import random
+import threading
+import time
+
+from . import util
+
+# Status codes worth retrying: throttling and transient server errors.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# POST endpoints which can be sent twice without creating anything twice.
+# `persongroups/{}/persons` and the `persistedFaces` endpoints are missing on
+# purpose: retrying them after a lost response duplicates persons and faces.
+IDEMPOTENT_POSTS = (
+    'detect',
+    'findsimilars',
+    'group',
+    'identify',
+    'verify',
+    'persongroups/{}/train',
+)
+
+
+class RetryPolicy(object):
+    """Retry transient failures with jittered exponential backoff.
+
+    A `429` is always retried since the service rejected the call before
+    processing it, honouring its `Retry-After` header. Server errors and
+    connection errors are only retried for idempotent calls. Install it with
+    `cognitive_face.util.Retry.set`.
+
+    Attributes:
+        max_retries: Maximum number of retries of one call.
+        backoff: Base delay in seconds, doubled on each retry.
+        max_backoff: Cap of a single delay in seconds.
+        max_elapsed: Cap in seconds of the time one call may spend retrying.
+        budget_ratio: Retries allowed process wide as a ratio of the calls,
+            so that retries cannot amplify an outage. None disables it.
+        budget_floor: Retries always allowed on top of the ratio.
+        stats: `RetryStats` counters of the calls made with this policy.
+    """
+
+    def __init__(self, max_retries=5, backoff=0.5, max_backoff=30.0,
+                 max_elapsed=120.0, budget_ratio=0.2, budget_floor=10,
+                 retry_statuses=RETRY_STATUSES,
+                 idempotent_posts=IDEMPOTENT_POSTS):
+        # pylint: disable=too-many-arguments
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.budget_ratio = budget_ratio
+        self.budget_floor = budget_floor
+        self.retry_statuses = retry_statuses
+        self.idempotent_posts = idempotent_posts
+        self.stats = RetryStats()
+
+    def is_idempotent(self, method, url):
+        """Whether sending the call twice has the effect of sending it once."""
+        if method.upper() != 'POST':
+            return True
+        return util.endpoint_template(url) in self.idempotent_posts
+
+    def delay(self, method, url, attempt, elapsed, status_code=None,
+              retry_after=None):
+        # pylint: disable=too-many-arguments
+        """Return the seconds to wait before retrying a failed call, or None
+        when it must not be retried.
+
+        Args:
+            method: HTTP method of the call.
+            url: URL of the call.
+            attempt: Number of retries already made, starting at 0.
+            elapsed: Seconds spent on the call so far.
+            status_code: Status code of the failed response, None when the
+                call failed with a connection error.
+            retry_after: `Retry-After` header of the failed response.
+        """
+        if status_code is not None and status_code not in self.retry_statuses:
+            return None
+        if status_code != 429 and not self.is_idempotent(method, url):
+            return None
+        if attempt >= self.max_retries:
+            self.stats.incr('giveups')
+            return None
+
+        delay = self._retry_after(retry_after)
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff * 2**attempt)
+            delay = random.uniform(0, delay)  # Full jitter.
+        if (self.max_elapsed is not None and
+                elapsed + delay > self.max_elapsed):
+            self.stats.incr('giveups')
+            return None
+        if not self.stats.take_retry(self.budget_ratio, self.budget_floor):
+            self.stats.incr('budget_exhausted')
+            return None
+        self.stats.incr('retries_{}'.format(status_code or 'error'))
+        return delay
+
+    @staticmethod
+    def _retry_after(value):
+        """Parse a `Retry-After` header given in seconds or as a HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        parsed = email.utils.parsedate_tz(value)
+        if parsed is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+class RetryStats(object):
+    """Thread safe counters of the calls made through a `RetryPolicy`.
+
+    Counters: `calls`, `attempts`, `retries`, `failures`, `giveups`,
+    `budget_exhausted`, `retries_<status_code>` (`retries_error` for
+    connection errors), `latency_total` and `latency_max` (in seconds).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def incr(self, name, value=1):
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def take_retry(self, budget_ratio, budget_floor):
+        """Count a retry if the budget allows it."""
+        with self._lock:
+            retries = self._counters.get('retries', 0)
+            if budget_ratio is not None:
+                allowed = (budget_floor +
+                           budget_ratio * self._counters.get('calls', 0))
+                if retries >= allowed:
+                    return False
+            self._counters['retries'] = retries + 1
+            return True
+
+    def record(self, latency, attempts, failed=False):
+        """Record a finished call.
+
+        Args:
+            latency: Total seconds spent on the call, including retries.
+            attempts: Number of times the call was sent.
+            failed: Whether the call finally failed.
+        """
+        with self._lock:
+            counters = self._counters
+            counters['calls'] = counters.get('calls', 0) + 1
+            counters['attempts'] = counters.get('attempts', 0) + attempts
+            counters['latency_total'] = (counters.get('latency_total', 0.0) +
+                                         latency)
+            counters['latency_max'] = max(counters.get('latency_max', 0.0),
+                                          latency)
+            if failed:
+                counters['failures'] = counters.get('failures', 0) + 1
+
+    def snapshot(self):
+        """Return a copy of the counters."""
+        with self._lock:
+            return dict(self._counters)
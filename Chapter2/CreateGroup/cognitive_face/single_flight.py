@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: single_flight.py
+Description: Coalescing of identical calls for the Python SDK of the Cognitive
+    Face API.
+"""
+import asyncio
+import hashlib
+import json as _json
+import threading
+from concurrent.futures import Future
+
+from . import util
+
+# POST endpoints which do not modify anything, `detect` is also coalesced.
+READ_ONLY_POSTS = ('detect', 'findsimilars', 'group', 'identify', 'verify')
+COALESCED_POSTS = ('detect',)
+
+
+class SingleFlight(object):
+    """Share one call among all the concurrent callers of an identical
+    call, and serve its response to the identical calls made in the next
+    `ttl` seconds.
+
+    GETs and `face.detect` uploads of the same content (with the same
+    parameters and Subscription Key) are identical. Each caller gets its own
+    decoded copy of the response, or raises its own exception when the call
+    failed; only successful responses are kept. Any other call, e.g.
+    `person.add_face`, drops the kept responses of the collection it
+    modified (all the person groups, or all the face lists), so the next
+    reads see the change. The calls of `cognitive_face.aio` are coalesced
+    too, with the ones of threads. Install it with `util.Coalesce.set`.
+
+    Attributes:
+        ttl: Seconds a response is served again, 0 to only share the calls
+            in flight.
+        max_entries: Maximum number of responses kept.
+        stats: Number of `calls` sent, of callers which `shared` a call in
+            flight and of callers served a kept response (`hits`).
+    """
+
+    def __init__(self, ttl=1.0, max_entries=1024):
+        self.ttl = ttl
+        self.stats = {'calls': 0, 'shared': 0, 'hits': 0}
+        self._lock = threading.Lock()
+        self._responses = util.TTLCache(ttl, max_entries)
+        self._flights = {}
+        self._generation = 0
+
+    @staticmethod
+    def key(method, url, data=None, json=None, headers=None, params=None):
+        # pylint: disable=too-many-arguments
+        """Return the key identifying a call, None when it is not coalesced.
+
+        Streamed bodies are read to be hashed and rewound.
+        """
+        if method != 'GET' and not (
+                method == 'POST' and
+                util.endpoint_template(url) in COALESCED_POSTS):
+            return None
+        headers = headers or {}
+        digest = hashlib.sha256()
+        for part in (method, headers.get('Ocp-Apim-Subscription-Key') or '',
+                     _json.dumps(params, sort_keys=True),
+                     _json.dumps(json, sort_keys=True)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        if hasattr(data, 'read'):
+            position = data.tell()
+            for chunk in iter(lambda: data.read(1 << 16), b''):
+                digest.update(chunk)
+            data.seek(position)
+        elif data is not None:
+            digest.update(data)
+        # The URL first, so `invalidate` can drop a collection by prefix.
+        return '{}\0{}'.format(url, digest.hexdigest())
+
+    def do(self, key, call):
+        """Return the result of `call`, shared with the concurrent callers of
+        the same key.
+
+        Args:
+            key: The key of the call, see `key`.
+            call: Callable returning the status code and body of the
+                response.
+        """
+        response, future, generation = self._join(key)
+        if response is not None:
+            return response
+        if generation is None:
+            return future.result()
+        try:
+            response = call()
+        except BaseException as exc:
+            self._land(key, future, generation, error=exc)
+            raise
+        self._land(key, future, generation, response)
+        return response
+
+    async def do_async(self, key, call):
+        """Coroutine version of `do`, `call` returns an awaitable. The calls
+        are shared with the concurrent coroutines, of any loop, and threads.
+        """
+        response, future, generation = self._join(key)
+        if response is not None:
+            return response
+        if generation is None:
+            # Shielded, so a cancelled caller does not cancel the call.
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            response = await call()
+        except BaseException as exc:
+            self._land(key, future, generation, error=exc)
+            raise
+        self._land(key, future, generation, response)
+        return response
+
+    def _join(self, key):
+        """Return the kept response of a key, else the call in flight to wait
+        for, else a new flight to run with its generation."""
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self.stats['hits'] += 1
+                return response, None, None
+            future = self._flights.get(key)
+            if future is not None:
+                self.stats['shared'] += 1
+                return None, future, None
+            future = self._flights[key] = Future()
+            self.stats['calls'] += 1
+            return None, future, self._generation
+
+    def _land(self, key, future, generation, response=None, error=None):
+        """Hand the outcome of a flight to its waiting callers."""
+        with self._lock:
+            del self._flights[key]
+            # Not kept when a modification was made during the call.
+            if (error is None and response[0] == 200 and self.ttl > 0 and
+                    generation == self._generation):
+                self._responses.put(key, response)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+
+    def invalidate(self, method, url):
+        """Drop the responses a call may have made stale."""
+        path = url.split('?', 1)[0]
+        if method == 'POST' and (util.endpoint_template(path) in
+                                 READ_ONLY_POSTS):
+            return
+        with self._lock:
+            self._generation += 1
+            if '/face/v1.0/' in path:
+                base, endpoint = path.split('/face/v1.0/', 1)
+                self._responses.invalidate('{}/face/v1.0/{}'.format(
+                    base, endpoint.split('/', 1)[0]))
+            else:
+                self._responses.clear()
+
+    def clear(self):
+        """Drop all the responses."""
+        with self._lock:
+            self._generation += 1
+            self._responses.clear()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: stream.py
+Description: Face detection and identification over streams of frames for
+    the Python SDK of the Cognitive Face API, skipping the frames where the
+    scene did not change. Requires Pillow (`pip install Pillow`).
+"""
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from PIL import Image
+from PIL import ImageSequence
+
+from . import face
+from . import util
+from .util import CognitiveFaceException
+
+# The formats accepted by the API.
+IMAGE_EXTENSIONS = frozenset(('.jpg', '.jpeg', '.jpe', '.png', '.gif', '.bmp'))
+
+
+class FrameResult(namedtuple('FrameResult', ['index', 'frame', 'faces',
+                                             'candidates', 'error'])):
+    """The faces of a frame sent to the API.
+
+    Attributes:
+        index: Position of the frame in the stream.
+        frame: The frame, as read from the stream.
+        faces: The faces detected by `face.detect`, None on error.
+        candidates: Per face, the candidates returned by `face.identify`, None
+            without person group or on error.
+        error: The `CognitiveFaceException` or the
+            `requests.RequestException` (e.g. a connection error) raised for
+            the frame, or None.
+    """
+    __slots__ = ()
+
+
+def dhash(image, size=8):
+    """Return the difference hash of an image, an int of `size * size` bits
+    which tell whether each pixel of a `size + 1` by `size` grayscale
+    thumbnail is brighter than its right neighbour. Similar images have
+    hashes which differ by a few bits.
+
+    Args:
+        image: The content as bytes, or a PIL image.
+        size: Width and height of the hash in bits.
+    """
+    if isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+        # JPEGs are decoded at a fraction of their size, much faster.
+        image.draft('L', (4 * size, 4 * size))
+    pixels = bytearray(image.convert('L').resize((size + 1, size),
+                                                 Image.BILINEAR).tobytes())
+    bits = 0
+    for row in range(size):
+        for col in range(row * (size + 1), row * (size + 1) + size):
+            bits = bits << 1 | (pixels[col] > pixels[col + 1])
+    return bits
+
+
+def distance(hash1, hash2):
+    """Return the number of bits which differ between two hashes."""
+    return bin(hash1 ^ hash2).count('1')
+
+
+def directory_frames(directory):
+    """Yield the paths of the images of a directory, in name order."""
+    for name in sorted(os.listdir(directory)):
+        if (not name.startswith('.') and
+                os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS):
+            yield os.path.join(directory, name)
+
+
+def video_frames(path, step=1):
+    """Yield the frames of a video, decoded locally, as PIL images.
+
+    Videos are decoded with OpenCV (`pip install opencv-python`) when it is
+    installed, else with Pillow, which reads animated GIF, PNG and WebP
+    images and multi-frame TIFF images.
+
+    Args:
+        path: Path of the video.
+        step: Yield every `step`th frame only, the others are not decoded.
+    """
+    try:
+        import cv2  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        cv2 = None
+
+    if cv2 is None:
+        with Image.open(path) as image:
+            for idx, frame in enumerate(ImageSequence.Iterator(image)):
+                if idx % step == 0:
+                    yield frame.convert('RGB')
+        return
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise IOError('Cannot decode the video {}'.format(path))
+    try:
+        idx = 0
+        while capture.grab():
+            if idx % step == 0:
+                decoded, array = capture.retrieve()
+                if decoded:
+                    yield Image.fromarray(cv2.cvtColor(array,
+                                                       cv2.COLOR_BGR2RGB))
+            idx += 1
+    finally:
+        capture.release()
+
+
+class FramePipeline(object):
+    """Detect, and identify, the faces of a stream of frames, only sending
+    the frames where the scene changed.
+
+    A frame is skipped when its `dhash` differs by at most `max_distance`
+    bits from the hash of the last frame sent, so a still scene costs no
+    calls whatever the frame rate, while any movement is sent. At most
+    `max_in_flight` frames are detected and identified at once and frames
+    are only read from the stream when there is room, so a fast stream is
+    not buffered.
+
+    Attributes:
+        person_group_id: Optional person group identifying the detected
+            faces.
+        max_distance: Maximum number of bits by which the hash of a skipped
+            frame differs, out of `hash_size` squared. Negative to send every
+            frame.
+        hash_size: Width and height of the hashes in bits.
+        max_skipped: Optional number of consecutive skipped frames after
+            which a frame is sent anyway.
+        max_in_flight: Maximum number of frames sent at once.
+        max_candidates_return: Maximum number of candidates per face.
+        threshold: Optional confidence threshold of the identification.
+        quality: JPEG quality of the frames given as PIL images.
+        stats: Number of `frames` read, `skipped` and `sent`, and of `faces`
+            detected.
+    """
+
+    def __init__(self, person_group_id=None, max_distance=4, hash_size=8,
+                 max_skipped=None, max_in_flight=4, max_candidates_return=1,
+                 threshold=None, quality=90):
+        # pylint: disable=too-many-arguments
+        self.person_group_id = person_group_id
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.max_skipped = max_skipped
+        self.max_in_flight = max_in_flight
+        self.max_candidates_return = max_candidates_return
+        self.threshold = threshold
+        self.quality = quality
+        self.stats = {'frames': 0, 'skipped': 0, 'sent': 0, 'faces': 0}
+
+    def run(self, frames):
+        """Yield the results of the frames sent, as soon as they complete.
+
+        Args:
+            frames: An iterable of frames: file paths, contents as bytes,
+                file-like objects or PIL images, e.g. `video_frames`.
+
+        Returns:
+            A generator of `FrameResult`, in order of completion.
+        """
+        process = util.propagate(self._process)
+        last_hash = None
+        skipped = 0
+        pending = set()
+        with ThreadPoolExecutor(self.max_in_flight) as executor:
+            for index, frame in enumerate(frames):
+                self.stats['frames'] += 1
+                content = _content(frame)
+                frame_hash = dhash(content, self.hash_size)
+                if (last_hash is not None and
+                        distance(frame_hash, last_hash) <= self.max_distance
+                        and (self.max_skipped is None or
+                             skipped < self.max_skipped)):
+                    self.stats['skipped'] += 1
+                    skipped += 1
+                    continue
+                last_hash = frame_hash
+                skipped = 0
+                while len(pending) >= self.max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for result in self._completed(done):
+                        yield result
+                pending.add(executor.submit(process, index, frame, content))
+                self.stats['sent'] += 1
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for result in self._completed(done):
+                    yield result
+
+    def _completed(self, done):
+        for future in done:
+            result = future.result()
+            self.stats['faces'] += len(result.faces or ())
+            yield result
+
+    def _process(self, index, frame, content):
+        if not isinstance(content, bytes):
+            data = io.BytesIO()
+            content.convert('RGB').save(data, 'JPEG', quality=self.quality)
+            content = data.getvalue()
+        try:
+            faces = face.detect(io.BytesIO(content))
+            candidates = None
+            if self.person_group_id is not None:
+                candidates = [entry['candidates'] for entry in
+                              face.identify_many(
+                                  [entry['faceId'] for entry in faces],
+                                  self.person_group_id,
+                                  self.max_candidates_return,
+                                  self.threshold, workers=1)]
+        except (CognitiveFaceException, requests.RequestException) as exc:
+            return FrameResult(index, frame, None, None, exc)
+        return FrameResult(index, frame, faces, candidates, None)
+
+
+def _content(frame):
+    """Return the content of a frame as bytes, or the PIL image."""
+    if isinstance(frame, (bytes, Image.Image)):
+        return frame
+    if hasattr(frame, 'read'):
+        return frame.read()
+    with open(frame, 'rb') as f:
+        return f.read()
+
+
+def detect(frames, person_group_id=None, **kwargs):
+    """Detect, and identify, the faces of a stream of frames, see
+    `FramePipeline`.
+
+    Returns:
+        A generator of `FrameResult`, in order of completion.
+    """
+    return FramePipeline(person_group_id, **kwargs).run(frames)
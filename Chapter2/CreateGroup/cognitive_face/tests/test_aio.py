@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_aio.py
+Description: Offline unittests of the asyncio flavour of the SDK.
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import aio
+from cognitive_face.mock_server import MockFaceServer
+from cognitive_face.region import Region, Router
+
+from .util import MockServerTestCase
+
+
+class TestAio(MockServerTestCase):
+    """Unittests of `cognitive_face.aio` against
+    `mock_server.MockFaceServer`."""
+
+    def setUp(self):
+        super(TestAio, self).setUp()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.complete(aio.Session.close())
+        self.loop.close()
+
+    def complete(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_enrollment(self):
+        """Faces detected in an enrolled image identify their person."""
+        async def enroll():
+            await aio.person_group.create('group')
+            person_ids = []
+            for name in ('Alice', 'Bob'):
+                person_id = (await aio.person.create('group',
+                                                     name))['personId']
+                await aio.person.add_face(io.BytesIO(name.encode('utf-8')),
+                                          'group', person_id)
+                person_ids.append(person_id)
+            await aio.person_group.train('group')
+            persons = [person async for person in aio.person.iter_lists(
+                'group', top=1, prefetch=True)]
+            faces = await asyncio.gather(aio.face.detect(io.BytesIO(b'Bob')),
+                                         aio.face.detect(io.BytesIO(b'Eve')))
+            res = await aio.face.identify_many(
+                [face[0]['faceId'] for face in faces], 'group')
+            return person_ids, persons, res
+
+        person_ids, persons, res = self.complete(enroll())
+        self.assertEqual(sorted(person['personId'] for person in persons),
+                         sorted(person_ids))
+        self.assertEqual(res[0]['candidates'][0]['personId'], person_ids[1])
+        self.assertEqual(res[1]['candidates'], [])
+
+    def test_off_loop(self):
+        """The preprocessor and the detection cache run off the loop."""
+        threads = set()
+
+        def preprocessor(image):
+            threads.add(threading.current_thread())
+            return image.read()
+
+        class Cache(CF.detect_cache.DetectCache):
+            def get(self, key):
+                threads.add(threading.current_thread())
+                return super(Cache, self).get(key)
+
+        handle, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(handle)
+        cache = Cache(path)
+        CF.Cache.set(cache)
+        CF.Preprocess.set(preprocessor)
+        try:
+            for _ in range(2):
+                self.complete(aio.face.detect(io.BytesIO(b'face')))
+        finally:
+            CF.Preprocess.set(None)
+            CF.Cache.set(None)
+            cache.close()
+            os.remove(path)
+        self.assertEqual(self.calls('POST', 'detect'), 1)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_regions(self):
+        """Coroutines go to the pinned region, else through the router."""
+        slow = MockFaceServer(latency=0.05).start()
+        self.addCleanup(slow.stop)
+        regions = [Region('slow', slow.base_url),
+                   Region('fast', self.server.base_url)]
+        CF.Route.set(Router(regions, failure_threshold=1))
+        self.addCleanup(CF.Route.set, None)
+
+        async def calls():
+            with CF.region.pin(regions[0]):
+                await aio.person_group.create('pinned')
+            await aio.person_group.create('routed')
+            self.server.error_rate = 1.0
+            return await aio.person_group.lists()
+
+        groups = self.complete(calls())
+        self.assertEqual([group['personGroupId'] for group in groups],
+                         ['pinned'])
+        self.assertEqual(slow.stats[('PUT', 'persongroups/{}')], 1)
+        self.assertEqual(self.calls('PUT', 'persongroups/{}'), 1)
+        self.assertFalse(regions[1].healthy)
+
+    def test_sessions(self):
+        """Each loop has its own session, dropped once the loop is closed."""
+        session = self.complete(self._session())
+        other = asyncio.new_event_loop()
+        other_session = other.run_until_complete(self._session())
+        self.assertIsNot(session, other_session)
+        self.assertIs(self.complete(self._session()), session)
+
+        other.run_until_complete(aio.Session.close())
+        self.assertTrue(other_session.closed)
+        other.close()
+        self.assertFalse(session.closed)
+
+        other = asyncio.new_event_loop()
+        other.run_until_complete(self._session())
+        other.close()
+        last = asyncio.new_event_loop()
+        last.run_until_complete(self._session())
+        self.assertEqual(set(aio.Session._sessions), {self.loop, last})
+        last.run_until_complete(aio.Session.close())
+        last.close()
+
+    async def _session(self):
+        await aio.person_group.lists()
+        return aio.Session.get()
+
+
+if __name__ == '__main__':
+    unittest.main()
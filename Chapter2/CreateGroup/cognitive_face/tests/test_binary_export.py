@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_binary_export.py
+Description: Unittests of the binary group export of create_group.py.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+
+import binary_export
+from binary_export import GroupExport
+
+
+def make_persons(count, faces=2):
+    return [{
+        'name': 'person{}'.format(idx),
+        'person_id': str(uuid.uuid4()),
+        'face_ids': [str(uuid.uuid4()) for _ in range(faces)],
+    } for idx in range(count)]
+
+
+class TestBinaryExport(unittest.TestCase):
+    """Unittests of `binary_export.write` and `binary_export.GroupExport`."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'group.bin')
+
+    def export(self, group_id, persons):
+        binary_export.write(self.path, group_id, persons)
+        group_export = GroupExport(self.path)
+        self.addCleanup(group_export.close)
+        return group_export
+
+    def test_round_trip(self):
+        """JSON to binary to JSON gives the same export back."""
+        groups = [
+            ('group', make_persons(1000)),
+            ('empty', []),
+            ('no faces', make_persons(3, faces=0)),
+            (u'grüppe 团体', [{
+                'name': u'Zoë 李雷 \U0001f600',
+                'person_id': str(uuid.uuid4()),
+                'face_ids': [str(uuid.uuid4())],
+            }, {
+                'name': u'',
+                'person_id': str(uuid.uuid4()),
+                'face_ids': [],
+            }]),
+        ]
+        json_file = os.path.join(self.directory, 'group.json')
+        copy = os.path.join(self.directory, 'copy.json')
+        for group_id, persons in groups:
+            json_obj = {'group_id': group_id, 'persons': persons}
+            with open(json_file, 'w') as f:
+                json.dump(json_obj, f)
+            binary_export.json_to_binary(json_file, self.path)
+            binary_export.binary_to_json(self.path, copy)
+            with open(copy) as f:
+                self.assertEqual(json.load(f), json_obj)
+
+            with GroupExport(self.path) as group_export:
+                self.assertEqual(len(group_export), len(persons))
+                self.assertEqual(group_export.face_count,
+                                 sum(len(p['face_ids']) for p in persons))
+                for person in persons:
+                    self.assertEqual(group_export.name(person['person_id']),
+                                     person['name'])
+                    self.assertEqual(
+                        group_export.face_ids(person['person_id']),
+                        person['face_ids'])
+
+    def test_find(self):
+        """Unknown and malformed ids are not found."""
+        persons = make_persons(50)
+        group_export = self.export('group', persons)
+        person_id = persons[7]['person_id']
+        self.assertEqual(group_export.name(person_id.upper()), 'person7')
+        self.assertEqual(group_export.name(person_id.replace('-', '')),
+                         'person7')
+        for unknown in (str(uuid.uuid4()), '', 'person7', person_id[:-2],
+                        person_id + '00', person_id[:-1] + 'x',
+                        '{' + person_id + '}', None):
+            self.assertIsNone(group_export.name(unknown), unknown)
+            self.assertIsNone(group_export.face_ids(unknown), unknown)
+
+        self.assertIsNone(self.export('empty', []).name(person_id))
+
+    def test_errors(self):
+        """Persons exported twice and other files are refused."""
+        persons = make_persons(3)
+        with self.assertRaises(ValueError):
+            binary_export.write(self.path, 'group', persons + persons[1:2])
+
+        with open(self.path, 'wb') as f:
+            f.write(b'{"group_id": "group", "persons": []}' + b' ' * 64)
+        with self.assertRaises(ValueError):
+            GroupExport(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_bulk.py
+Description: Offline unittests for the bulk deletion.
+"""
+
+import io
+import unittest
+
+import cognitive_face as CF
+
+from .util import MockServerTestCase
+
+
+class TestBulk(MockServerTestCase):
+    """Unittests for `bulk.BulkDeleter` against the mock server."""
+
+    def test_clear_person_groups(self):
+        """A dry run deletes nothing, a run deletes everything."""
+        for idx in range(20):
+            CF.person_group.create('group{}'.format(idx))
+        CF.face_list.create('list')
+
+        report = CF.util.clear_person_groups(dry_run=True)
+        self.assertEqual(report['deleted'], 0)
+        self.assertEqual(len(self.server.person_groups), 20)
+
+        report = CF.util.clear_person_groups()
+        self.assertEqual(report['deleted'], 20)
+        self.assertEqual(self.server.person_groups, {})
+        self.assertEqual(CF.util.clear_face_lists()['deleted'], 1)
+
+    def test_selective(self):
+        """Selected faces are deleted, missing entities count as deleted."""
+        CF.person_group.create('group')
+        for name in ('Alice', 'Bob'):
+            person_id = CF.person.create('group', name)['personId']
+            for content in (b'1', b'2', b'3'):
+                CF.person.add_face(io.BytesIO(name.encode() + content),
+                                   'group', person_id)
+
+        keep = dict((p['personId'], p['persistedFaceIds'][0])
+                    for p in CF.person.lists('group'))
+        deletions = CF.bulk.person_faces(
+            'group', lambda person, face_id: keep[person['personId']] !=
+            face_id)
+        self.assertEqual(len(deletions), 4)
+        report = CF.bulk.delete(deletions + deletions[:1], progress=None)
+        self.assertEqual(report['deleted'], 5)
+        self.assertEqual(
+            sorted(p['persistedFaceIds'][0] for p in CF.person.lists('group')),
+            sorted(keep.values()))
+
+        report = CF.bulk.delete(CF.bulk.persons(
+            'group', lambda person: person['name'] == 'Bob'), progress=None)
+        self.assertEqual([p['name'] for p in CF.person.lists('group')],
+                         ['Alice'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_client.py
+Description: Offline unittests of clients with their own subscription.
+"""
+
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import cognitive_face as CF
+from cognitive_face.mock_server import MockFaceServer
+
+
+class TestClient(unittest.TestCase):
+    """Unittests of `client.Client` against two `mock_server.MockFaceServer`
+    requiring different keys."""
+
+    def setUp(self):
+        self.servers = [MockFaceServer(key='key{}'.format(idx)).start()
+                        for idx in range(2)]
+        self.clients = [CF.Client('key{}'.format(idx), server.base_url,
+                                  CF.util.ConnectionPool())
+                        for idx, server in enumerate(self.servers)]
+        self.base_url = CF.util._BASE_URL
+        CF.util._BASE_URL = self.servers[0].base_url
+
+    def tearDown(self):
+        CF.util._BASE_URL = self.base_url
+        CF.Key.set(None)
+        for client, server in zip(self.clients, self.servers):
+            client.close()
+            server.stop()
+
+    def test_isolation(self):
+        """Concurrent clients call their own endpoint with their own key."""
+        def enroll(client):
+            client.person_group.create('group')
+            person_id = client.person.create('group', 'Alice')['personId']
+            client.person.add_face(io.BytesIO(b'alice'), 'group', person_id)
+            client.person_group.train('group')
+            self.assertEqual(client.training.wait('group')['status'],
+                             'succeeded')
+            face_ids = [client.face.detect(io.BytesIO(b'alice'))[0]['faceId']
+                        for _ in range(12)]
+            # Identified 10 faces per call, by the threads of the SDK.
+            res = client.face.identify_many(face_ids, 'group', workers=2)
+            return person_id, [r['candidates'][0]['personId'] for r in res]
+
+        with ThreadPoolExecutor(2) as executor:
+            results = list(executor.map(enroll, self.clients))
+        for person_id, identified in results:
+            self.assertEqual(identified, [person_id] * 12)
+        self.assertNotEqual(results[0][0], results[1][0])
+        for server in self.servers:
+            self.assertEqual(server.stats[('PUT', 'persongroups/{}')], 1)
+            self.assertEqual(server.stats[('POST', 'identify')], 2)
+            self.assertNotIn(401, server.stats)
+
+    def test_facade(self):
+        """The functions of the package use the process-wide settings, or
+        the active client."""
+        with self.assertRaises(CF.CognitiveFaceException) as context:
+            CF.person_group.create('group')
+        self.assertEqual(context.exception.status_code, 401)
+
+        CF.Key.set('key0')
+        CF.person_group.create('group')
+        with self.clients[1].activate():
+            CF.person_group.create('other')
+            self.assertEqual(CF.client.current(), self.clients[1])
+        self.assertEqual([g['personGroupId'] for g in CF.person_group.lists()],
+                         ['group'])
+        self.assertEqual(
+            [g['personGroupId'] for g in self.clients[1].person_group.lists()],
+            ['other'])
+
+    def test_iterators(self):
+        """Iterators fetch all their pages with their client."""
+        client = self.clients[1]
+        client.person_group.create('group')
+        for idx in range(5):
+            client.person.create('group', 'Person{}'.format(idx))
+        persons = client.person.iter_lists('group', top=2, prefetch=True)
+        self.assertEqual(len(list(persons)), 5)
+        self.assertNotIn(('GET', 'persongroups/{}/persons'),
+                         self.servers[0].stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
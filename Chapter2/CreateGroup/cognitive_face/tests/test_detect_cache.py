@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_detect_cache.py
+Description: Unittests for the persistent cache of `face.detect` results.
+"""
+
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import cognitive_face as CF
+from cognitive_face.mock_server import MockFaceServer
+from cognitive_face.region import Region, Router
+
+
+class TestDetectCache(unittest.TestCase):
+    """Unittests for `detect_cache.DetectCache`."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_key(self):
+        """Keys depend on the content, the parameters and where the detection
+        is sent."""
+        key = CF.detect_cache.DetectCache.key
+        params = {'returnFaceId': 'true'}
+        url = 'https://westus.api.cognitive.microsoft.com/face/v1.0/detect'
+        stream = io.BytesIO(b'image')
+        expected = key(stream, params, url, 'key')
+        self.assertEqual(stream.tell(), 0)
+        self.assertEqual(expected, key(b'image', params, url, 'key'))
+        self.assertNotEqual(expected, key(
+            b'image', {'returnFaceId': 'false'}, url, 'key'))
+        self.assertNotEqual(expected, key(
+            b'image', params, url.replace('westus', 'eastus2'), 'key'))
+        self.assertNotEqual(expected, key(b'image', params, url, 'key2'))
+
+    def test_clients(self):
+        """A cache shared by two clients keeps the `face_id`s of each."""
+        servers = [MockFaceServer(key='key{}'.format(idx)).start()
+                   for idx in range(2)]
+        cache = CF.detect_cache.DetectCache(self.path)
+        clients = [CF.Client('key{}'.format(idx), server.base_url,
+                             cache=cache)
+                   for idx, server in enumerate(servers)]
+        try:
+            face_ids = [[client.face.detect(io.BytesIO(b'alice'))[0]['faceId']
+                         for _ in range(2)] for client in clients]
+        finally:
+            CF.Session.close()
+            cache.close()
+            for server in servers:
+                server.stop()
+        for server, ids in zip(servers, face_ids):
+            self.assertEqual(server.stats[('POST', 'detect')], 1)
+            self.assertEqual(ids[0], ids[1])
+            self.assertIn(ids[0], server.faces)
+
+    def test_regions(self):
+        """The `face_id`s of each pinned region are kept apart, the calls
+        routed by a router are sent."""
+        servers = [MockFaceServer().start() for _ in range(2)]
+        regions = [Region('region{}'.format(idx), server.base_url)
+                   for idx, server in enumerate(servers)]
+        cache = CF.detect_cache.DetectCache(self.path)
+        CF.Cache.set(cache)
+        CF.Route.set(Router(regions, probe_interval=None))
+        try:
+            for region in regions * 2:
+                with CF.region.pin(region):
+                    CF.face.detect(io.BytesIO(b'alice'))
+            for server in servers:
+                self.assertEqual(server.stats[('POST', 'detect')], 1)
+            for _ in range(2):
+                CF.face.detect(io.BytesIO(b'alice'))
+        finally:
+            CF.Cache.set(None)
+            CF.Route.set(None)
+            CF.Session.close()
+            cache.close()
+            for server in servers:
+                server.stop()
+        self.assertEqual(sum(server.stats[('POST', 'detect')]
+                             for server in servers), 4)
+
+    def test_ttl(self):
+        """Results holding `face_id`s expire."""
+        cache = CF.detect_cache.DetectCache(self.path, ttl=0.05)
+        cache.put('with', [{'faceId': 'f'}])
+        cache.put('without', [{}], expires=False)
+        self.assertEqual(cache.get('with'), [{'faceId': 'f'}])
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('with'))
+        self.assertEqual(cache.get('without'), [{}])
+        cache.close()
+
+    def test_lru(self):
+        """The least recently used results are evicted first."""
+        cache = CF.detect_cache.DetectCache(self.path, max_entries=2)
+        cache.put('a', [1])
+        time.sleep(0.01)
+        cache.put('b', [2])
+        time.sleep(0.01)
+        cache.get('a')
+        cache.put('c', [3])
+        self.assertEqual(cache.get('a'), [1])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), [3])
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_enroll.py
+Description: Offline unittests of the enrollment of create_group.py.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import cognitive_face as CF
+import create_group
+import scanner
+
+from .util import MockServerTestCase
+
+PERSONS = ('Alice', 'Bob', 'Carol', 'Dave', 'Eve')
+IMAGES = 5
+
+
+class TestEnroll(MockServerTestCase):
+    """Unittests of `create_group.create_persons`, one call at a time and
+    concurrently, against `mock_server.MockFaceServer`."""
+
+    # Calls complete out of order.
+    server_options = {'latency_jitter': 0.02}
+
+    def setUp(self):
+        super(TestEnroll, self).setUp()
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        for name in PERSONS:
+            os.makedirs(os.path.join(self.source, name))
+            for idx in range(IMAGES):
+                self.write(name, idx, '{}{}'.format(name, idx).encode('utf-8'))
+
+    def write(self, name, idx, content):
+        with open(os.path.join(self.source, name, '{}.jpg'.format(idx)),
+                  'wb') as f:
+            f.write(content)
+
+    def enroll(self, group_id, workers):
+        """Enroll a group, return the name of each person with the image hash
+        of each of its faces, in the order returned."""
+        CF.person_group.create(group_id)
+        persons = create_group.create_persons(group_id, self.source, workers)
+        for person in persons:
+            server = CF.person.get(group_id, person['person_id'])
+            self.assertEqual(server['name'], person['name'])
+            self.assertEqual(sorted(server['persistedFaceIds']),
+                             sorted(person['face_ids']))
+        return [(person['name'],
+                 [CF.person.get_face(group_id, person['person_id'],
+                                     face_id)['userData']
+                  for face_id in person['face_ids']])
+                for person in persons]
+
+    def test_order(self):
+        """Concurrent enrollment returns the persons and their faces in the
+        order of the source directory, as one call at a time does."""
+        index = scanner.scan(self.source)
+        expected = [(name, [image.hash for image in images])
+                    for name, images in index.items()]
+        self.assertEqual(self.enroll('serial', 1), expected)
+        for workers in (2, 8):
+            self.assertEqual(self.enroll('group{}'.format(workers), workers),
+                             expected)
+
+    def test_errors(self):
+        """A failed upload is raised, whatever the number of workers."""
+        self.write('Carol', 2, b'')
+        for workers in (1, 4):
+            group_id = 'group{}'.format(workers)
+            CF.person_group.create(group_id)
+            with self.assertRaises(CF.CognitiveFaceException) as ctx:
+                create_group.create_persons(group_id, self.source, workers)
+            self.assertEqual(ctx.exception.code, 'InvalidImageSize')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ import cognitive_face as CF
 from . import util
 
 
+@util.requires_config
 class TestFace(unittest.TestCase):
     """Unittests for Face section."""
 
@@ -55,6 +56,16 @@ class TestFace(unittest.TestCase):
         self.assertIsInstance(res, list)
         util.wait()
 
+    def test_identify_many(self):
+        """Unittest for `face.identify_many`."""
+        CF.util.wait_for_training(util.DataStore.person_group_id)
+
+        face_ids = util.DataStore.face_ids * 3
+        res = CF.face.identify_many(face_ids, util.DataStore.person_group_id)
+        print(res)
+        self.assertEqual([entry['faceId'] for entry in res], face_ids)
+        util.wait()
+
     def test_verify(self):
         """Unittest for `face.verify`."""
         res = CF.face.verify(
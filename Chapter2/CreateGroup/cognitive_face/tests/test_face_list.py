@@ -13,6 +13,7 @@ import cognitive_face as CF
 from . import util
 
 
+@util.requires_config
 class TestFaceList(unittest.TestCase):
     """Unittests for Face List section."""
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_instrument.py
+Description: Unittests for the request instrumentation.
+"""
+
+import unittest
+
+import cognitive_face as CF
+
+from .util import MockServerTestCase
+
+
+class TestInstrument(MockServerTestCase):
+    """Unittests for `instrument.Metrics` and the hooks of `util.request`."""
+
+    def setUp(self):
+        super(TestInstrument, self).setUp()
+        self.metrics = CF.instrument.Metrics()
+        CF.Instrument.add(self.metrics)
+
+    def tearDown(self):
+        CF.Instrument.remove(self.metrics)
+
+    def test_metrics(self):
+        """Calls are counted per endpoint template and status."""
+        CF.person_group.create('group')
+        for _ in range(3):
+            CF.person.create('group', 'Alice')
+        with self.assertRaises(CF.CognitiveFaceException):
+            CF.person_group.get('missing')
+
+        counters = dict(
+            ((c['name'], c['labels']['endpoint'], c['labels'].get('status')),
+             c['value']) for c in self.metrics.to_json()['counters'])
+        self.assertEqual(
+            counters[('requests_total', 'persongroups/{}/persons', '200')], 3)
+        self.assertEqual(
+            counters[('requests_total', 'persongroups/{}', '404')], 1)
+        self.assertGreater(
+            counters[('bytes_sent_total', 'persongroups/{}/persons', None)], 0)
+
+        text = self.metrics.to_prometheus()
+        self.assertIn('cognitive_face_request_duration_seconds_count{'
+                      'method="POST",endpoint="persongroups/{}/persons"} 3',
+                      text)
+        self.assertIn('cognitive_face_connect_duration_seconds', text)
+
+    def test_histogram(self):
+        """Quantiles are interpolated within their bucket."""
+        histogram = CF.instrument.Histogram((1, 2, 4))
+        for value in (0.5, 1.5, 1.5, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertAlmostEqual(histogram.quantile(0.5), 1.75)
+        self.assertEqual(histogram.quantile(1), 4)
+        self.assertIsNone(CF.instrument.Histogram().quantile(0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_journal.py
+Description: Offline unittests of the resumable enrollment of create_group.py.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import cognitive_face as CF
+import create_group
+from journal import Journal
+
+from .util import MockServerTestCase
+
+PERSONS = ('Alice', 'Bob', 'Carol')
+IMAGES = 3
+
+
+class Crash(Exception):
+    """Stands for the run being killed."""
+
+
+def crash_after(calls):
+    """Make `person.add_face` crash the run after a number of calls."""
+    add_face = CF.person.add_face
+    count = itertools.count()
+
+    def crashing(*args, **kwargs):
+        if next(count) >= calls:
+            raise Crash()
+        return add_face(*args, **kwargs)
+    return mock.patch.object(CF.person, 'add_face', crashing)
+
+
+class TestJournal(MockServerTestCase):
+    """Unittests of `journal.Journal` and of resuming
+    `create_group.enroll_group` against `mock_server.MockFaceServer`."""
+
+    def setUp(self):
+        super(TestJournal, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.source = os.path.join(self.directory, 'persons')
+        for name in PERSONS:
+            os.makedirs(os.path.join(self.source, name))
+            for idx in range(IMAGES):
+                with open(os.path.join(self.source, name,
+                                       '{}.jpg'.format(idx)), 'wb') as f:
+                    f.write('{}{}'.format(name, idx).encode('utf-8'))
+        self.path = os.path.join(self.directory, 'journal.jsonl')
+        CF.person_group.create('group')
+
+    def crash(self, calls, workers):
+        """Enroll until the run crashes, then truncate the last record of
+        the journal as a kill in the middle of its write would."""
+        journal = Journal(self.path, 'group')
+        with crash_after(calls), self.assertRaises(Crash):
+            create_group.create_persons('group', self.source, workers,
+                                        journal)
+        journal.close()
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 10)
+
+    def resume(self, workers):
+        persons, training = create_group.enroll_group(
+            'group', self.source, workers, journal_file=self.path)
+        training.result()
+        return persons
+
+    def server_persons(self):
+        """Return the faces of each person of the group, by name."""
+        persons = CF.person.lists('group')
+        self.assertEqual(sorted(person['name'] for person in persons),
+                         sorted(PERSONS))
+        return {person['name']: person['persistedFaceIds']
+                for person in persons}
+
+    def test_resume(self):
+        """Completed entries are skipped and no person is created twice,
+        even when its record was truncated."""
+        # Alice and her faces, then Bob, whose record is truncated.
+        self.crash(IMAGES, 1)
+        self.assertEqual(self.calls('POST', 'persongroups/{}/persons'), 2)
+
+        persons = self.resume(1)
+        self.assertEqual([person['name'] for person in persons],
+                         list(PERSONS))
+        self.assertEqual(self.calls('POST', 'persongroups/{}/persons'), 3)
+        self.assertEqual(
+            self.calls('POST', 'persongroups/{}/persons/{}/persistedFaces'),
+            len(PERSONS) * IMAGES)
+        server = self.server_persons()
+        for person in persons:
+            self.assertEqual(sorted(person['face_ids']),
+                             sorted(server[person['name']]))
+
+        # The journal is complete, nothing is sent again.
+        self.resume(1)
+        self.assertEqual(self.calls('POST', 'persongroups/{}/persons'), 3)
+        self.assertEqual(
+            self.calls('POST', 'persongroups/{}/persons/{}/persistedFaces'),
+            len(PERSONS) * IMAGES)
+
+    def test_resume_concurrently(self):
+        """A concurrent run is resumed without duplicating persons."""
+        self.crash(4, 4)
+        persons = self.resume(4)
+        server = self.server_persons()
+        for person in persons:
+            self.assertEqual(len(person['face_ids']), IMAGES)
+            self.assertLessEqual(set(person['face_ids']),
+                                 set(server[person['name']]))
+
+    def test_resume_after_error(self):
+        """A failed call cancels the queued ones and the faces added in the
+        meantime are journaled, so resuming duplicates none."""
+        self.server.latency = 0.02
+        bad_image = os.path.join(self.source, 'Alice', '0.jpg')
+        open(bad_image, 'wb').close()
+        journal = Journal(self.path, 'group')
+        with self.assertRaises(CF.CognitiveFaceException):
+            create_group.create_persons('group', self.source, 2, journal)
+        journaled = sorted(filter(None, (
+            journal.face_id(name, os.path.join(self.source, name,
+                                               '{}.jpg'.format(idx)))
+            for name in PERSONS for idx in range(IMAGES))))
+        journal.close()
+        self.assertEqual(journaled, sorted(itertools.chain.from_iterable(
+            self.server_persons().values())))
+        self.assertLess(len(journaled), len(PERSONS) * IMAGES - 1)
+
+        with open(bad_image, 'wb') as f:
+            f.write(b'Alice0')
+        persons = self.resume(4)
+        server = self.server_persons()
+        self.assertEqual(sum(len(faces) for faces in server.values()),
+                         len(PERSONS) * IMAGES)
+        for person in persons:
+            self.assertEqual(sorted(person['face_ids']),
+                             sorted(server[person['name']]))
+
+    def test_records(self):
+        """Records survive a reopening, a truncated line is skipped and the
+        journal of another group is refused."""
+        journal = Journal(self.path, 'group')
+        self.assertFalse(journal.resumed)
+        journal.add_person('Alice', 'id1')
+        journal.add_face('Alice', 'a.jpg', 'face1')
+        journal.add_person('Bob', 'id2')
+        journal.close()
+        with open(self.path, 'rb+') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+
+        journal = Journal(self.path, 'group')
+        self.assertTrue(journal.resumed)
+        self.assertEqual(journal.person_id('Alice'), 'id1')
+        self.assertEqual(journal.face_id('Alice', 'a.jpg'), 'face1')
+        self.assertIsNone(journal.person_id('Bob'))
+        journal.add_person('Bob', 'id3')
+        journal.close()
+        journal = Journal(self.path, 'group')
+        self.assertEqual(journal.person_id('Bob'), 'id3')
+        journal.close()
+
+        with self.assertRaises(Exception):
+            Journal(self.path, 'other')
+
+
+if __name__ == '__main__':
+    unittest.main()
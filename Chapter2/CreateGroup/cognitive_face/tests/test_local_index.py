@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_local_index.py
+Description: Offline unittests for the local identification index.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+import cognitive_face as CF
+from cognitive_face import local_index
+from cognitive_face.local_index import LocalIndex, ThumbnailEmbedding
+from cognitive_face.mock_server import MockFaceServer
+
+
+def make_image(seed):
+    """Return the content of a distinct random JPEG."""
+    rng = np.random.RandomState(seed)
+    output = io.BytesIO()
+    Image.fromarray(rng.randint(0, 255, (64, 64, 3)).astype(np.uint8)).save(
+        output, 'JPEG')
+    return output.getvalue()
+
+
+class TestLocalIndex(unittest.TestCase):
+    """Unittests for `local_index.LocalIndex`."""
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.centers = rng.normal(size=(200, 64))
+        self.index = LocalIndex()
+        for person in range(200):
+            for _ in range(3):
+                self.index.add('person{}'.format(person), vector=(
+                    self.centers[person] + rng.normal(scale=0.3, size=64)))
+
+    def test_search(self):
+        """The closest person comes first, partitioned or not."""
+        queries = self.centers[:50] + np.random.RandomState(1).normal(
+            scale=0.3, size=(50, 64))
+        expected = ['person{}'.format(person) for person in range(50)]
+        res = self.index.search(queries, k=3)
+        self.assertEqual([c[0]['personId'] for c in res], expected)
+        self.assertEqual(len(res[0]), 3)
+        self.assertGreater(res[0][0]['confidence'], res[0][1]['confidence'])
+
+        self.index.build(partitions=16)
+        res = self.index.search(queries, k=1)
+        recall = np.mean([c[0]['personId'] == person
+                          for c, person in zip(res, expected)])
+        self.assertGreaterEqual(recall, 0.9)
+
+    def test_exact(self):
+        """Small groups are not partitioned, large ones are."""
+        queries = self.centers[:50]
+        res = self.index.search(queries, k=3)
+        self.index.build()
+        self.assertIsNone(self.index._partitions)
+        self.assertEqual(self.index.search(queries, k=3), res)
+
+        with mock.patch.object(local_index, 'EXACT_MAX_FACES', 100):
+            self.index.build()
+        self.assertEqual(len(self.index._partitions), 24)
+
+    def test_save_load(self):
+        """A loaded index answers as the saved one."""
+        self.index.build(partitions=8)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'index.npz')
+        self.index.save(path)
+        loaded = LocalIndex.load(path)
+        self.assertEqual(len(loaded), 600)
+        self.assertEqual(loaded.search(self.centers[:10]),
+                         self.index.search(self.centers[:10]))
+
+    def test_fallback(self):
+        """Faces unknown locally are identified remotely."""
+        server = MockFaceServer().start()
+        base_url = CF.util._BASE_URL
+        CF.util._BASE_URL = server.base_url
+        try:
+            CF.person_group.create('group')
+            index = LocalIndex(ThumbnailEmbedding(), 'group')
+            for name in ('Alice', 'Bob'):
+                person_id = CF.person.create('group', name)['personId']
+                CF.person.add_face(io.BytesIO(make_image(len(name))), 'group',
+                                   person_id)
+                if name == 'Alice':
+                    index.add(person_id, make_image(len(name)))
+            CF.person_group.train('group')
+
+            res = index.identify([make_image(5), make_image(3)])
+            self.assertAlmostEqual(res[0][0]['confidence'], 1.0, places=5)
+            self.assertEqual(server.stats.get(('POST', 'identify')), 1)
+            self.assertNotEqual(res[0][0]['personId'], res[1][0]['personId'])
+        finally:
+            CF.util._BASE_URL = base_url
+            CF.Session.close()
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_metadata_cache.py
+Description: Offline unittests of the metadata cache.
+"""
+
+import asyncio
+import io
+import time
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import aio
+from cognitive_face.metadata_cache import MetadataCache
+from cognitive_face.mock_server import MockFaceServer
+from cognitive_face.region import Region, Router
+
+from .util import MockServerTestCase
+
+
+class TestMetadataCache(MockServerTestCase):
+    """Unittests of `metadata_cache.MetadataCache` against
+    `mock_server.MockFaceServer`."""
+
+    def setUp(self):
+        super(TestMetadataCache, self).setUp()
+        self.cache = MetadataCache()
+        CF.Metadata.set(self.cache)
+        CF.person_group.create('group', 'Group')
+        CF.person_group.create('group2', 'Group 2')
+        self.person_id = CF.person.create('group', 'Alice')['personId']
+
+    def tearDown(self):
+        CF.Metadata.set(None)
+
+    def gets(self, endpoint):
+        return self.calls('GET', endpoint)
+
+    def test_identify_names(self):
+        """The persons of identified faces are resolved from memory."""
+        CF.person.add_face(io.BytesIO(b'alice'), 'group', self.person_id)
+        CF.person_group.train('group')
+        for _ in range(5):
+            face_id = CF.face.detect(io.BytesIO(b'alice'))[0]['faceId']
+            res = CF.face.identify([face_id], 'group')
+            person_id = res[0]['candidates'][0]['personId']
+            self.assertEqual(CF.person.get('group', person_id)['name'],
+                             'Alice')
+        self.assertEqual(self.gets('persongroups/{}/persons/{}'), 1)
+        self.assertEqual(self.cache.stats, {'hits': 4, 'misses': 1})
+
+    def test_invalidation(self):
+        """Modifications drop the responses they made stale, only them."""
+        CF.person_group.get('group')
+        CF.person_group.get('group2')
+        self.assertEqual(len(CF.person.lists('group')[0]['persistedFaceIds']),
+                         0)
+        CF.person.get('group', self.person_id)
+
+        CF.person.add_face(io.BytesIO(b'alice'), 'group', self.person_id)
+        self.assertEqual(
+            len(CF.person.get('group', self.person_id)['persistedFaceIds']),
+            1)
+        self.assertEqual(len(CF.person.lists('group')[0]['persistedFaceIds']),
+                         1)
+        self.assertEqual(self.gets('persongroups/{}/persons/{}'), 2)
+        self.assertEqual(self.gets('persongroups/{}/persons'), 2)
+
+        CF.person.update('group', self.person_id, 'Alicia')
+        self.assertEqual(CF.person.get('group', self.person_id)['name'],
+                         'Alicia')
+        CF.person_group.update('group', 'Renamed')
+        self.assertEqual(CF.person_group.get('group')['name'], 'Renamed')
+        CF.person_group.get('group2')
+        self.assertEqual(self.gets('persongroups/{}'), 3)
+
+        CF.person.delete('group', self.person_id)
+        with self.assertRaises(CF.CognitiveFaceException):
+            CF.person.get('group', self.person_id)
+        self.assertEqual(CF.person.lists('group'), [])
+
+    def test_copies(self):
+        """Callers get their own copy of the responses."""
+        CF.person_group.get('group')['name'] = 'Changed'
+        self.assertEqual(CF.person_group.get('group')['name'], 'Group')
+
+    def test_ttl(self):
+        """Responses expire after the TTL of their endpoint."""
+        CF.Metadata.set(MetadataCache({'persongroups/{}': 0.1}, 2))
+        CF.person_group.get('group')
+        CF.person_group.get('group')
+        CF.person.get('group', self.person_id)
+        self.assertEqual(self.gets('persongroups/{}'), 1)
+        time.sleep(0.15)
+        CF.person_group.get('group')
+        CF.person.get('group', self.person_id)
+        self.assertEqual(self.gets('persongroups/{}'), 2)
+        self.assertEqual(self.gets('persongroups/{}/persons/{}'), 2)
+
+    def test_aio(self):
+        """Coroutines share the cache with the threads."""
+        async def calls():
+            try:
+                names = [(await aio.person.get('group',
+                                               self.person_id))['name']
+                         for _ in range(3)]
+                await aio.person.update('group', self.person_id, 'Alicia')
+                return names
+            finally:
+                await aio.Session.close()
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        self.assertEqual(loop.run_until_complete(calls()), ['Alice'] * 3)
+        self.assertEqual(self.gets('persongroups/{}/persons/{}'), 1)
+        self.assertEqual(self.cache.stats, {'hits': 2, 'misses': 1})
+        self.assertEqual(CF.person.get('group', self.person_id)['name'],
+                         'Alicia')
+
+    def test_clients(self):
+        """Clients sharing the cache get the responses of their own
+        subscription."""
+        server = MockFaceServer(key='key1').start()
+        self.addCleanup(server.stop)
+        clients = [CF.Client(key, base_url, metadata=self.cache)
+                   for key, base_url in (('key0', self.server.base_url),
+                                         ('key1', server.base_url),
+                                         ('key2', self.server.base_url))]
+        clients[1].person_group.create('group', 'Other')
+        names = [client.person_group.get('group')['name']
+                 for client in clients * 2]
+        self.assertEqual(names, ['Group', 'Other', 'Group'] * 2)
+        self.assertEqual(self.gets('persongroups/{}'), 2)
+        self.assertEqual(server.stats[('GET', 'persongroups/{}')], 1)
+
+        clients[0].person_group.update('group', 'Renamed')
+        self.assertEqual([client.person_group.get('group')['name']
+                          for client in clients],
+                         ['Renamed', 'Other', 'Group'])
+
+    def test_regions(self):
+        """Each region gets the responses of its own person groups, also
+        when routed."""
+        server = MockFaceServer().start()
+        self.addCleanup(server.stop)
+        regions = [Region('region0', self.server.base_url),
+                   Region('region1', server.base_url)]
+        names = {'region0': 'Group', 'region1': 'Other'}
+        router = Router(regions, probe_interval=None)
+        CF.Route.set(router)
+        self.addCleanup(CF.Route.set, None)
+        with CF.region.pin(regions[1]):
+            CF.person_group.create('group', 'Other')
+        for _ in range(2):
+            for region in regions:
+                with CF.region.pin(region):
+                    self.assertEqual(CF.person_group.get('group')['name'],
+                                     names[region.name])
+        self.assertEqual(self.gets('persongroups/{}'), 1)
+        self.assertEqual(server.stats[('GET', 'persongroups/{}')], 1)
+
+        region = router.order()[0]
+        self.assertEqual(CF.person_group.get('group')['name'],
+                         names[region.name])
+
+
+if __name__ == '__main__':
+    unittest.main()
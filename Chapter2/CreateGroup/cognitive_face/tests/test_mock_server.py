@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_mock_server.py
+Description: Offline unittests of the SDK against the local mock server.
+"""
+
+import asyncio
+import io
+import time
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import aio
+
+from .util import MockServerTestCase
+
+
+class TestMockServer(MockServerTestCase):
+    """Unittests of the SDK against `mock_server.MockFaceServer`."""
+
+    def tearDown(self):
+        CF.Retry.set(None)
+
+    def test_enrollment(self):
+        """Faces detected in an enrolled image identify their person."""
+        CF.person_group.create('group', 'Group')
+        person_id = CF.person.create('group', 'Alice')['personId']
+        CF.person.add_face(io.BytesIO(b'alice'), 'group', person_id)
+        CF.person_group.train('group')
+        self.assertEqual(CF.person_group.get_status('group')['status'],
+                         'succeeded')
+
+        face_ids = [CF.face.detect(io.BytesIO(content))[0]['faceId']
+                    for content in (b'alice', b'bob')]
+        res = CF.face.identify(face_ids, 'group')
+        self.assertEqual(res[0]['candidates'][0]['personId'], person_id)
+        self.assertEqual(res[1]['candidates'], [])
+
+        persons = CF.person.lists('group')
+        self.assertEqual([p['name'] for p in persons], ['Alice'])
+        self.assertEqual(len(persons[0]['persistedFaceIds']), 1)
+
+    def test_identify_many(self):
+        """Faces are identified by chunks of 10, in the order of the
+        `face_ids` whatever the order of each response."""
+        handle = self.server.handle
+
+        def reversing(method, path, query, headers, body):
+            # pylint: disable=too-many-arguments
+            status_code, response_headers, payload = handle(
+                method, path, query, headers, body)
+            if path.endswith('/identify') and status_code == 200:
+                payload = payload[::-1]
+            return status_code, response_headers, payload
+        self.server.handle = reversing
+
+        CF.person_group.create('group')
+        person_ids = {}
+        for name in ('alice', 'bob', 'carol'):
+            person_ids[name] = CF.person.create('group', name)['personId']
+            CF.person.add_face(io.BytesIO(name.encode('utf-8')), 'group',
+                               person_ids[name])
+        CF.person_group.train('group')
+
+        names = [('alice', 'bob', 'carol')[idx % 3] for idx in range(23)]
+        face_ids = [CF.face.detect(io.BytesIO(name.encode('utf-8')))[0][
+            'faceId'] for name in names]
+        for workers in (1, 3):
+            res = CF.face.identify_many(face_ids, 'group', workers=workers)
+            self.assertEqual([entry['faceId'] for entry in res], face_ids)
+            self.assertEqual([entry['candidates'][0]['personId']
+                              for entry in res],
+                             [person_ids[name] for name in names])
+        self.assertEqual(self.calls('POST', 'identify'), 6)
+
+        async def identify_many():
+            try:
+                return await aio.face.identify_many(face_ids, 'group')
+            finally:
+                await aio.Session.close()
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        res = loop.run_until_complete(identify_many())
+        self.assertEqual([entry['faceId'] for entry in res], face_ids)
+
+    def test_iter_lists(self):
+        """Iterators fetch every page, one at a time."""
+        for idx in range(25):
+            CF.person_group.create('group{:02d}'.format(idx))
+            CF.person.create('group00', 'Person{}'.format(idx))
+        for prefetch in (False, True):
+            groups = CF.person_group.iter_lists(top=10, prefetch=prefetch)
+            self.assertEqual(next(groups)['personGroupId'], 'group00')
+            self.assertEqual(
+                [g['personGroupId'] for g in groups],
+                ['group{:02d}'.format(idx) for idx in range(1, 25)])
+            persons = CF.person.iter_lists('group00', top=5,
+                                           prefetch=prefetch)
+            self.assertEqual(len(set(p['personId'] for p in persons)), 25)
+        self.assertEqual(self.server.stats[('GET', 'persongroups')], 6)
+        self.assertEqual(
+            self.server.stats[('GET', 'persongroups/{}/persons')], 12)
+
+    def test_errors(self):
+        """Errors are answered in the format of the API."""
+        with self.assertRaises(CF.CognitiveFaceException) as ctx:
+            CF.person_group.get('missing')
+        self.assertEqual(ctx.exception.code, 'PersonGroupNotFound')
+
+        CF.person_group.create('group')
+        with self.assertRaises(CF.CognitiveFaceException) as ctx:
+            CF.person_group.create('group')
+        self.assertEqual(ctx.exception.status_code, 409)
+
+    def test_throttling(self):
+        """Throttled calls are answered with `429` and retried."""
+        self.server.rate = 1
+        with self.assertRaises(CF.CognitiveFaceException) as ctx:
+            for _ in range(3):
+                CF.person_group.lists()
+        self.assertEqual(ctx.exception.status_code, 429)
+
+        CF.Retry.set(CF.retry.RetryPolicy())
+        self.server.rate = 50
+        for _ in range(60):
+            CF.person_group.lists()
+        self.assertGreater(self.server.stats[429], 1)
+
+    def test_fractional_rate(self):
+        """Rates below one call per second let a call through once a token
+        has built up."""
+        self.server.rate = 0.9
+        time.sleep(1.2)
+        CF.person_group.lists()
+        with self.assertRaises(CF.CognitiveFaceException) as ctx:
+            CF.person_group.lists()
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.code, 'RateLimitExceeded')
+
+    def test_error_injection(self):
+        """Injected failures of idempotent calls are retried."""
+        self.server.error_rate = 0.3
+        CF.Retry.set(CF.retry.RetryPolicy(backoff=0.01, budget_floor=100))
+        for _ in range(20):
+            CF.person_group.lists()
+        self.assertGreater(self.server.stats[500], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ import cognitive_face as CF
 from . import util
 
 
+@util.requires_config
 class TestPerson(unittest.TestCase):
     """Unittests for Person section."""
 
@@ -13,6 +13,7 @@ import cognitive_face as CF
 from . import util
 
 
+@util.requires_config
 class TestPersonGroup(unittest.TestCase):
     """Unittests for Person Group section."""
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_preprocess.py
+Description: Offline unittests of the client side image pre-processing.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+import cognitive_face as CF
+from cognitive_face.preprocess import Preprocessor, process
+
+from .util import MockServerTestCase
+
+
+def encode(size, fmt='JPEG', orientation=None):
+    """Return the content of an image of a size, with an EXIF orientation."""
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    output = io.BytesIO()
+    if orientation is None:
+        image.save(output, fmt)
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(output, fmt, exif=exif.tobytes())
+    return output.getvalue()
+
+
+def size(content):
+    image = Image.open(io.BytesIO(content))
+    return image.format, image.size
+
+
+class TestPreprocess(MockServerTestCase):
+    """Unittests of `preprocess.Preprocessor`, installed with
+    `util.Preprocess`."""
+
+    def tearDown(self):
+        CF.Preprocess.set(None)
+
+    def test_downscale(self):
+        """Large images are downscaled to fit, JPEGs included."""
+        self.assertEqual(size(process(encode((3200, 3200)), 1600, 90)),
+                         ('JPEG', (1600, 1600)))
+        self.assertEqual(size(process(encode((3000, 1200)), 1000, 90)),
+                         ('JPEG', (1000, 400)))
+        self.assertEqual(size(process(encode((2000, 1000), 'PNG'), 500, 90)),
+                         ('JPEG', (500, 250)))
+
+    def test_orientation(self):
+        """Images are rotated as their EXIF orientation says."""
+        rotated = process(encode((200, 100), orientation=6), 1600, 90)
+        self.assertEqual(size(rotated), ('JPEG', (100, 200)))
+        self.assertNotIn(0x0112, Image.open(io.BytesIO(rotated)).getexif())
+        self.assertEqual(
+            size(process(encode((3200, 1600), orientation=8), 800, 90)),
+            ('JPEG', (400, 800)))
+
+    def test_pass_through(self):
+        """Small upright JPEGs are sent untouched, other formats are
+        re-encoded."""
+        for content in (encode((800, 600)), encode((800, 600),
+                                                   orientation=1)):
+            self.assertIs(process(content, 800, 90), content)
+        self.assertEqual(size(process(encode((800, 600), 'PNG'), 800, 90)),
+                         ('JPEG', (800, 600)))
+
+    def test_upload(self):
+        """The processed images of paths and file-like objects are
+        uploaded, URLs are sent as they are."""
+        bodies = []
+        handle = self.server.handle
+
+        def recording(method, path, query, headers, body):
+            # pylint: disable=too-many-arguments
+            bodies.append(body)
+            return handle(method, path, query, headers, body)
+        self.server.handle = recording
+
+        fd, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(encode((2400, 1200)))
+        self.addCleanup(os.remove, path)
+
+        for processes in (None, 2):
+            preprocessor = Preprocessor(600, processes=processes)
+            self.addCleanup(preprocessor.close)
+            CF.Preprocess.set(preprocessor)
+            del bodies[:]
+            CF.face.detect(path)
+            CF.face.detect(io.BytesIO(encode((300, 1200))))
+            CF.face.detect('https://example.com/face.jpg')
+            self.assertEqual([size(body) for body in bodies[:2]],
+                             [('JPEG', (600, 300)), ('JPEG', (150, 600))])
+            self.assertIn(b'example.com', bodies[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
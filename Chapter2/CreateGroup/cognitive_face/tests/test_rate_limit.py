@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_rate_limit.py
+Description: Unittests for the client side rate limiter.
+"""
+
+import os
+import tempfile
+import unittest
+
+import cognitive_face as CF
+
+
+class TestRateLimit(unittest.TestCase):
+    """Unittests for `rate_limit.RateLimiter`."""
+
+    def test_burst_is_smoothed(self):
+        """Calls beyond the burst are given evenly spaced slots."""
+        limiter = CF.rate_limit.RateLimiter(10, burst=2)
+        delays = [limiter.reserve() for _ in range(5)]
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        for expected, delay in zip([0.1, 0.2, 0.3], delays[2:]):
+            self.assertAlmostEqual(delay, expected, delta=0.02)
+
+    def test_monthly_quota(self):
+        """Calls beyond the monthly quota are rejected."""
+        limiter = CF.rate_limit.RateLimiter(1000, per_month=3)
+        for _ in range(3):
+            limiter.reserve()
+        with self.assertRaises(CF.CognitiveFaceException) as ctx:
+            limiter.reserve()
+        self.assertEqual(ctx.exception.code, 'QuotaExceeded')
+        self.assertEqual(limiter.used_this_month(), 3)
+
+    def test_shared_lock_file(self):
+        """Limiters using the same lock file share one bucket."""
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            first = CF.rate_limit.RateLimiter(10, burst=1, lock_file=path)
+            second = CF.rate_limit.RateLimiter(10, burst=1, lock_file=path)
+            self.assertEqual(first.reserve(), 0.0)
+            self.assertAlmostEqual(second.reserve(), 0.1, delta=0.02)
+            self.assertEqual(first.used_this_month(), 2)
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
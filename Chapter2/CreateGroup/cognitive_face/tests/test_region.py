@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_region.py
+Description: Offline unittests of the routing of calls over regions.
+"""
+
+import io
+import unittest
+
+import cognitive_face as CF
+from cognitive_face.mock_server import MockFaceServer
+from cognitive_face.region import Region, Router
+
+
+class TestRegion(unittest.TestCase):
+    """Unittests of `region.Router` and `region.pin` against two
+    `mock_server.MockFaceServer`."""
+
+    def setUp(self):
+        self.slow = MockFaceServer(latency=0.05).start()
+        self.fast = MockFaceServer().start()
+        self.regions = [Region('slow', self.slow.base_url),
+                        Region('fast', self.fast.base_url)]
+        self.router = Router(self.regions, failure_threshold=2)
+        CF.Route.set(self.router)
+
+    def tearDown(self):
+        CF.Route.set(None)
+        CF.Session.close()
+        self.slow.stop()
+        self.fast.stop()
+
+    def test_fastest(self):
+        """Calls go to the fastest region once probed."""
+        latencies = self.router.probe()
+        self.assertGreater(latencies['slow'], latencies['fast'])
+        self.assertEqual([r.name for r in self.router.order()],
+                         ['fast', 'slow'])
+        CF.person_group.create('group')
+        self.assertEqual(self.fast.stats[('PUT', 'persongroups/{}')],
+                         1)
+        self.assertNotIn(('PUT', 'persongroups/{}'), self.slow.stats)
+
+    def test_failover(self):
+        """Server errors fail over and mark the region down."""
+        self.router.probe()
+        self.fast.error_rate = 1.0
+        for _ in range(2):
+            CF.person_group.lists()
+        self.assertFalse(self.regions[1].healthy)
+        self.assertEqual([r.name for r in self.router.order()],
+                         ['slow', 'fast'])
+        self.assertEqual(
+            self.slow.stats[('GET', 'persongroups')], 2 + 2)
+
+        self.fast.error_rate = 0.0
+        self.router.probe()
+        self.assertTrue(self.regions[1].healthy)
+
+    def test_client_errors(self):
+        """Client errors are raised without failing over."""
+        self.router.probe()
+        with self.assertRaises(CF.CognitiveFaceException) as context:
+            CF.person_group.get('missing')
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertNotIn(('GET', 'persongroups/{}'), self.slow.stats)
+
+    def test_pin(self):
+        """Pinned calls, also the ones made by other threads, go to the
+        pinned region."""
+        for region in self.regions:
+            with CF.region.pin(region):
+                CF.person_group.create('group')
+                person_id = CF.person.create('group', 'Alice')['personId']
+                CF.person.add_face(io.BytesIO(b'alice'), 'group', person_id)
+                CF.person_group.train('group')
+                self.assertEqual(CF.training.wait('group')['status'],
+                                 'succeeded')
+                self.assertEqual(
+                    [p['name'] for p in
+                     CF.person.iter_lists('group', top=1, prefetch=True)],
+                    ['Alice'])
+        for server in (self.slow, self.fast):
+            self.assertEqual(server.stats[('PUT', 'persongroups/{}')],
+                             1)
+
+        face_id = CF.face.detect(io.BytesIO(b'alice'))[0]['faceId']
+        res = CF.face.identify([face_id], 'group')
+        self.assertEqual(len(res[0]['candidates']), 1)
+
+    def test_pin_face_ids(self):
+        """FaceIds detected in a pinned region are identified there, even
+        when the router prefers another region."""
+        for region in self.regions:
+            with CF.region.pin(region):
+                CF.person_group.create('group')
+                person_id = CF.person.create('group', 'Alice')['personId']
+                CF.person.add_face(io.BytesIO(b'alice'), 'group', person_id)
+                CF.person_group.train('group')
+                CF.training.wait('group')
+        self.router.probe()
+        self.assertEqual(self.router.order()[0].name, 'fast')
+
+        with CF.region.pin(self.regions[0]):
+            face_ids = [CF.face.detect(io.BytesIO(b'alice'))[0]['faceId']
+                        for _ in range(12)]
+            res = CF.face.identify_many(face_ids, 'group', workers=2)
+        self.assertEqual([len(r['candidates']) for r in res], [1] * 12)
+        self.assertEqual(self.slow.stats[('POST', 'identify')], 2)
+        self.assertNotIn(('POST', 'detect'), self.fast.stats)
+        self.assertNotIn(('POST', 'identify'), self.fast.stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
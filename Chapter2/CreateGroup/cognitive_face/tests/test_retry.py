@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_retry.py
+Description: Unittests for the retry policy.
+"""
+
+import unittest
+
+import cognitive_face as CF
+
+
+class TestRetry(unittest.TestCase):
+    """Unittests for `retry.RetryPolicy`."""
+
+    def test_idempotency(self):
+        """Only POSTs which cannot create duplicates are idempotent."""
+        policy = CF.retry.RetryPolicy()
+        self.assertTrue(policy.is_idempotent('GET', 'persongroups/g/persons'))
+        self.assertTrue(policy.is_idempotent('POST', 'detect'))
+        self.assertTrue(policy.is_idempotent('POST', 'persongroups/g/train'))
+        self.assertFalse(policy.is_idempotent('POST', 'persongroups/g/persons'))
+        self.assertFalse(policy.is_idempotent(
+            'POST', 'persongroups/g/persons/p/persistedFaces'))
+
+    def test_delay(self):
+        """Server errors are retried for idempotent calls only, throttling is
+        always retried and honours `Retry-After`."""
+        policy = CF.retry.RetryPolicy(backoff=1, max_backoff=4)
+        create = 'persongroups/g/persons'
+        self.assertIsNone(policy.delay('POST', create, 0, 0, 503))
+        self.assertEqual(policy.delay('POST', create, 0, 0, 429, '7'), 7)
+        self.assertIsNone(policy.delay('GET', create, 0, 0, 404))
+        self.assertLessEqual(policy.delay('GET', create, 4, 0, 503), 4)
+        self.assertIsNone(policy.delay('GET', create, 0, 0, 503, '200'))
+        self.assertIsNone(policy.delay('GET', create, 5, 0, 503))
+
+    def test_budget(self):
+        """Retries are capped by the retry budget."""
+        policy = CF.retry.RetryPolicy(budget_ratio=0, budget_floor=2)
+        self.assertIsNotNone(policy.delay('GET', 'persongroups', 0, 0, 500))
+        self.assertIsNotNone(policy.delay('GET', 'persongroups', 0, 0, 500))
+        self.assertIsNone(policy.delay('GET', 'persongroups', 0, 0, 500))
+        self.assertEqual(policy.stats.snapshot()['budget_exhausted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
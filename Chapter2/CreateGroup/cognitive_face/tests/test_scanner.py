@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_scanner.py
+Description: Unittests of the source directory scanner of create_group.py.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import scanner
+
+
+class TestScanner(unittest.TestCase):
+    """Unittests of `scanner.scan`."""
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.state = os.path.join(self.source, '.scan.json')
+
+    def write(self, path, content):
+        path = os.path.join(self.source, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def scan(self):
+        """Scan with the state file, return the index and the hashed
+        paths."""
+        with mock.patch.object(scanner, 'hash_image',
+                               side_effect=scanner.hash_image) as hash_image:
+            index = scanner.scan(self.source, 4, self.state)
+        return index, sorted(call[0][0] for call in hash_image.call_args_list)
+
+    def test_scan(self):
+        """Images are found below each person, once per content."""
+        alice = self.write('Alice/a.jpg', b'alice')
+        nested = self.write('Alice/2017/holiday/b.JPEG', b'alice2')
+        self.write('Alice/b/copy.jpg', b'alice')
+        self.write('Alice/._a.jpg', b'resource fork')
+        self.write('Alice/.hidden/c.jpg', b'hidden')
+        self.write('Alice/notes.txt', b'notes')
+        bob = self.write('Bob/b.png', b'bob')
+        self.write('Bob/a.jpg', b'alice')
+        self.write('Carol/a.jpg', b'alice')
+        self.write('.git/a.jpg', b'git')
+        os.symlink(self.source, os.path.join(self.source, 'Bob', 'loop'))
+
+        index = scanner.scan(self.source)
+        self.assertEqual(list(index), ['Alice', 'Bob'])
+        self.assertEqual([image.path for image in index['Alice']],
+                         sorted([alice, nested]))
+        self.assertEqual([image.path for image in index['Bob']], [bob])
+        image = index['Bob'][0]
+        self.assertEqual(image.size, 3)
+        self.assertEqual(image.mtime, os.stat(bob).st_mtime)
+        self.assertEqual(image.hash, scanner.hash_image(bob))
+
+    def test_state(self):
+        """Only the new and changed images are hashed again."""
+        alice = self.write('Alice/a.jpg', b'alice')
+        bob = self.write('Bob/b.jpg', b'bob')
+        carol = self.write('Carol/c.jpg', b'carol')
+
+        index, hashed = self.scan()
+        self.assertEqual(hashed, sorted([alice, bob, carol]))
+        with open(self.state) as f:
+            state = json.load(f)
+        self.assertEqual(state[bob], [3, os.stat(bob).st_mtime,
+                                      index['Bob'][0].hash])
+
+        self.assertEqual(self.scan(), (index, []))
+
+        self.write('Alice/a.jpg', b'alice retouched')
+        stat = os.stat(bob)
+        os.utime(bob, (stat.st_atime, stat.st_mtime + 10))
+        os.remove(carol)
+        dave = self.write('Dave/d.jpg', b'dave')
+        changed, hashed = self.scan()
+        self.assertEqual(hashed, sorted([alice, bob, dave]))
+        self.assertNotEqual(changed['Alice'][0].hash, index['Alice'][0].hash)
+        self.assertEqual(changed['Bob'][0].hash, index['Bob'][0].hash)
+        self.assertEqual(list(changed), ['Alice', 'Bob', 'Dave'])
+        with open(self.state) as f:
+            self.assertEqual(sorted(json.load(f)), sorted([alice, bob, dave]))
+
+    def test_bad_state(self):
+        """An unreadable state file is ignored and replaced."""
+        alice = self.write('Alice/a.jpg', b'alice')
+        with open(self.state, 'w') as f:
+            f.write('{"truncated')
+        self.assertEqual(self.scan()[1], [alice])
+        self.assertEqual(self.scan()[1], [])
+        self.assertFalse(os.path.exists(self.state + '.tmp'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_single_flight.py
+Description: Offline unittests of the coalescing of identical calls.
+"""
+
+import asyncio
+import io
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import cognitive_face as CF
+from cognitive_face import aio
+
+from .util import MockServerTestCase
+from cognitive_face.single_flight import SingleFlight
+
+
+class TestSingleFlight(MockServerTestCase):
+    """Unittests of `single_flight.SingleFlight` against
+    `mock_server.MockFaceServer`."""
+
+    server_options = {'latency': 0.2}
+
+    def setUp(self):
+        super(TestSingleFlight, self).setUp()
+        CF.Session.configure(pool_maxsize=8)
+        self.flight = SingleFlight(ttl=60)
+        CF.Coalesce.set(self.flight)
+
+    def tearDown(self):
+        CF.Coalesce.set(None)
+        CF.Session.configure(pool_maxsize=10)
+
+    def concurrently(self, func, callers=8):
+        with ThreadPoolExecutor(callers) as executor:
+            futures = [executor.submit(func) for _ in range(callers)]
+        return [future.result() for future in futures]
+
+    def test_get(self):
+        """Concurrent identical GETs share one call, each caller gets its
+        own copy of the response."""
+        CF.person_group.create('group', 'Group')
+        groups = self.concurrently(lambda: CF.person_group.get('group'))
+        self.assertEqual(self.server.stats[('GET', 'persongroups/{}')], 1)
+        self.assertEqual(groups[0]['name'], 'Group')
+        groups[0]['name'] = 'Changed'
+        self.assertEqual(groups[1]['name'], 'Group')
+        self.assertEqual(self.flight.stats['calls'], 1)
+        self.assertEqual(self.flight.stats['shared'] +
+                         self.flight.stats['hits'], 7)
+
+        # Kept, until the person groups are modified.
+        CF.person_group.get('group')
+        self.assertEqual(self.server.stats[('GET', 'persongroups/{}')], 1)
+        CF.person_group.update('group', 'Renamed')
+        self.assertEqual(CF.person_group.get('group')['name'], 'Renamed')
+        self.assertEqual(self.server.stats[('GET', 'persongroups/{}')], 2)
+
+    def test_detect(self):
+        """Uploads of the same content share one detection."""
+        results = self.concurrently(
+            lambda: CF.face.detect(io.BytesIO(b'alice')))
+        self.assertEqual(self.server.stats[('POST', 'detect')], 1)
+        self.assertEqual(len(set(r[0]['faceId'] for r in results)), 1)
+        CF.face.detect(io.BytesIO(b'bob'))
+        self.assertEqual(self.server.stats[('POST', 'detect')], 2)
+
+    def test_errors(self):
+        """Errors are raised by every caller and not kept."""
+        def get():
+            try:
+                CF.person_group.get('missing')
+            except CF.CognitiveFaceException as exc:
+                return exc.status_code
+        self.assertEqual(self.concurrently(get), [404] * 8)
+        self.assertEqual(self.server.stats[('GET', 'persongroups/{}')], 1)
+        self.assertEqual(get(), 404)
+        self.assertEqual(self.server.stats[('GET', 'persongroups/{}')], 2)
+
+    def test_ttl(self):
+        """Without ttl, only the calls in flight are shared."""
+        self.flight = SingleFlight(ttl=0)
+        CF.Coalesce.set(self.flight)
+        CF.person_group.create('group')
+        CF.person_group.train('group')
+        start = time.time()
+        self.concurrently(lambda: CF.person_group.get_status('group'))
+        self.assertLess(time.time() - start, 2 * 0.2 + 0.15)
+        CF.person_group.get_status('group')
+        self.assertEqual(
+            self.server.stats[('GET', 'persongroups/{}/training')], 2)
+
+
+    def test_aio(self):
+        """Concurrent coroutines share one call, with the threads too, and
+        are served the kept responses."""
+        CF.person_group.create('group', 'Group')
+
+        async def gets():
+            try:
+                thread = asyncio.get_event_loop().run_in_executor(
+                    None, CF.person_group.get, 'group')
+                groups = await asyncio.gather(*(
+                    [aio.person_group.get('group') for _ in range(8)] +
+                    [thread]))
+                groups.append(await aio.person_group.get('group'))
+                return groups
+            finally:
+                await aio.Session.close()
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        groups = loop.run_until_complete(gets())
+        self.assertEqual([group['name'] for group in groups], ['Group'] * 10)
+        self.assertEqual(self.server.stats[('GET', 'persongroups/{}')], 1)
+        self.assertEqual(self.flight.stats['calls'], 1)
+        self.assertEqual(self.flight.stats['shared'] +
+                         self.flight.stats['hits'], 9)
+
+        async def detect():
+            try:
+                return await asyncio.gather(*(
+                    aio.face.detect(io.BytesIO(b'alice')) for _ in range(4)))
+            finally:
+                await aio.Session.close()
+        results = loop.run_until_complete(detect())
+        self.assertEqual(self.server.stats[('POST', 'detect')], 1)
+        self.assertEqual(len(set(r[0]['faceId'] for r in results)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
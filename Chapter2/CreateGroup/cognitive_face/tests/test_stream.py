@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_stream.py
+Description: Offline unittests of the detection over streams of frames.
+"""
+
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+from PIL import Image
+
+import cognitive_face as CF
+from cognitive_face import stream
+
+from .util import MockServerTestCase
+
+
+def scene(seed, noise=0.0):
+    """A distinct 320x240 frame per seed, with optional sensor noise."""
+    rng = random.Random(seed)
+    image = Image.frombytes('RGB', (16, 12), bytes(
+        rng.randrange(256) for _ in range(16 * 12 * 3))).resize(
+            (320, 240), Image.BILINEAR)
+    if noise:
+        image = Image.blend(image, Image.effect_noise(
+            (320, 240), 64).convert('RGB'), noise)
+    return image
+
+
+def jpeg(image):
+    data = io.BytesIO()
+    image.save(data, 'JPEG', quality=90)
+    return data.getvalue()
+
+
+class TestStream(MockServerTestCase):
+    """Unittests of `stream.FramePipeline` against
+    `mock_server.MockFaceServer`."""
+
+    def test_dhash(self):
+        """Noise barely changes the hash, another scene does."""
+        self.assertLessEqual(stream.distance(stream.dhash(scene(1)),
+                                             stream.dhash(scene(1, 0.05))), 4)
+        self.assertGreater(stream.distance(stream.dhash(scene(1)),
+                                           stream.dhash(scene(2))), 8)
+        self.assertEqual(stream.dhash(jpeg(scene(1))),
+                         stream.dhash(Image.open(io.BytesIO(jpeg(scene(1))))))
+
+    def test_skipping(self):
+        """Only the frames where the scene changed are sent."""
+        frames = [scene(1), scene(1), scene(1, 0.05), scene(2), scene(2),
+                  scene(3)]
+        pipeline = stream.FramePipeline()
+        results = sorted(pipeline.run(frames))
+        self.assertEqual([result.index for result in results], [0, 3, 5])
+        self.assertEqual(self.server.stats[('POST', 'detect')], 3)
+        self.assertEqual(pipeline.stats,
+                         {'frames': 6, 'skipped': 3, 'sent': 3, 'faces': 3})
+
+        pipeline = stream.FramePipeline(max_skipped=1)
+        self.assertEqual([r.index for r in sorted(pipeline.run(frames))],
+                         [0, 2, 3, 5])
+        pipeline = stream.FramePipeline(max_distance=-1)
+        self.assertEqual(len(list(pipeline.run(frames))), 6)
+
+    def test_identify(self):
+        """The detected faces are identified in the person group."""
+        known = jpeg(scene(1))
+        CF.person_group.create('group')
+        person_id = CF.person.create('group', 'Alice')['personId']
+        CF.person.add_face(io.BytesIO(known), 'group', person_id)
+        CF.person_group.train('group')
+
+        results = sorted(stream.detect([known, jpeg(scene(2))], 'group'))
+        self.assertEqual(results[0].candidates[0][0]['personId'], person_id)
+        self.assertEqual(results[1].candidates, [[]])
+        self.assertIsNone(results[0].error)
+
+        results = list(stream.detect([known], 'missing'))
+        self.assertEqual(results[0].error.status_code, 404)
+
+    def test_connection_errors(self):
+        """A frame which cannot be sent gets the error, the others are
+        still detected."""
+        detect = CF.face.detect
+
+        def failing(image, *args, **kwargs):
+            if image.getvalue() == frames[1]:
+                raise requests.ConnectionError('Connection refused')
+            return detect(image, *args, **kwargs)
+
+        frames = [jpeg(scene(seed)) for seed in range(3)]
+        with mock.patch.object(stream.face, 'detect', side_effect=failing):
+            results = sorted(stream.detect(frames))
+        self.assertEqual([len(result.faces or ()) for result in results],
+                         [1, 0, 1])
+        self.assertIsInstance(results[1].error, requests.ConnectionError)
+        self.assertIsNone(results[1].faces)
+        self.assertIsNone(results[2].error)
+
+    def test_bounded(self):
+        """Frames are only read when there is room for them."""
+        self.server.latency = 0.1
+        read = []
+
+        def frames():
+            for seed in range(8):
+                read.append(seed)
+                yield scene(seed)
+        results = stream.detect(frames(), max_in_flight=2)
+        next(results)
+        self.assertLessEqual(len(read), 3)
+        self.assertEqual(len(list(results)), 7)
+
+    def test_sources(self):
+        """Frames are read from directories and videos."""
+        directory = tempfile.mkdtemp()
+        try:
+            for seed in (2, 1):
+                scene(seed).save(os.path.join(directory, '{}.jpg'.format(
+                    seed)))
+            open(os.path.join(directory, 'notes.txt'), 'w').close()
+            self.assertEqual(
+                [os.path.basename(path)
+                 for path in stream.directory_frames(directory)],
+                ['1.jpg', '2.jpg'])
+
+            video = os.path.join(directory, 'video.gif')
+            scene(1).save(video, save_all=True, append_images=[
+                scene(1, 0.05), scene(2), scene(3)], duration=40)
+            self.assertEqual(len(list(stream.video_frames(video))), 4)
+            self.assertEqual(len(list(stream.video_frames(video, 2))), 2)
+            self.assertEqual(
+                len(list(stream.detect(stream.video_frames(video)))), 3)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
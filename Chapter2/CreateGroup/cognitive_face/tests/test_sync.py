@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_sync.py
+Description: Offline unittests of the incremental sync of create_group.py.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import cognitive_face as CF
+import create_group
+
+from .util import MockServerTestCase
+
+ADD_FACE = ('POST', 'persongroups/{}/persons/{}/persistedFaces')
+DELETE_FACE = ('DELETE', 'persongroups/{}/persons/{}/persistedFaces/{}')
+
+
+class TestSync(MockServerTestCase):
+    """Unittests of `create_group.sync_persons` against
+    `mock_server.MockFaceServer`."""
+
+    def setUp(self):
+        super(TestSync, self).setUp()
+        self.source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.write('Alice', 'a0.jpg', b'alice0')
+        self.write('Alice', 'a1.jpg', b'alice1')
+        self.write('Bob', 'b0.jpg', b'bob0')
+        CF.person_group.create('group')
+
+    def write(self, name, image, content):
+        directory = os.path.join(self.source, name)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(os.path.join(directory, image), 'wb') as f:
+            f.write(content)
+
+    def sync(self):
+        """Sync the group and check the returned persons are the group."""
+        persons, changed = create_group.sync_persons('group', self.source)
+        server = CF.person.lists('group')
+        self.assertEqual(
+            sorted((person['name'], sorted(person['face_ids']))
+                   for person in persons),
+            sorted((person['name'], sorted(person['persistedFaceIds']))
+                   for person in server))
+        return persons, changed
+
+    def test_sync(self):
+        """Only the added, removed and changed images are sent."""
+        persons, changed = self.sync()
+        self.assertTrue(changed)
+        self.assertEqual([len(person['face_ids']) for person in persons],
+                         [2, 1])
+        self.assertEqual(self.calls(*ADD_FACE), 3)
+
+        _, changed = self.sync()
+        self.assertFalse(changed)
+        self.assertEqual(self.calls(*ADD_FACE), 3)
+        self.assertEqual(self.calls(*DELETE_FACE), 0)
+
+        alice = [person for person in CF.person.lists('group')
+                 if person['name'] == 'Alice'][0]
+        os.remove(os.path.join(self.source, 'Alice', 'a0.jpg'))
+        self.write('Alice', 'a1.jpg', b'alice1 retouched')
+        self.write('Alice', 'a2.jpg', b'alice2')
+        shutil.rmtree(os.path.join(self.source, 'Bob'))
+        self.write('Carol', 'c0.jpg', b'carol0')
+        persons, changed = self.sync()
+        self.assertTrue(changed)
+        self.assertEqual([person['name'] for person in persons],
+                         ['Alice', 'Carol'])
+        self.assertEqual(persons[0]['person_id'], alice['personId'])
+        # a1 and a2 for Alice, c0 for Carol.
+        self.assertEqual(self.calls(*ADD_FACE), 6)
+        # a0 and the former a1.
+        self.assertEqual(self.calls(*DELETE_FACE), 2)
+        self.assertEqual(
+            self.calls('DELETE', 'persongroups/{}/persons/{}'), 1)
+        self.assertEqual(
+            len(set(persons[0]['face_ids']) &
+                set(alice['persistedFaceIds'])), 0)
+
+        _, changed = self.sync()
+        self.assertFalse(changed)
+
+    def test_enrolled(self):
+        """Faces enrolled without sync, concurrently or not, are matched by
+        their hash."""
+        for workers in (1, 2):
+            CF.person_group.delete('group')
+            CF.person_group.create('group')
+            create_group.create_persons('group', self.source, workers)
+            added = self.calls(*ADD_FACE)
+
+            _, changed = self.sync()
+            self.assertFalse(changed)
+            self.assertEqual(self.calls(*ADD_FACE), added)
+            self.assertEqual(self.calls(*DELETE_FACE), 0)
+
+    def test_unhashed(self):
+        """Faces added without their hash are replaced once."""
+        for name in ('Alice', 'Bob'):
+            person_id = CF.person.create('group', name)['personId']
+            for image in sorted(os.listdir(os.path.join(self.source, name))):
+                CF.person.add_face(os.path.join(self.source, name, image),
+                                   'group', person_id)
+        self.assertEqual(self.calls(*ADD_FACE), 3)
+
+        _, changed = self.sync()
+        self.assertTrue(changed)
+        self.assertEqual(self.calls(*ADD_FACE), 6)
+        self.assertEqual(self.calls(*DELETE_FACE), 3)
+
+        _, changed = self.sync()
+        self.assertFalse(changed)
+        self.assertEqual(self.calls(*ADD_FACE), 6)
+
+    def test_duplicate_names(self):
+        """Persons sharing a name are reported, one of them is synced and
+        the others are left alone."""
+        first = CF.person.create('group', 'Alice')['personId']
+        second = CF.person.create('group', 'Alice')['personId']
+        with mock.patch('builtins.print') as printed:
+            persons, _ = create_group.sync_persons('group', self.source)
+        warnings = [call[0][0] for call in printed.call_args_list
+                    if call[0][0].startswith('WARNING')]
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('2 persons named Alice', warnings[0])
+        alice = [person for person in persons if person['name'] == 'Alice']
+        self.assertEqual(len(alice), 1)
+        self.assertIn(alice[0]['person_id'], (first, second))
+        self.assertEqual(len(CF.person.lists('group')), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_training.py
+Description: Offline unittests of the watching of trainings.
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError
+from concurrent.futures import TimeoutError  # pylint: disable=redefined-builtin
+
+import cognitive_face as CF
+from cognitive_face.training import TrainingWatcher
+
+from .util import MockServerTestCase
+
+GET_STATUS = ('GET', 'persongroups/{}/training')
+
+
+class TestTraining(MockServerTestCase):
+    """Unittests of `training.TrainingWatcher` against
+    `mock_server.MockFaceServer`."""
+
+    server_options = {'train_duration': 0.3}
+
+    def setUp(self):
+        super(TestTraining, self).setUp()
+        self.watcher = TrainingWatcher(initial_delay=0.01, max_delay=0.04,
+                                       jitter=0)
+        self.addCleanup(self.watcher.close)
+
+    def train(self, person_group_id):
+        CF.person_group.create(person_group_id)
+        CF.person_group.train(person_group_id)
+
+    def test_backoff(self):
+        """Delays double up to `max_delay`, jittered around it."""
+        watcher = TrainingWatcher(initial_delay=1, max_delay=15, jitter=0)
+        self.assertEqual([watcher._next_delay(polls) for polls in range(1, 7)],
+                         [1, 2, 4, 8, 15, 15])
+        watcher.jitter = 0.2
+        delays = [watcher._next_delay(10) for _ in range(100)]
+        self.assertGreaterEqual(min(delays), 12)
+        self.assertLessEqual(max(delays), 18)
+
+        self.train('group')
+        self.assertEqual(self.watcher.wait('group')['status'], 'succeeded')
+        # 0.3 seconds of polls at most 0.04 seconds apart.
+        self.assertGreaterEqual(self.calls(*GET_STATUS), 7)
+        self.assertLessEqual(self.calls(*GET_STATUS), 15)
+
+    def test_timeout(self):
+        """Watching gives up after its timeout, only when one is given."""
+        self.server.train_duration = 60
+        self.train('group')
+        with self.assertRaises(TimeoutError):
+            self.watcher.wait('group', timeout=0.1)
+
+        watcher = TrainingWatcher(initial_delay=0.01, max_delay=0.04,
+                                  timeout=0.05)
+        self.addCleanup(watcher.close)
+        with self.assertRaises(TimeoutError):
+            watcher.wait('group')
+
+        self.assertIsNone(CF.training.default().timeout)
+        self.server.train_duration = 0.5
+        self.train('group2')
+        self.assertEqual(watcher.wait('group2', timeout=1)['status'],
+                         'succeeded')
+        self.train('group3')
+        self.assertEqual(CF.util.wait_for_training('group3')['status'],
+                         'succeeded')
+
+    def test_groups(self):
+        """Many groups are watched at once by a single thread."""
+        names = ['group{}'.format(idx) for idx in range(10)]
+        for name in names:
+            self.train(name)
+        threads = threading.active_count()
+        futures = [self.watcher.watch(name) for name in names]
+        self.assertLessEqual(threading.active_count(), threads + 1)
+        self.assertEqual([future.result(5)['status'] for future in futures],
+                         ['succeeded'] * 10)
+
+        with self.assertRaises(CF.CognitiveFaceException):
+            self.watcher.wait('missing')
+
+    def test_callback(self):
+        """The callback is given the future once it is done."""
+        self.train('group')
+        done = []
+        future = self.watcher.watch('group', callback=done.append)
+        self.assertEqual(future.result(5)['status'], 'succeeded')
+        self.assertEqual(done, [future])
+
+        self.watcher.close()
+        with self.assertRaises(RuntimeError):
+            self.watcher.watch('group')
+
+
+    def test_cancel_during_poll(self):
+        """A watch cancelled, or a watcher closed, while its group is polled
+        does not stop the other watches."""
+        self.train('group')
+        self.train('group2')
+        time.sleep(0.4)
+        self.server.latency = 0.2
+        future = self.watcher.watch('group')
+        time.sleep(0.1)
+        self.assertTrue(future.cancel())
+        self.assertEqual(self.watcher.watch('group2').result(5)['status'],
+                         'succeeded')
+
+        self.server.train_duration = 60
+        self.train('group3')
+        future = self.watcher.watch('group3')
+        time.sleep(0.1)
+        self.watcher.close()
+        with self.assertRaises(CancelledError):
+            future.result(5)
+
+if __name__ == '__main__':
+    unittest.main()
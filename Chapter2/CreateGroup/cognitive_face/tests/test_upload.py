@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_upload.py
+Description: Offline unittests of the streamed image uploads.
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import cognitive_face as CF
+
+from .util import MockServerTestCase
+
+# Larger than the chunks read from a stream, so it is sent in several.
+CONTENT = os.urandom(1 << 20)
+
+
+class Stream(io.BytesIO):
+    """In-memory file which records the size of its reads."""
+
+    def __init__(self, content):
+        super(Stream, self).__init__(content)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super(Stream, self).read(size)
+
+
+class TestUpload(MockServerTestCase):
+    """Unittests of `util.open_image` and of the uploads of `util.request`
+    against `mock_server.MockFaceServer`."""
+
+    def setUp(self):
+        super(TestUpload, self).setUp()
+        self.bodies = []
+        self.failures = 0
+        handle = self.server.handle
+
+        def recording(method, path, query, headers, body):
+            # pylint: disable=too-many-arguments
+            self.bodies.append((headers.get('Content-Type'), body))
+            if self.failures:
+                self.failures -= 1
+                return 500, {}, {'error': {'code': 'InternalServerError',
+                                           'message': 'Injected failure.'}}
+            return handle(method, path, query, headers, body)
+        self.server.handle = recording
+
+    def tearDown(self):
+        CF.Retry.set(None)
+
+    def test_path(self):
+        """Files are streamed in chunks and closed."""
+        handle, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(CONTENT)
+        self.addCleanup(os.remove, path)
+
+        with CF.util.open_image(path) as (headers, data, body):
+            self.assertEqual(headers['Content-Type'],
+                             'application/octet-stream')
+            self.assertIsNone(body)
+            self.assertEqual(data.name, path)
+        self.assertTrue(data.closed)
+
+        CF.face.detect(path)
+        self.assertEqual(self.bodies,
+                         [('application/octet-stream', CONTENT)])
+
+    def test_file(self):
+        """File-like objects are streamed from their position, in chunks,
+        and left open."""
+        stream = Stream(b'header' + CONTENT)
+        stream.seek(6)
+        CF.face.detect(stream)
+        self.assertEqual(self.bodies,
+                         [('application/octet-stream', CONTENT)])
+        self.assertFalse(stream.closed)
+        self.assertLess(max(stream.reads), len(CONTENT))
+
+    def test_url(self):
+        """URLs are sent as JSON."""
+        CF.face.detect('https://example.com/face.jpg')
+        self.assertEqual(self.bodies[0][0], 'application/json')
+        self.assertEqual(json.loads(self.bodies[0][1].decode('utf-8')),
+                         {'url': 'https://example.com/face.jpg'})
+
+    def test_retry(self):
+        """A retried upload sends the whole body again."""
+        CF.Retry.set(CF.retry.RetryPolicy(backoff=0.01))
+        self.failures = 2
+        stream = Stream(b'header' + CONTENT)
+        stream.seek(6)
+        res = CF.face.detect(stream)
+        self.assertEqual(len(res), 1)
+        self.assertEqual([body for _, body in self.bodies], [CONTENT] * 3)
+
+        handle, path = tempfile.mkstemp(suffix='.jpg')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(CONTENT)
+        self.addCleanup(os.remove, path)
+        self.failures = 1
+        face_id = CF.face.detect(path)[0]['faceId']
+        self.assertEqual([body for _, body in self.bodies[3:]], [CONTENT] * 2)
+        self.assertEqual(self.server.faces[face_id],
+                         self.server.faces[res[0]['faceId']])
+
+
+    def test_pipe(self):
+        """Streams which cannot seek are read in memory, so they can be sent
+        again."""
+        CF.Retry.set(CF.retry.RetryPolicy(backoff=0.01))
+        self.failures = 1
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(CONTENT[:1 << 15])
+        with os.fdopen(read_fd, 'rb') as pipe:
+            self.assertFalse(pipe.seekable())
+            res = CF.face.detect(pipe)
+        self.assertEqual(len(res), 1)
+        self.assertEqual([body for _, body in self.bodies],
+                         [CONTENT[:1 << 15]] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
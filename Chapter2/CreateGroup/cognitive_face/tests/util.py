@@ -7,11 +7,16 @@ Description: Unittest shared utilities for Python SDK of the Cognitive Face
 """
 
 import time
+import unittest
 import uuid
 
 import cognitive_face as CF
+from cognitive_face.mock_server import MockFaceServer
 
-from . import config
+try:
+    from . import config
+except ImportError:
+    config = None
 
 # Base URL of online images.
 BASE_URL_IMAGE = (
@@ -22,6 +27,13 @@ BASE_URL_IMAGE = (
 MSG_WAIT = 'Wait for {} seconds so as to avoid exceeding free quote.'
 
 
+# Skip the unittests calling the online API without configuration.
+requires_config = unittest.skipIf(
+    config is None,
+    'Please setup unittest configuration `config.py` properly by referring '
+    'to `config.sample.py` so as to perform the online unittests.')
+
+
 def wait():
     """Wait for some interval to avoid exceeding quote."""
     print(MSG_WAIT.format(config.TIME_SLEEP))
@@ -121,3 +133,25 @@ class DataStore(object):
         res = CF.person_group.train(cls.person_group_id)
         print('[person_group.train]res: {}', res)
         wait()
+
+
+class MockServerTestCase(unittest.TestCase):
+    """Base of the offline unittests, which call a `mock_server.MockFaceServer`
+    started for each test instead of the online API.
+
+    Attributes:
+        server_options: Keyword arguments of the mock server.
+        server: The mock server of the running test.
+    """
+    server_options = {}
+
+    def setUp(self):
+        self.server = MockFaceServer(**self.server_options).start()
+        self.addCleanup(setattr, CF.util, '_BASE_URL', CF.util._BASE_URL)
+        self.addCleanup(self.server.stop)
+        self.addCleanup(CF.Session.close)
+        CF.util._BASE_URL = self.server.base_url
+
+    def calls(self, method, endpoint):
+        """Return the number of calls made to an endpoint template."""
+        return self.server.stats.get((method, endpoint), 0)
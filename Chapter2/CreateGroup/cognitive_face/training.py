@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: training.py
+Description: Watch the training of person groups for the Python SDK of the
+    Cognitive Face API.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError  # pylint: disable=redefined-builtin
+
+from . import person_group
+from . import util
+
+try:
+    from concurrent.futures import InvalidStateError as _InvalidStateError
+except ImportError:  # Python < 3.8, where the result is set all the same.
+    _InvalidStateError = ()
+
+_DEFAULT_LOCK = threading.Lock()
+_DEFAULT = None
+
+
+class TrainingWatcher(object):
+    """Poll the training status of any number of person groups from a single
+    scheduler thread.
+
+    Each group is polled right away, then with an exponential backoff capped
+    at `max_delay` and jittered so that many groups do not poll in lockstep.
+
+    Attributes:
+        initial_delay: Seconds before the second poll.
+        max_delay: Maximum seconds between two polls of a group.
+        jitter: Fraction by which each delay is randomly shortened or
+            lengthened.
+        timeout: Optional default seconds after which watching a group gives
+            up with `concurrent.futures.TimeoutError`. None, the default,
+            waits as long as the training runs.
+    """
+
+    def __init__(self, initial_delay=1.0, max_delay=15.0, jitter=0.2,
+                 timeout=None):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._thread = None
+        self._closed = False
+
+    def watch(self, person_group_id, timeout=None, callback=None):
+        """Start watching the training of a person group.
+
+        Args:
+            person_group_id: Target person group, whose training was queued by
+                `person_group.train`.
+            timeout: Optional seconds overriding the default `timeout`.
+            callback: Optional callable given the future once it is done.
+
+        Returns:
+            A `concurrent.futures.Future` resolved with the final training
+            status (`succeeded` or `failed`) as returned by
+            `person_group.get_status`.
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.time() + timeout
+        # Polled from the scheduler thread, with the client and region here.
+        get_status = util.propagate(person_group.get_status)
+        entry = [person_group_id, future, deadline, 0, get_status]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('TrainingWatcher is closed')
+            self._schedule(entry, time.time())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='TrainingWatcher')
+                self._thread.daemon = True
+                self._thread.start()
+        return future
+
+    def wait(self, person_group_id, timeout=None):
+        """Block until the training of a person group is finished.
+
+        Returns:
+            The final training status.
+        """
+        return self.watch(person_group_id, timeout).result()
+
+    def wait_async(self, person_group_id, timeout=None):
+        """Awaitable version of `wait`, to be awaited in the running loop."""
+        return asyncio.wrap_future(self.watch(person_group_id, timeout))
+
+    def close(self):
+        """Stop the scheduler, pending watches are cancelled."""
+        with self._cond:
+            self._closed = True
+            for _, _, entry in self._queue:
+                entry[1].cancel()
+            self._queue = []
+            self._cond.notify()
+
+    def _schedule(self, entry, due):
+        heapq.heappush(self._queue, (due, next(self._seq), entry))
+        self._cond.notify()
+
+    def _next_delay(self, polls):
+        delay = min(self.max_delay, self.initial_delay * 2**(polls - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (
+                        not self._queue or self._queue[0][0] > time.time()):
+                    if self._queue:
+                        self._cond.wait(self._queue[0][0] - time.time())
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                _, _, entry = heapq.heappop(self._queue)
+            self._poll(entry)
+
+    def _poll(self, entry):
+        person_group_id, future, deadline, polls, get_status = entry
+        if future.cancelled():
+            return
+        try:
+            res = get_status(person_group_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            _settle(future, error=exc)
+            return
+        if res.get('status') in ('succeeded', 'failed'):
+            _settle(future, res)
+            return
+
+        now = time.time()
+        entry[3] = polls + 1
+        due = now + self._next_delay(entry[3])
+        if deadline is not None and due > deadline:
+            if now >= deadline:
+                _settle(future, error=TimeoutError(
+                    'Training of Person Group {} still {} after timeout'.format(
+                        person_group_id, res.get('status'))))
+                return
+            due = deadline
+        with self._cond:
+            if self._closed:
+                # Closed while polling, cancelled like the queued watches.
+                future.cancel()
+            elif not future.cancelled():
+                self._schedule(entry, due)
+
+
+def _settle(future, result=None, error=None):
+    """Resolve a future, unless it was cancelled while its group was polled.
+    """
+    try:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except _InvalidStateError:
+        # Cancelled right after the check.
+        pass
+
+
+def default():
+    """Return the watcher shared by `watch` and `wait`."""
+    global _DEFAULT  # pylint: disable=global-statement
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = TrainingWatcher()
+        return _DEFAULT
+
+
+def watch(person_group_id, timeout=None, callback=None):
+    """Watch the training of a person group, see `TrainingWatcher.watch`."""
+    return default().watch(person_group_id, timeout, callback)
+
+
+def wait(person_group_id, timeout=None):
+    """Block until the training of a person group is finished, see
+    `TrainingWatcher.wait`."""
+    return default().wait(person_group_id, timeout)
@@ -4,17 +4,34 @@
 File: util.py
 Description: Shared utilities for the Python SDK of the Cognitive Face API.
 """
+import collections
+import contextlib
+import io
+import json as _json
 import os.path
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+try:
+    import contextvars
+except ImportError:  # Python < 3.7, the context is per thread.
+    contextvars = None
+
 import cognitive_face as CF
 
 #_BASE_URL = 'https://westus.api.cognitive.microsoft.com/face/v1.0/'
 _BASE_URL = 'https://westeurope.api.cognitive.microsoft.com/face/v1.0/'
+# Deprecated: the deletions of `clear_face_lists` and `clear_person_groups` no
+# longer sleep between calls but are paced by `RateLimit`. Kept for the code
+# which imports it.
 TIME_SLEEP = 1
 
+# Path segments which are followed by an identifier.
+_COLLECTIONS = ('persongroups', 'persons', 'persistedFaces', 'facelists')
+
 
 class CognitiveFaceException(Exception):
     """Custom Exception for the python SDK of the Cognitive Face API.
@@ -49,59 +66,483 @@ class Key(object):
 
     @classmethod
     def get(cls):
-        """Get the Subscription Key."""
+        """Get the Subscription Key of the current client, else the one set
+        here."""
+        key = CF.client.current().key
+        if key is not None:
+            return key
         if not hasattr(cls, 'key'):
             cls.key = None
         return cls.key
 
 
+class ConnectionPool(object):
+    """Pool of the connections to the API.
+
+    A single `requests.Session` is lazily created and reused by all threads so
+    that TCP and TLS connections are kept alive and pooled between calls
+    instead of being renegotiated for every request.
+
+    Attributes:
+        pool_connections: Number of per-host connection pools to cache.
+        pool_maxsize: Maximum number of connections kept alive per host.
+            Size it to the number of threads issuing requests.
+        pool_block: Block when no free connection is available instead of
+            opening a throw-away one.
+        keep_alive: Reuse connections between requests. When false every
+            request is sent with `Connection: close`.
+        max_idle: Seconds a pooled connection may stay idle before the pool
+            is recycled. The service closes idle connections after a few
+            minutes, reusing them afterwards fails with a reset.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 keep_alive=True, max_idle=240):
+        # pylint: disable=too-many-arguments
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_used = None
+
+    def configure(self, pool_connections=None, pool_maxsize=None,
+                  pool_block=None, keep_alive=None, max_idle=None):
+        # pylint: disable=too-many-arguments
+        """Change the settings given (see the attributes) and close the
+        current session so the new settings apply to the next request."""
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if pool_block is not None:
+                self.pool_block = pool_block
+            if keep_alive is not None:
+                self.keep_alive = keep_alive
+            if max_idle is not None:
+                self.max_idle = max_idle
+            self._close()
+
+    def get(self):
+        """Get the session, creating or recycling it when needed."""
+        with self._lock:
+            now = time.time()
+            if (self._session is not None and self.max_idle and
+                    now - self._last_used > self.max_idle):
+                self._close()
+            if self._session is None:
+                self._session = self._create()
+            self._last_used = now
+            return self._session
+
+    def close(self):
+        """Close the session and all of its pooled connections."""
+        with self._lock:
+            self._close()
+
+    def _create(self):
+        session = requests.Session()
+        adapter = CF.instrument.TimedHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def _close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class Session(object):
+    """Manage the connection pool shared by every call to `request`."""
+    pool = ConnectionPool()
+
+    @classmethod
+    def configure(cls, pool_connections=None, pool_maxsize=None,
+                  pool_block=None, keep_alive=None, max_idle=None):
+        # pylint: disable=too-many-arguments
+        """Configure the shared pool, see `ConnectionPool.configure`."""
+        cls.pool.configure(pool_connections, pool_maxsize, pool_block,
+                           keep_alive, max_idle)
+
+    @classmethod
+    def get(cls):
+        """Get the session of the pool of the current client, else of the
+        shared pool."""
+        pool = CF.client.current().pool
+        return (cls.pool if pool is None else pool).get()
+
+    @classmethod
+    def close(cls):
+        """Close the shared pool and all of its pooled connections."""
+        cls.pool.close()
+
+
+class RateLimit(object):
+    """Manage the rate limiter shared by every call to `request`."""
+    limiter = None
+
+    @classmethod
+    def set(cls, limiter):
+        """Set the limiter, e.g. a `rate_limit.RateLimiter`, or None."""
+        cls.limiter = limiter
+
+    @classmethod
+    def get(cls):
+        """Get the limiter of the current client, else the one set here, None
+        when calls are not throttled."""
+        limiter = CF.client.current().limiter
+        return cls.limiter if limiter is None else limiter
+
+
+class Retry(object):
+    """Manage the retry policy shared by every call to `request`."""
+    policy = None
+
+    @classmethod
+    def set(cls, policy):
+        """Set the policy, e.g. a `retry.RetryPolicy`, or None."""
+        cls.policy = policy
+
+    @classmethod
+    def get(cls):
+        """Get the policy of the current client, else the one set here, None
+        when failed calls are not retried."""
+        policy = CF.client.current().retry
+        return cls.policy if policy is None else policy
+
+
+class Instrument(object):
+    """Manage the hooks called around every call to `request`."""
+    hooks = ()
+
+    @classmethod
+    def add(cls, hook):
+        """Add a hook, e.g. an `instrument.Metrics` or `instrument.LogHook`."""
+        cls.hooks = cls.hooks + (hook,)
+
+    @classmethod
+    def remove(cls, hook):
+        """Remove a hook."""
+        cls.hooks = tuple(h for h in cls.hooks if h is not hook)
+
+    @classmethod
+    def get(cls):
+        """Get the hooks, an empty tuple when calls are not instrumented."""
+        return cls.hooks
+
+
+class Route(object):
+    """Manage the router spreading the calls to `request` over regions."""
+    router = None
+
+    @classmethod
+    def set(cls, router):
+        """Set the router, e.g. a `region.Router`, or None."""
+        cls.router = router
+
+    @classmethod
+    def get(cls):
+        """Get the router, None when calls are sent to `_BASE_URL`."""
+        return cls.router
+
+
+class Coalesce(object):
+    """Manage the opt-in coalescing of identical calls to `request`."""
+    flight = None
+
+    @classmethod
+    def set(cls, flight):
+        """Set the coalescer, e.g. a `single_flight.SingleFlight`, or None."""
+        cls.flight = flight
+
+    @classmethod
+    def get(cls):
+        """Get the coalescer, None when every call is sent."""
+        return cls.flight
+
+
+class Metadata(object):
+    """Manage the opt-in cache of person, person group and face list
+    metadata."""
+    cache = None
+
+    @classmethod
+    def set(cls, cache):
+        """Set the cache, e.g. a `metadata_cache.MetadataCache`, or None."""
+        cls.cache = cache
+
+    @classmethod
+    def get(cls):
+        """Get the cache of the current client, else the one set here, None
+        when metadata is not cached."""
+        cache = CF.client.current().metadata
+        return cls.cache if cache is None else cache
+
+
+class Cache(object):
+    """Manage the opt-in cache of `face.detect` results."""
+    cache = None
+
+    @classmethod
+    def set(cls, cache):
+        """Set the cache, e.g. a `detect_cache.DetectCache`, or None."""
+        cls.cache = cache
+
+    @classmethod
+    def get(cls):
+        """Get the cache of the current client, else the one set here, None
+        when results are not cached."""
+        cache = CF.client.current().cache
+        return cls.cache if cache is None else cache
+
+
+class Preprocess(object):
+    """Manage the opt-in pre-processing of uploaded images."""
+    preprocessor = None
+
+    @classmethod
+    def set(cls, preprocessor):
+        """Set the preprocessor, e.g. a `preprocess.Preprocessor`, or None."""
+        cls.preprocessor = preprocessor
+
+    @classmethod
+    def get(cls):
+        """Get the preprocessor, None when images are uploaded as they are."""
+        return cls.preprocessor
+
+
 def request(method, url, data=None, json=None, headers=None, params=None):
     # pylint: disable=too-many-arguments
-    """Universal interface for request."""
+    """Universal interface for request, sent to its region, see
+    `destination`."""
+    target = destination(url)
+    if target is None:
+        return Route.get().request(method, url, data, json, headers, params)
+    url, headers = prepare_request(target[0], headers, target[1])
+    return send(method, url, data, json, headers, params)
+
+
+def destination(url):
+    """Return where a call to `url` is sent.
+
+    Short names are sent to the region pinned with `region.pin`, else to the
+    base URL of the current client, else through the router installed with
+    `Route.set`, else to `_BASE_URL`.
+
+    Returns:
+        a two-item tuple consist of the full URL and the Subscription Key, or
+        None when the router picks the region once the call is sent.
+    """
+    if not url.startswith(('https://', 'http://')):
+        region = CF.region.pinned()
+        if region is not None:
+            return region.base_url + url, region.key or Key.get()
+        if (Route.get() is not None and
+                CF.client.current().base_url is None):
+            return None
+    url, headers = prepare_request(url)
+    return url, headers['Ocp-Apim-Subscription-Key']
+
+
+def send(method, url, data=None, json=None, headers=None, params=None):
+    # pylint: disable=too-many-arguments
+    """Send a request prepared with `prepare_request`, paced by the limiter,
+    retried by the policy and observed by the hooks.
+
+    GETs of metadata are served by the cache installed with `Metadata.set`,
+    which the other calls invalidate. Identical concurrent calls are
+    coalesced when a `single_flight.SingleFlight` is installed with
+    `Coalesce.set`.
+    """
+    data = rewindable(data)
+    cache = Metadata.get()
+    if cache is None:
+        return _coalesce(method, url, data, json, headers, params)
+    if method == 'GET':
+        return cache.read(url, params, headers, lambda: _coalesce(
+            method, url, data, json, headers, params))
+    try:
+        return _coalesce(method, url, data, json, headers, params)
+    finally:
+        cache.invalidate(method, url, headers)
+
+
+def _coalesce(method, url, data, json, headers, params):
+    # pylint: disable=too-many-arguments
+    """Send a request, shared with the identical concurrent calls, see
+    `Coalesce`."""
+    flight = Coalesce.get()
+    if flight is None:
+        return parse_response(*_exchange(method, url, data, json, headers,
+                                         params))
+    key = flight.key(method, url, data, json, headers, params)
+    if key is None:
+        try:
+            return parse_response(*_exchange(method, url, data, json,
+                                             headers, params))
+        finally:
+            flight.invalidate(method, url)
+    return parse_response(*flight.do(key, lambda: _exchange(
+        method, url, data, json, headers, params)))
+
+
+def _exchange(method, url, data, json, headers, params):
+    # pylint: disable=too-many-arguments
+    """Send a request, returns the status code and the body of the response."""
+    limiter = RateLimit.get()
+    policy = Retry.get()
+    hooks = Instrument.get()
+    info = hooks and _before(hooks, method, url)
+    start = time.time()
+    attempt = 0
+    # Streamed bodies are rewound before being sent again.
+    position = data.tell() if hasattr(data, 'seek') else None
+
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = Session.get().request(method, url, params=params,
+                                             data=data, json=json,
+                                             headers=headers)
+        except requests.ConnectionError as exc:
+            delay = policy and policy.delay(method, url, attempt,
+                                            time.time() - start)
+            if delay is None:
+                _record(policy, start, attempt, failed=True)
+                if info:
+                    _after(hooks, info, attempt, error=exc)
+                raise
+        else:
+            if response.status_code in (200, 202) or policy is None:
+                break
+            delay = policy.delay(method, url, attempt, time.time() - start,
+                                 response.status_code,
+                                 response.headers.get('Retry-After'))
+            if delay is None:
+                break
+        time.sleep(delay)
+        attempt += 1
+        if position is not None:
+            data.seek(position)
+
+    _record(policy, start, attempt,
+            failed=response.status_code not in (200, 202))
+    if info:
+        _after(hooks, info, attempt, response)
+    return response.status_code, response.text
+
+
+def _record(policy, start, attempt, failed):
+    if policy is not None:
+        policy.stats.record(time.time() - start, attempt + 1, failed)
+
+
+def _before(hooks, method, url):
+    info = CF.instrument.RequestInfo(method, url)
+    for hook in hooks:
+        hook.before(info)
+    return info
+
+
+def _after(hooks, info, attempt, response=None, error=None):
+    if response is None:
+        info.finish(attempt, error=error)
+    else:
+        info.finish(
+            attempt, response.status_code,
+            int(response.request.headers.get('Content-Length') or 0),
+            len(response.content), response.elapsed.total_seconds())
+    for hook in hooks:
+        hook.after(info)
+
+
+def prepare_request(url, headers=None, key=None):
+    """Resolve the full URL and build the headers of a request.
+
+    Args:
+        url: The full URL or the short name relative to the base URL of the
+            current client, else to `_BASE_URL`.
+        headers: Optional extra HTTP headers.
+        key: Optional Subscription Key overriding `Key.get()`.
 
+    Returns:
+        a two-item tuple consist of the full URL and the HTTP headers.
+    """
     # Make it possible to call only with short name (without _BASE_URL).
-    if not url.startswith('https://'):
-        url = _BASE_URL + url
+    if not url.startswith(('https://', 'http://')):
+        url = (CF.client.current().base_url or _BASE_URL) + url
 
     # Setup the headers with default Content-Type and Subscription Key.
     headers = headers or {}
     if 'Content-Type' not in headers:
         headers['Content-Type'] = 'application/json'
-    headers['Ocp-Apim-Subscription-Key'] = Key.get()
+    headers['Ocp-Apim-Subscription-Key'] = key or Key.get()
+
+    return url, headers
 
-    response = requests.request(method, url, params=params, data=data,
-                                json=json, headers=headers)
 
+def parse_response(status_code, text):
+    """Decode a response body, raising `CognitiveFaceException` on failure.
+
+    Args:
+        status_code: HTTP response status code.
+        text: HTTP response body as text.
+
+    Returns:
+        The decoded JSON body, or an empty dict for an empty body.
+    """
     # Handle result and raise custom exception when something wrong.
     result = None
     # `person_group.train` return 202 status code for success.
-    if response.status_code not in (200, 202):
+    if status_code not in (200, 202):
         try:
-            error_msg = response.json()['error']
+            error_msg = _json.loads(text)['error']
         except:
-            raise CognitiveFaceException(
-                response.status_code,
-                response.status_code,
-                response.text)
+            raise CognitiveFaceException(status_code, status_code, text)
         raise CognitiveFaceException(
-            response.status_code,
+            status_code,
             error_msg.get('code'),
             error_msg.get('message'))
 
-    # Prevent `reponse.json()` complains about empty response.
-    if response.text:
-        result = response.json()
+    # Prevent `json.loads()` complains about empty response.
+    if text:
+        result = _json.loads(text)
     else:
         result = {}
 
     return result
 
 
+def endpoint_template(url):
+    """Return the endpoint of a URL with its identifiers replaced by `{}`,
+    e.g. `persongroups/{}/persons` for any person group.
+    """
+    path = url.split('?', 1)[0]
+    if path.startswith(('https://', 'http://')):
+        path = path.split('/face/v1.0/', 1)[-1]
+    segments = path.strip('/').split('/')
+    for idx in range(1, len(segments)):
+        if segments[idx - 1] in _COLLECTIONS:
+            segments[idx] = '{}'
+    return '/'.join(segments)
+
+
 def parse_image(image):
     """Parse the image smartly and return metadata for request.
 
     First check whether the image is a URL or a file path or a file-like object
-    and return corresponding metadata.
+    and return corresponding metadata. The image is read in memory, prefer
+    `open_image` which streams it.
 
     Args:
         image: A URL or a file path or a file-like object represents an image.
@@ -110,51 +551,228 @@ def parse_image(image):
         a three-item tuple consist of HTTP headers, binary data and json data
         for POST.
     """
-    if hasattr(image, 'read'):  # When image is a file-like object.
+    with open_image(image) as (headers, data, json):
+        if data is not None:
+            data = data.read()
+        return headers, data, json
+
+
+@contextlib.contextmanager
+def open_image(image):
+    """Open the image for a streamed upload and return metadata for request.
+
+    File paths are opened and passed on as file objects, so the content is
+    sent in chunks with its `Content-Length` and never held in memory in full.
+    The file is closed when the context exits. File-like objects are streamed
+    from their current position and left open for the caller, the ones which
+    cannot seek (pipes, sockets, HTTP responses) are read in memory. When a
+    preprocessor is installed with `Preprocess.set`, its output is sent
+    instead.
+
+    Args:
+        image: A URL or a file path or a file-like object represents an image.
+
+    Returns:
+        a context manager yielding a three-item tuple consist of HTTP headers,
+        a file-like object and json data for POST.
+    """
+    preprocessor = Preprocess.get()
+    if preprocessor is not None and (hasattr(image, 'read') or
+                                     os.path.isfile(image)):
         headers = {'Content-Type': 'application/octet-stream'}
-        data = image.read()
-        return headers, data, None
+        yield headers, io.BytesIO(preprocessor(image)), None
+    elif hasattr(image, 'read'):  # When image is a file-like object.
+        headers = {'Content-Type': 'application/octet-stream'}
+        yield headers, rewindable(image), None
     elif os.path.isfile(image):  # When image is a file path.
         headers = {'Content-Type': 'application/octet-stream'}
-        data = open(image, 'rb').read()
-        return headers, data, None
+        with open(image, 'rb') as data:
+            yield headers, data, None
     else:  # Defailt treat it as a URL (string).
         headers = {'Content-Type': 'application/json'}
         json = {'url': image}
-        return headers, None, json
+        yield headers, None, json
 
 
-def wait_for_training(person_group_id):
-    """Wait for the finish of person_group training."""
-    idx = 1
-    while True:
-        res = CF.person_group.get_status(person_group_id)
-        if res['status'] in ('succeeded', 'failed'):
-            break
-        print('The training of Person Group {} is onging: #{}'.format(
-            person_group_id, idx))
-        time.sleep(2**idx)
-        idx += 1
-
-
-def clear_face_lists():
-    """[Dangerous] Clear all the face lists and all related persisted data."""
-    face_lists = CF.face_list.lists()
-    time.sleep(TIME_SLEEP)
-    for face_list in face_lists:
-        face_list_id = face_list['faceListId']
-        CF.face_list.delete(face_list_id)
-        print('Deleting Face List {}'.format(face_list_id))
-        time.sleep(TIME_SLEEP)
-
-
-def clear_person_groups():
+def rewindable(data):
+    """Return a request body which can be rewound, to be sent again or
+    hashed: streams which cannot seek (pipes, sockets, HTTP responses) are
+    read in memory, other bodies are returned as they are."""
+    if hasattr(data, 'read') and not (hasattr(data, 'seekable') and
+                                      data.seekable()):
+        return io.BytesIO(data.read())
+    return data
+
+
+class TTLCache(object):
+    """Bounded in-memory cache whose entries expire, the least recently used
+    entries are evicted first. It is not thread safe, guard it with a lock.
+
+    Attributes:
+        ttl: Default seconds an entry is kept.
+        max_entries: Maximum number of entries.
+    """
+    _MISSING = object()
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the value of a key, `default` when missing or expired."""
+        entry = self._entries.get(key, self._MISSING)
+        if entry is self._MISSING:
+            return default
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value, ttl=None):
+        """Store the value of a key for `ttl` seconds, `ttl` by default."""
+        self._entries.pop(key, None)
+        while len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        self._entries[key] = (
+            time.time() + (self.ttl if ttl is None else ttl), value)
+
+    def invalidate(self, prefix):
+        """Remove the entries whose (string) key starts with `prefix`, returns
+        their number."""
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        """Remove all the entries."""
+        self._entries.clear()
+
+
+class _LocalVar(object):
+    """Stand-in for `contextvars.ContextVar` before Python 3.7, holding a
+    value per thread."""
+    registry = []
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+        self._local = threading.local()
+        _LocalVar.registry.append(self)
+
+    def get(self):
+        return getattr(self._local, 'value', self.default)
+
+    def set(self, value):
+        token = self.get()
+        self._local.value = value
+        return token
+
+    def reset(self, token):
+        self._local.value = token
+
+
+def context_var(name):
+    """Return a context variable defaulting to None, a `_LocalVar` when
+    `contextvars` is not available."""
+    if contextvars is None:
+        return _LocalVar(name)
+    return contextvars.ContextVar(name, default=None)
+
+
+def propagate(func):
+    """Return `func` bound to the current context, i.e. the current client
+    and the pinned region, to be run by another thread, e.g. submitted to an
+    executor. Threads otherwise start with the process-wide settings.
+    """
+    if contextvars is not None:
+        context = contextvars.copy_context()
+
+        def bound(*args, **kwargs):
+            # A context can only be entered by one thread at a time.
+            return context.copy().run(func, *args, **kwargs)
+        return bound
+
+    values = [(var, var.get()) for var in _LocalVar.registry]
+
+    def bound_local(*args, **kwargs):
+        tokens = [(var, var.set(value)) for var, value in values]
+        try:
+            return func(*args, **kwargs)
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+    return bound_local
+
+
+def paginate(fetch, key, top=1000, prefetch=False):
+    """Lazily iterate over all the entries of a paged listing.
+
+    Pages are fetched on demand, so at most one page (two when prefetching)
+    is held in memory whatever the number of entries.
+
+    Args:
+        fetch: Callable given `start` and `top` which returns a page, e.g.
+            `person_group.lists`.
+        key: Name of the identifier of the entries, the last one of a page is
+            the `start` of the next page.
+        top: Number of entries per page, ranging in [1, 1000].
+        prefetch: Fetch the next page in a background thread while the current
+            one is consumed.
+
+    Returns:
+        A generator of the entries, in the order of their identifiers.
+    """
+    executor = ThreadPoolExecutor(1) if prefetch else None
+    try:
+        page = fetch(None, top)
+        while True:
+            following = None
+            if len(page) >= top and executor is not None:
+                following = executor.submit(propagate(fetch),
+                                            page[-1][key], top)
+            for entry in page:
+                yield entry
+            if len(page) < top:
+                return
+            if following is not None:
+                page = following.result()
+            else:
+                page = fetch(page[-1][key], top)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def wait_for_training(person_group_id, timeout=None):
+    """Wait for the finish of person_group training.
+
+    Polls with a capped and jittered backoff through `training.wait` and
+    returns the final training status. Waits as long as the training runs
+    unless a `timeout` in seconds is given.
+    """
+    res = CF.training.wait(person_group_id, timeout)
+    print('The training of Person Group {} {}'.format(
+        person_group_id, res['status']))
+    return res
+
+
+def clear_face_lists(workers=8, dry_run=False):
+    """[Dangerous] Clear all the face lists and all related persisted data.
+
+    Deletes concurrently through `bulk.delete` and returns its report.
+    """
+    return CF.bulk.delete(CF.bulk.face_lists(), workers, dry_run)
+
+
+def clear_person_groups(workers=8, dry_run=False):
     """[Dangerous] Clear all the person gourps and all related persisted data.
+
+    Deletes concurrently through `bulk.delete` and returns its report.
     """
-    person_groups = CF.person_group.lists()
-    time.sleep(TIME_SLEEP)
-    for person_group in person_groups:
-        person_group_id = person_group['personGroupId']
-        CF.person_group.delete(person_group_id)
-        print('Deleting Person Group {}'.format(person_group_id))
-        time.sleep(TIME_SLEEP)
+    return CF.bulk.delete(CF.bulk.person_groups(), workers, dry_run)
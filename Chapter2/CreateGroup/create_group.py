@@ -8,9 +8,14 @@ https://docs.microsoft.com/en-gb/azure/cognitive-services/face/quickstarts/pytho
 
 """
 
-import sys, os, getopt, io, json
-from PIL import Image
+import sys, os, getopt, json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import cognitive_face as cf
+from cognitive_face.preprocess import Preprocessor
+from journal import Journal
+from scanner import scan
+import binary_export
 
 def create_group(group_id):
     """ creates a new group 
@@ -23,61 +28,382 @@ def create_group(group_id):
 
     return 1
 
-def create_persons(group_id, source_directory):
+def create_persons(group_id, source_directory, workers=1, journal=None, index=None):
+    """ creates a person per sub directory of source_directory and adds their faces; 
+    index is the result of scanner.scan, the directory is scanned when it is not given 
+    """
     print('creating persons in directory {}'.format(source_directory)) 
 
-    persons = []  
+    if index is None:
+        index = scan(source_directory)
+
+    person_images = list(index.items())
+
+    if workers > 1:
+        persons = create_persons_concurrently(group_id, person_images, workers, journal)
+    else:
+        persons = [create_person(group_id, name, images, journal) for name, images in person_images]
+
+    return [person for person in persons if person and len(person['face_ids']) > 0]
+
+def create_persons_concurrently(group_id, person_images, workers, journal=None):
+    """ creates the persons and adds their faces using a bounded pool of workers; 
+    person_images lists the scanner.ImageFile of each name, faces are uploaded as soon 
+    as their person exists and the returned persons (and their face_ids) keep the order 
+    of person_images and of their images 
+    """
+    print('enrolling {} persons with {} workers'.format(len(person_images), workers))
+
+    persons = []
+    images = []
+    face_results = []
+
+    for name, person_image_files in person_images:
+        persons.append({'name': name, 'person_id': '', 'face_ids': []})
+        images.append(person_image_files)
+        face_results.append([None] * len(images[-1]))
 
-    subdirs = [x[0] for x in os.walk(source_directory)] 
-                                                                    
-    for subdir, dirs, files in os.walk(source_directory):
-        for dir in dirs:
-            person = create_person(group_id, dir, os.path.join(source_directory, dir))
-            if person and len(person['face_ids']) > 0:
-                persons.append(person)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def add_faces(idx):
+            name = persons[idx]['name']
+            person_id = persons[idx]['person_id']
+
+            for image_idx, image in enumerate(images[idx]):
+                persisted_face_id = journal and journal.face_id(name, image.path)
+
+                if persisted_face_id:
+                    face_results[idx][image_idx] = {'persistedFaceId': persisted_face_id}
+                else:
+                    # the hash of the image lets a later --sync match the face 
+                    pending[executor.submit(cf.util.propagate(cf.person.add_face), image.path, group_id, person_id, image.hash, None)] = (idx, image_idx)
+
+        for idx, (name, person_image_files) in enumerate(person_images):
+            person_id = journal and journal.person_id(name)
+
+            if person_id:
+                persons[idx]['person_id'] = person_id
+                add_faces(idx)
+            else:
+                print('creating person {} using {} images'.format(name, len(person_image_files)))
+                pending[executor.submit(cf.util.propagate(cf.person.create), group_id, name)] = (idx, None)
+
+        def record(idx, image_idx, res):
+            """ journals the result of a call as soon as it is known """
+            if not journal:
+                return
+
+            if image_idx is None:
+                journal.add_person(persons[idx]['name'], res['personId'])
+            elif 'persistedFaceId' in res:
+                journal.add_face(persons[idx]['name'], images[idx][image_idx].path, res['persistedFaceId'])
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    idx, image_idx = pending.pop(future)
+                    res = future.result()
+
+                    if image_idx is None:
+                        if "personId" not in res:
+                            raise Exception('failed to create person {}'.format(persons[idx]['name']))
+
+                        persons[idx]['person_id'] = res['personId']
+                        record(idx, image_idx, res)
+                        add_faces(idx)
+                    else:
+                        face_results[idx][image_idx] = res
+                        record(idx, image_idx, res)
+        except BaseException:
+            # the queued calls are cancelled and the ones in flight are journaled before 
+            # failing, so a resumed run only repeats the calls which were never answered 
+            for future in pending:
+                future.cancel()
+
+            wait(pending)
+
+            for future, (idx, image_idx) in pending.items():
+                if not future.cancelled() and future.exception() is None and (image_idx is not None or 'personId' in future.result()):
+                    record(idx, image_idx, future.result())
+
+            raise
+
+    for person, person_image_files, results in zip(persons, images, face_results):
+        for image, res in zip(person_image_files, results):
+            if 'persistedFaceId' not in res:
+                print('ERROR: failed to add face {} to {}'.format(image.path, person['name']))
+            else:
+                person['face_ids'].append(res['persistedFaceId'])
+
+        print('... added {} faces to {}'.format(len(person['face_ids']), person['name']))
 
     return persons
 
-def create_person(group_id, name, source_directory):
-    print('creating person {} using images from directory {}'.format(name, source_directory)) 
+def create_person(group_id, name, images, journal=None):
+    """ creates a person and adds the faces of images, its scanner.ImageFile list 
+    """
+    print('creating person {} using {} images'.format(name, len(images))) 
 
     person = {}
     person['name'] = name
     person['person_id'] = '' 
     person['face_ids'] = []
 
-    res = cf.person.create(group_id, name)
+    person_id = journal and journal.person_id(name)
+
+    if not person_id:
+        res = cf.person.create(group_id, name)
+
+        if "personId" not in res:
+            raise Exception('failed to create person {}'.format(name))        
 
-    if "personId" not in res:
-        raise Exception('failed to create person {}'.format(name))        
+        person_id = res['personId']
 
-    person_id = res['personId']
+        if journal:
+            journal.add_person(name, person_id)
 
     person['person_id'] = person_id
 
     persisted_face_ids = {}
 
-    for subdir, dirs, files in os.walk(source_directory):
-        for file in files:
-            if file.lower().endswith(".jpg") or file.lower().endswith(".jpeg") or file.lower().endswith(".png"):
-                persisted_face_ids[os.path.join(subdir, file)] = ''
+    for image in images:
+        img_filepath = image.path
+        persisted_face_ids[img_filepath] = journal and journal.face_id(name, img_filepath)
 
-                res = cf.person.add_face(os.path.join(subdir, file), group_id, person_id, None, None)
+        if persisted_face_ids[img_filepath]:
+            person['face_ids'].append(persisted_face_ids[img_filepath])
+            continue
 
-                if 'persistedFaceId' not in res:
-                    print('ERROR: failed to add face {} to {}'.format(os.path.join(subdir, file), name))
-                else:
-                    person['face_ids'].append(res['persistedFaceId']) 
+        # the hash of the image lets a later --sync match the face 
+        res = cf.person.add_face(img_filepath, group_id, person_id, image.hash, None)
+
+        if 'persistedFaceId' not in res:
+            print('ERROR: failed to add face {} to {}'.format(img_filepath, name))
+        else:
+            persisted_face_ids[img_filepath] = res['persistedFaceId']
+            person['face_ids'].append(res['persistedFaceId']) 
+
+            if journal:
+                journal.add_face(name, img_filepath, res['persistedFaceId'])
 
     print('... added {} faces to {}'.format(len(person['face_ids']), name))
 
     return person 
 
+USER_DATA_MAX_LENGTH = 16 * 1024
+
+def load_face_hashes(group_id, server_person):
+    """ returns the mapping image hash -> persisted face id of a person on the server; 
+    the mapping is kept in the user_data of the person and, for faces added before 
+    it existed, in the user_data of each face 
+    """
+    face_hashes = {}
+
+    try:
+        face_hashes = json.loads(server_person.get('userData') or '{}').get('faces', {})
+    except (ValueError, AttributeError):
+        pass
+
+    known_face_ids = set(face_hashes.values())
+
+    for persisted_face_id in server_person.get('persistedFaceIds', []):
+        if persisted_face_id not in known_face_ids:
+            res = cf.person.get_face(group_id, server_person['personId'], persisted_face_id)
+            # faces without a hash can't be matched and will be replaced 
+            face_hashes[res.get('userData') or persisted_face_id] = persisted_face_id
+
+    server_face_ids = set(server_person.get('persistedFaceIds', []))
+
+    return dict((face_hash, persisted_face_id) for face_hash, persisted_face_id in face_hashes.items() if persisted_face_id in server_face_ids)
+
+def sync_persons(group_id, source_directory, workers=1, index=None):
+    """ brings the group in line with source_directory, only adding the new images, 
+    deleting the removed ones and the persons whose directory is gone; returns the 
+    persons (same shape as create_persons) and whether anything changed 
+    """
+    print('syncing group {} with directory {}'.format(group_id, source_directory))
+
+    if index is None:
+        index = scan(source_directory)
+
+    server_persons = OrderedDict()
+
+    for person in cf.person.iter_lists(group_id, prefetch=True):
+        server_persons.setdefault(person['name'], []).append(person)
+
+    # the persons sharing a name can't be told apart, the first one is synced and the 
+    # others are reported and left alone 
+    for name, same_name in server_persons.items():
+        if len(same_name) > 1:
+            print('WARNING: group {} has {} persons named {}, only syncing {} and leaving {}'.format(
+                group_id, len(same_name), name, same_name[0]['personId'], ', '.join(person['personId'] for person in same_name[1:])))
+
+        server_persons[name] = same_name[0]
+
+    persons = []
+    changed = False
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for name, images in index.items():
+            local_images = OrderedDict((image.hash, image.path) for image in images)
+
+            server_person = server_persons.pop(name, None)
+
+            if server_person is None:
+                print('creating person {}'.format(name))
+                server_person = {'personId': cf.person.create(group_id, name)['personId'], 'persistedFaceIds': []}
+                changed = True
+
+            person_id = server_person['personId']
+            face_hashes = load_face_hashes(group_id, server_person)
+
+            added = [face_hash for face_hash in local_images if face_hash not in face_hashes]
+            removed = [face_hash for face_hash in face_hashes if face_hash not in local_images]
+
+            if added or removed:
+                print('person {}: adding {} faces, deleting {} faces'.format(name, len(added), len(removed)))
+                changed = True
+
+            for face_hash, res in zip(added, executor.map(cf.util.propagate(lambda face_hash: cf.person.add_face(local_images[face_hash], group_id, person_id, face_hash, None)), added)):
+                if 'persistedFaceId' not in res:
+                    print('ERROR: failed to add face {} to {}'.format(local_images[face_hash], name))
+                else:
+                    face_hashes[face_hash] = res['persistedFaceId']
+
+            list(executor.map(cf.util.propagate(lambda face_hash: cf.person.delete_face(group_id, person_id, face_hashes.pop(face_hash))), removed))
+
+            if added or removed or server_person.get('userData') is None:
+                user_data = json.dumps({'faces': face_hashes}, separators=(',', ':'))
+
+                # too many faces to remember; they will be matched through their own user_data 
+                if len(user_data) > USER_DATA_MAX_LENGTH:
+                    user_data = ''
+
+                cf.person.update(group_id, person_id, name, user_data)
+
+            persons.append({
+                'name': name,
+                'person_id': person_id,
+                'face_ids': [face_hashes[face_hash] for face_hash in local_images if face_hash in face_hashes]
+            })
+
+    for name, server_person in server_persons.items():
+        print('deleting person {}'.format(name))
+        cf.person.delete(group_id, server_person['personId'])
+        changed = True
+
+    return [person for person in persons if len(person['face_ids']) > 0], changed
+
+# seconds after which the training is no longer waited for 
+TRAINING_TIMEOUT = 3600
+
 def train_group(group_id):
+    """ queues the training of the group and returns a future resolved with the 
+    training status once it is finished 
+    """
     print("training {}".format(group_id))
     res = cf.person_group.train(person_group_id=group_id)
 
-def export(group_id, persons, output_file): 
+    return cf.training.watch(group_id, TRAINING_TIMEOUT, callback=lambda future: print_training_status(group_id, future))
+
+def print_training_status(group_id, future):
+    if future.cancelled():
+        return
+
+    if future.exception() is not None:
+        print('ERROR: training of {} failed: {}'.format(group_id, future.exception()))
+    else:
+        print('training of {} {}'.format(group_id, future.result()['status']))
+
+def recover_persons(group_id, journal):
+    """ records in a resumed journal the persons of the group it lost, created by calls 
+    in flight when the run stopped or truncated by a crash, so they are not created twice 
+    """
+    if not journal.resumed:
+        return
+
+    for person in cf.person.iter_lists(group_id):
+        if journal.person_id(person['name']) is None:
+            print('recovering person {} from group {}'.format(person['name'], group_id))
+            journal.add_person(person['name'], person['personId'])
+
+def is_trained(training):
+    """ waits for the training future; a failure or a timeout was already reported by 
+    print_training_status 
+    """
+    return training.exception() is None and training.result()['status'] == 'succeeded'
+
+def enroll_group(group_id, source_directory, workers=1, sync=False, journal_file=None, index=None):
+    """ creates or syncs the group and queues its training; returns the persons and the 
+    training future, None when the synced group was already up to date 
+    """
+    create_group(group_id)
+
+    training = None
+
+    if sync:
+        persons, changed = sync_persons(group_id, source_directory, workers, index)
+
+        if changed:
+            training = train_group(group_id)
+        else:
+            print('group {} is up to date'.format(group_id))
+    else:
+        journal = Journal(journal_file, group_id) if journal_file else None
+
+        if journal:
+            recover_persons(group_id, journal)
+
+        persons = create_persons(group_id, source_directory, workers, journal, index)
+
+        if journal:
+            journal.close()
+
+        training = train_group(group_id)
+
+    return persons, training
+
+def region_file(path, region, primary):
+    """ the file of the primary region is path, the others are suffixed with the region, 
+    e.g. group.westus.json 
+    """
+    if primary or not path:
+        return path
+
+    root, ext = os.path.splitext(path)
+
+    return '{}.{}{}'.format(root, region.name, ext)
+
+def replicate_group(group_id, source_directory, regions, workers=1, sync=False, journal_file=None, index=None):
+    """ enrolls the group in every region at once, since a person group only exists in the 
+    region it was created in; the calls made for a region are pinned to it and each region 
+    has its own journal; returns the persons of each region once they are all trained 
+    """
+    print('replicating group {} to {}'.format(group_id, ', '.join(region.name for region in regions)))
+
+    def enroll(region_idx):
+        region = regions[region_idx]
+
+        with cf.region.pin(region):
+            persons, training = enroll_group(group_id, source_directory, workers, sync, 
+                                             region_file(journal_file, region, region_idx == 0), index)
+
+        if training is not None and not is_trained(training):
+            print('ERROR: group {} is not trained in {}'.format(group_id, region.name))
+
+        return persons
+
+    with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+        return OrderedDict(zip([region.name for region in regions], executor.map(enroll, range(len(regions)))))
+
+def export(group_id, persons, output_file, export_format='json'): 
+
+    if export_format == 'binary':
+        binary_export.write(output_file, group_id, persons)
+        return
 
     json_obj = {
         'group_id': group_id, 
@@ -87,33 +413,63 @@ def export(group_id, persons, output_file):
     with open(output_file, 'w') as f:
         json.dump(json_obj, f, indent=4)
 
-def test_persons(group_id, source_directory):
+def build_local_index(group_id, persons, index, index_file):
+    """ embeds the images of the enrolled persons and saves them as a local index, 
+    which identifies them without calling the api and falls back to it when unsure 
+    """
+    from cognitive_face.local_index import LocalIndex, ThumbnailEmbedding
+
+    local_index = LocalIndex(ThumbnailEmbedding(), group_id)
+
+    for person in persons:
+        for image in index[person['name']]:
+            local_index.add(person['person_id'], image.path)
+
+    local_index.build()
+    local_index.save(index_file)
+
+    print('saved {} faces of {} persons to {}'.format(len(local_index), len(persons), index_file))
+
+def test_persons(group_id, source_directory, workers=4, training=None, index=None):
+    """ detects the faces of every image and identifies them, detection overlaps 
+    with training and identification starts as soon as training is over 
+    """
     print('testing persons in directory {}'.format(source_directory)) 
 
-    subdirs = [x[0] for x in os.walk(source_directory)] 
-                                                                    
-    for subdir, dirs, files in os.walk(source_directory):
-        for file in files:
-            if file.lower().endswith(".jpg") or file.lower().endswith(".jpeg") or file.lower().endswith(".png"):
-                img_filepath = os.path.join(subdir, file)
-                res = cf.face.detect(
-                    img_filepath, 
-                    face_id=True, 
-                    landmarks=False, 
-                    attributes='')
-            
-                print('=========== results for {} ===========')
-                print(res) 
-
-                for recognized_face in res:
-                    face_id = recognized_face['faceId']
-                    identity_res = cf.face.identify(
-                        face_ids=[face_id], 
-                        person_group_id=group_id, 
-                        max_candidates_return=1, 
-                        threshold=None)
-
-                    print(identity_res)
+    if index is None:
+        index = scan(source_directory)
+
+    detected = []
+    face_ids = []
+
+    for img_filepath in [image.path for images in index.values() for image in images]:
+        res = cf.face.detect(
+            img_filepath, 
+            face_id=True, 
+            landmarks=False, 
+            attributes='')
+
+        detected.append((img_filepath, res))
+        face_ids.extend(recognized_face['faceId'] for recognized_face in res)
+
+    if training is not None and not is_trained(training):
+        print('ERROR: group {} is not trained, skipping identification'.format(group_id))
+        return
+
+    # identify all the detected faces at once, 10 faces per request 
+    identity_results = iter(cf.face.identify_many(
+        face_ids=face_ids, 
+        person_group_id=group_id, 
+        max_candidates_return=1, 
+        threshold=None, 
+        workers=workers))
+
+    for img_filepath, res in detected:
+        print('=========== results for {} ==========='.format(img_filepath))
+        print(res) 
+
+        for recognized_face in res:
+            print(next(identity_results))
 
 def main(argv):
     """
@@ -129,19 +485,47 @@ def main(argv):
     source_directory = ''
     output_file = ''
     region = 'westcentralus'
+    workers = 1
+    rate = None
+    quota = None
+    retries = 5
+    cache_file = None
+    journal_file = None
+    sync = False
+    max_size = None
+    quality = 90
+    endpoint = None
+    metrics_file = None
+    local_index_file = None
+    export_format = 'json'
+    scan_state_file = None
 
     try:
-        opts, args = getopt.getopt(argv,"hk:g:d:o:")
+        opts, args = getopt.getopt(argv,"hk:g:d:o:r:",["workers=", "rate=", "quota=", "retries=", "cache=", "journal=", "sync", "max-size=", "quality=", "endpoint=", "metrics=", "local-index=", "export-format=", "scan-state="])
     except getopt.GetoptError:
-        print('create_group.py -k <subscription_key> -g <group_id> -d <source_directory> -o <output_file> [-r <region>]') 
+        print('create_group.py -k <subscription_key> -g <group_id> -d <source_directory> -o <output_file> [-r <region>] [--workers <workers>] [--rate <calls_per_second>] [--quota <calls_per_month>] [--retries <retries>] [--cache <cache_file>] [--journal <journal_file>] [--sync] [--max-size <pixels> [--quality <quality>]] [--endpoint <url>] [--metrics <metrics_file>] [--local-index <index_file>] [--export-format <json|binary>] [--scan-state <state_file>]') 
         sys.exit(2)
     
     for opt, arg in opts:
         if opt == '-h':
-            print('create_group.py -k <subscription_key> -g <group_id> -d <source_directory> -o <output_file> [-r <region>]')
+            print('create_group.py -k <subscription_key> -g <group_id> -d <source_directory> -o <output_file> [-r <region>] [--workers <workers>] [--rate <calls_per_second>] [--quota <calls_per_month>] [--retries <retries>] [--cache <cache_file>] [--journal <journal_file>] [--sync] [--max-size <pixels> [--quality <quality>]] [--endpoint <url>] [--metrics <metrics_file>] [--local-index <index_file>] [--export-format <json|binary>] [--scan-state <state_file>]')
             print('\nStructure of source_directory; each person to have have their own directory')
             print('\nwith the name of the persons id. The contents is to include sample jpegs for training.')
             print('\nValid regions: westus, eastus2, westcentralus, westeurope, and southeastasia') 
+            print('\nSeveral comma separated regions (and as many keys) replicate the group to each of them; output_file is the export of the first region and')
+            print('the others are suffixed with their region, e.g. group.westus.json; the test detections and identifications all go to the fastest healthy region')
+            print('\n--workers sets the number of concurrent requests used to enroll persons and faces (default 1)')
+            print('\n--rate and --quota throttle the calls to your tier, e.g. --rate 0.33 --quota 30000 for the free tier')
+            print('\n--retries sets how many times throttled or failed calls are retried (default 5, 0 to disable)')
+            print('\n--cache keeps the face detection results in cache_file so unchanged images are not analyzed again')
+            print('\n--journal records the enrolled persons and faces in journal_file; rerunning with the same journal resumes an interrupted run')
+            print('\n--sync updates an existing group with the changes made to source_directory and only retrains when something changed')
+            print('\n--endpoint overrides the region with the base url (or comma separated urls) of another api, e.g. python -m cognitive_face.mock_server')
+            print('\n--metrics writes the request counts and latencies per endpoint to metrics_file, as json if it ends with .json and in the prometheus text format otherwise')
+            print('\n--export-format binary writes output_file in the compact memory-mapped layout of binary_export.py instead of json')
+            print('\n--local-index saves the enrolled faces (of the first region) to index_file for offline identification with cognitive_face.local_index (requires numpy)')
+            print('\n--scan-state keeps the size, mtime and hash of the images in state_file so only the changed images are hashed by the next run')
+            print('\n--max-size downscales the images to max-size pixels and re-encodes them to jpeg (--quality, default 90) before uploading them')
             sys.exit()
         elif opt == "-k":
             subscription_key = arg
@@ -153,24 +537,107 @@ def main(argv):
             output_file = arg
         elif opt == '-r':
             region = arg 
+        elif opt == '--workers':
+            workers = int(arg)
+        elif opt == '--rate':
+            rate = float(arg)
+        elif opt == '--quota':
+            quota = int(arg)
+        elif opt == '--retries':
+            retries = int(arg)
+        elif opt == '--cache':
+            cache_file = arg
+        elif opt == '--journal':
+            journal_file = arg
+        elif opt == '--sync':
+            sync = True
+        elif opt == '--max-size':
+            max_size = int(arg)
+        elif opt == '--quality':
+            quality = int(arg)
+        elif opt == '--endpoint':
+            endpoint = arg
+        elif opt == '--metrics':
+            metrics_file = arg
+        elif opt == '--local-index':
+            local_index_file = arg
+        elif opt == '--export-format':
+            export_format = arg
+        elif opt == '--scan-state':
+            scan_state_file = arg
 
     if len(subscription_key) == 0 or len(group_id) == 0 or len(source_directory) == 0 or len(output_file) == 0:
         print('create_group.py -k <subscription_key> -g <group_id> -d <source_directory>') 
         sys.exit(2)
 
-    cf.util._BASE_URL = "https://{}.api.cognitive.microsoft.com/face/v1.0/".format(region)
+    if endpoint:
+        regions = [cf.region.Region('endpoint{}'.format(idx + 1), url) for idx, url in enumerate(endpoint.split(','))]
+    else:
+        regions = [cf.region.azure(name) for name in region.split(',')]
 
-    cf.Key.set(subscription_key)
+    keys = subscription_key.split(',')
 
-    create_group(group_id)
+    for idx, region in enumerate(regions):
+        region.key = keys[min(idx, len(keys) - 1)]
+
+    cf.Key.set(keys[0])
+    cf.util._BASE_URL = regions[0].base_url
+
+    if workers > 1:
+        cf.Session.configure(pool_maxsize=workers)
+
+    if rate:
+        cf.RateLimit.set(cf.rate_limit.RateLimiter(rate, per_month=quota))
+
+    metrics = None
+
+    if metrics_file:
+        metrics = cf.instrument.Metrics()
+        cf.Instrument.add(metrics)
+
+    if retries > 0:
+        cf.Retry.set(cf.retry.RetryPolicy(max_retries=retries))
+
+    if cache_file:
+        cf.Cache.set(cf.detect_cache.DetectCache(cache_file))
+
+    if max_size:
+        # resizing runs in a process pool so it overlaps with the uploads 
+        cf.Preprocess.set(Preprocessor(max_size, quality, processes=os.cpu_count()))
+
+    # scanned once and shared, so the images are only listed and hashed once 
+    index = scan(source_directory, max(workers, 8), scan_state_file)
+
+    if len(regions) > 1:
+        router = cf.region.Router(regions)
+        cf.Route.set(router)
+
+        for name, latency in router.probe().items():
+            print('region {}: {}'.format(name, 'unreachable' if latency is None else '{:.0f} ms'.format(latency * 1000)))
+
+        region_persons = replicate_group(group_id, source_directory, regions, workers, sync, journal_file, index)
+
+        for idx, region in enumerate(regions):
+            export(group_id, region_persons[region.name], region_file(output_file, region, idx == 0), export_format)
+
+        persons = region_persons[regions[0].name]
+        training = None
+        # a faceId only exists in the region which detected it, so the whole test phase goes to the fastest healthy region
+        test_region = router.order()[0]
+    else:
+        persons, training = enroll_group(group_id, source_directory, workers, sync, journal_file, index)
 
-    persons = create_persons(group_id, source_directory)
+        export(group_id, persons, output_file, export_format)
+        test_region = None
 
-    train_group(group_id)
+    if local_index_file:
+        build_local_index(group_id, persons, index, local_index_file)
 
-    export(group_id, persons, output_file)
+    with cf.region.pin(test_region):
+        test_persons(group_id, source_directory, max(workers, 4), training, index)
 
-    test_persons(group_id, source_directory)
+    if metrics:
+        metrics.dump(metrics_file)
 
     sys.exit()
 
@@ -0,0 +1,89 @@
+"""
+Checkpoint journal of an enrollment run of create_group.py.
+
+Every created person and every persisted face is appended to the journal as
+one JSON line as soon as the API returns it, so a run which stopped half way
+can be restarted and will only create what is missing. The persons created by
+calls which were in flight when the run stopped (or whose line was truncated)
+are recovered from the group by create_group.py, only such faces can be added
+twice.
+"""
+
+import json, os, threading
+
+class Journal(object):
+    """ append-only record of the persons and faces created in a person group
+    """
+
+    def __init__(self, path, group_id):
+        self.path = path
+        self.group_id = group_id
+        self._lock = threading.Lock()
+        self._person_ids = {}
+        self._face_ids = {}
+        self.resumed = False
+        self._truncated = False
+
+        if os.path.exists(path):
+            self._load()
+
+        self._file = open(path, 'a')
+
+        if self._truncated:
+            # ends the partial line so the next record is not appended to it
+            self._file.write('\n')
+
+        if os.path.getsize(path) == 0:
+            self._append({'group_id': group_id})
+
+    def _load(self):
+        self.resumed = True
+
+        with open(self.path) as f:
+            for line in f:
+                self._truncated = not line.endswith('\n')
+
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # the last line may be truncated by a crash
+                    continue
+
+                if 'group_id' in record:
+                    if record['group_id'] != self.group_id:
+                        raise Exception('journal {} belongs to group {}, not {}'.format(
+                            self.path, record['group_id'], self.group_id))
+                elif 'persisted_face_id' in record:
+                    self._face_ids[(record['person'], record['image'])] = record['persisted_face_id']
+                elif 'person_id' in record:
+                    self._person_ids[record['person']] = record['person_id']
+
+        print('resuming from journal {}: {} persons and {} faces already enrolled'.format(
+            self.path, len(self._person_ids), len(self._face_ids)))
+
+    def _append(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def person_id(self, name):
+        """ returns the person_id created for name, None if not created yet
+        """
+        return self._person_ids.get(name)
+
+    def face_id(self, name, image):
+        """ returns the persisted face id of image for name, None if not added yet
+        """
+        return self._face_ids.get((name, image))
+
+    def add_person(self, name, person_id):
+        self._person_ids[name] = person_id
+        self._append({'person': name, 'person_id': person_id})
+
+    def add_face(self, name, image, persisted_face_id):
+        self._face_ids[(name, image)] = persisted_face_id
+        self._append({'person': name, 'image': image, 'persisted_face_id': persisted_face_id})
+
+    def close(self):
+        self._file.close()
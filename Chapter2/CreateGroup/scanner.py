@@ -0,0 +1,125 @@
+"""
+Single-pass scanner of the source directory of create_group.py.
+
+Each sub directory of the source directory is a person, and every image found
+anywhere below it is one of their faces. The person directories are walked
+once, in parallel, and every image is hashed so the same bytes are only ever
+uploaded once, whichever folders they were copied to. With a state file, the
+size, mtime and hash of every image are kept between scans and only the images
+which changed are hashed again.
+"""
+
+import os, hashlib, json
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# the formats accepted by the face api
+IMAGE_EXTENSIONS = frozenset(('.jpg', '.jpeg', '.jpe', '.png', '.gif', '.bmp'))
+
+ImageFile = namedtuple('ImageFile', ['path', 'size', 'mtime', 'hash'])
+
+def is_image(name):
+    """ hidden files (e.g. the ._photo.jpg resource forks of macOS) are not images
+    """
+    return not name.startswith('.') and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+def hash_image(img_filepath):
+    """ returns the (shortened) sha1 of the contents of the image
+    """
+    digest = hashlib.sha1()
+
+    with open(img_filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()[:16]
+
+def list_images(person_directory):
+    """ returns (path, size, mtime) of every image below person_directory, sorted by path;
+    symlinked directories are not followed so a link can't make the walk loop
+    """
+    images = []
+    pending = [person_directory]
+
+    while pending:
+        for entry in os.scandir(pending.pop()):
+            if entry.name.startswith('.'):
+                continue
+
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            elif is_image(entry.name) and entry.is_file():
+                stat = entry.stat()
+                images.append((entry.path, stat.st_size, stat.st_mtime))
+
+    return sorted(images)
+
+def load_state(state_file):
+    """ returns path -> (size, mtime, hash) of the images of the previous scan, empty when
+    there was none or the file can't be read
+    """
+    try:
+        with open(state_file) as f:
+            return dict((path, tuple(entry)) for path, entry in json.load(f).items())
+    except (IOError, OSError, ValueError, AttributeError, TypeError):
+        return {}
+
+def save_state(state_file, images):
+    """ writes the size, mtime and hash of the images; through a temporary file so a
+    crash never leaves a partial state behind
+    """
+    with open(state_file + '.tmp', 'w') as f:
+        json.dump(dict((image.path, [image.size, image.mtime, image.hash]) for image in images), f)
+
+    os.replace(state_file + '.tmp', state_file)
+
+def scan(source_directory, workers=8, state_file=None):
+    """ returns an OrderedDict person name -> list of ImageFile, in name then path order;
+    an image whose bytes were already found (for the same or another person) is dropped,
+    and so are the persons left without images; with a state_file the images whose size
+    and mtime did not change since the previous scan are not hashed again
+    """
+    names = sorted(entry.name for entry in os.scandir(source_directory)
+                   if entry.is_dir() and not entry.name.startswith('.'))
+
+    state = load_state(state_file) if state_file else {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        listings = list(executor.map(list_images, [os.path.join(source_directory, name) for name in names]))
+        changed = [path for listing in listings for path, size, mtime in listing if state.get(path, ())[:2] != (size, mtime)]
+        # hashlib releases the GIL, so the threads hash in parallel
+        hashes = dict(zip(changed, executor.map(hash_image, changed)))
+
+    scanned = []
+    index = OrderedDict()
+    seen = {}
+    duplicates = 0
+
+    for name, listing in zip(names, listings):
+        images = []
+
+        for path, size, mtime in listing:
+            image = ImageFile(path, size, mtime, hashes[path] if path in hashes else state[path][2])
+            scanned.append(image)
+            original = seen.setdefault(image.hash, (name, path))
+
+            if original[1] != path:
+                duplicates += 1
+
+                if original[0] != name:
+                    print('WARNING: {} of {} is the same image as {} of {}, skipping it'.format(path, name, original[1], original[0]))
+
+                continue
+
+            images.append(image)
+
+        if images:
+            index[name] = images
+
+    print('found {} images of {} persons in {} ({} duplicates skipped, {} changed)'.format(
+        sum(len(images) for images in index.values()), len(index), source_directory, duplicates, len(changed)))
+
+    if state_file:
+        save_state(state_file, scanned)
+
+    return index